@@ -7,23 +7,41 @@ CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
 -- Drop existing tables if they exist (for fresh installation)
 DROP TABLE IF EXISTS trend_variants CASCADE;
+DROP TABLE IF EXISTS trend_rollups CASCADE;
 DROP TABLE IF EXISTS wavescores CASCADE;
 DROP TABLE IF EXISTS normalized_trend_bins CASCADE;
 DROP TABLE IF EXISTS trend_scores CASCADE;
 DROP TABLE IF EXISTS raw_ingestion_data CASCADE;
+DROP TABLE IF EXISTS video_metadata CASCADE;
 DROP TABLE IF EXISTS trend_insights CASCADE;
 DROP TABLE IF EXISTS forecast CASCADE;
 DROP TABLE IF EXISTS comments_analysis CASCADE;
 DROP TABLE IF EXISTS anomaly_detection CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
+DROP TABLE IF EXISTS partition_config CASCADE;
+
+-- latest_wavescores and trending_summary were views before enhanced_v1.2.0
+DO $$
+DECLARE
+    rel RECORD;
+BEGIN
+    FOR rel IN
+        SELECT relname, relkind FROM pg_class
+        WHERE relname IN ('latest_wavescores', 'trending_summary')
+        AND relnamespace = 'public'::REGNAMESPACE
+    LOOP
+        EXECUTE format(CASE WHEN rel.relkind = 'v' THEN 'DROP VIEW %I CASCADE' ELSE 'DROP TABLE %I CASCADE' END, rel.relname);
+    END LOOP;
+END $$;
 
 -- =====================================================
 -- Core Data Tables
 -- =====================================================
 
 -- Raw ingestion data from all platforms
+-- Range-partitioned by timestamp (see Time Partitioning below); keys must include it
 CREATE TABLE raw_ingestion_data (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    id UUID DEFAULT uuid_generate_v4(),
     source VARCHAR(20) NOT NULL,
     platform_source VARCHAR(20) NOT NULL,
     content_id VARCHAR(100) NOT NULL,
@@ -49,12 +67,36 @@ CREATE TABLE raw_ingestion_data (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
     -- Constraints
+    PRIMARY KEY (id, timestamp),
     UNIQUE(content_id, source, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Static per-video metadata, written once per content_id and again only when it changes.
+-- raw_ingestion_data rows for these videos carry just the changing counters (plus deltas).
+CREATE TABLE video_metadata (
+    content_id VARCHAR(100) NOT NULL,
+    source VARCHAR(20) NOT NULL,
+    platform_source VARCHAR(20) NOT NULL,
+    title TEXT NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    published_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    channel_id VARCHAR(100),
+    channel_title TEXT,
+    description TEXT,
+    thumbnails JSONB DEFAULT '{}',
+    duration VARCHAR(20),
+    youtube_category_id VARCHAR(10),
+    metadata_hash CHAR(40) NOT NULL,
+    
+    first_seen_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    PRIMARY KEY (content_id, source)
 );
 
--- Time-series trend scores
+-- Time-series trend scores (partitioned by timestamp)
 CREATE TABLE trend_scores (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    id UUID DEFAULT uuid_generate_v4(),
     trend_id VARCHAR(150) NOT NULL,
     timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
     platform_source VARCHAR(20) NOT NULL,
@@ -75,12 +117,13 @@ CREATE TABLE trend_scores (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
     -- Constraints and indexes
+    PRIMARY KEY (id, timestamp),
     UNIQUE(trend_id, timestamp)
-);
+) PARTITION BY RANGE (timestamp);
 
--- Normalized temporal bins for aggregated analysis
+-- Normalized temporal bins for aggregated analysis (partitioned by bin_timestamp)
 CREATE TABLE normalized_trend_bins (
-    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    id UUID DEFAULT uuid_generate_v4(),
     bin_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
     platform_source VARCHAR(20) NOT NULL,
     category VARCHAR(50) NOT NULL,
@@ -100,8 +143,9 @@ CREATE TABLE normalized_trend_bins (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
     -- Constraints
+    PRIMARY KEY (id, bin_timestamp),
     UNIQUE(bin_timestamp, platform_source, category)
-);
+) PARTITION BY RANGE (bin_timestamp);
 
 -- Advanced WaveScore calculations
 CREATE TABLE wavescores (
@@ -162,6 +206,67 @@ CREATE TABLE trend_variants (
     UNIQUE(trend_id, variant_type, variant_name)
 );
 
+-- Incrementally maintained WaveScore rollups (hour, day, week)
+-- Stores mergeable sums so new scores fold into existing buckets
+CREATE TABLE trend_rollups (
+    trend_id VARCHAR(150) NOT NULL,
+    resolution VARCHAR(10) NOT NULL, -- hour, day, week
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    
+    point_count INTEGER NOT NULL DEFAULT 0,
+    score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    score_sum_sq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    score_min DECIMAL(5,2),
+    score_max DECIMAL(5,2),
+    last_score DECIMAL(5,2),
+    last_calculated_at TIMESTAMP WITH TIME ZONE,
+    
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    PRIMARY KEY (trend_id, resolution, bucket_start)
+);
+
+-- Latest WaveScore per trend with its content details, kept current at write time
+-- (apply_wavescore_summaries) so dashboard reads never scan wavescores history
+CREATE TABLE latest_wavescores (
+    trend_id VARCHAR(150) PRIMARY KEY,
+    content_id VARCHAR(100) NOT NULL,
+    wave_score DECIMAL(5,2) NOT NULL,
+    confidence DECIMAL(3,2) NOT NULL,
+    normalized_engagement DECIMAL(5,2) DEFAULT 0,
+    growth_rate DECIMAL(5,2) DEFAULT 0,
+    sentiment_momentum DECIMAL(5,2) DEFAULT 0,
+    audience_diversity DECIMAL(5,2) DEFAULT 0,
+    calculated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    
+    -- Scored snapshot
+    title TEXT,
+    category VARCHAR(50),
+    platform_source VARCHAR(20),
+    published_at TIMESTAMP WITH TIME ZONE,
+    snapshot_at TIMESTAMP WITH TIME ZONE,
+    view_count BIGINT DEFAULT 0,
+    
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Hourly trending summary per category/platform. Each trend counts once, in the
+-- hour of its latest scored snapshot; only buckets a write touches are recomputed.
+CREATE TABLE trending_summary (
+    category VARCHAR(50) NOT NULL,
+    platform_source VARCHAR(20) NOT NULL,
+    hour_bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    
+    content_count INTEGER NOT NULL DEFAULT 0,
+    avg_wave_score DECIMAL(5,2) DEFAULT 0,
+    max_wave_score DECIMAL(5,2) DEFAULT 0,
+    total_views BIGINT DEFAULT 0,
+    
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    PRIMARY KEY (category, platform_source, hour_bucket)
+);
+
 -- =====================================================
 -- Analysis and Intelligence Tables
 -- =====================================================
@@ -212,10 +317,9 @@ CREATE TABLE comments_analysis (
     confidence DECIMAL(3,2) DEFAULT 0.80,
     
     analyzed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
     
-    -- Foreign key to raw data
-    FOREIGN KEY (content_id) REFERENCES raw_ingestion_data(content_id)
+    -- No foreign key to raw_ingestion_data: its rows expire with their partitions
 );
 
 -- Forecasting and predictions
@@ -305,6 +409,137 @@ CREATE TABLE users (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- =====================================================
+-- Time Partitioning
+-- =====================================================
+
+-- One row per partitioned table: partition width, how far ahead partitions are
+-- created and how long they are kept. Retention drops whole partitions.
+CREATE TABLE partition_config (
+    parent_table TEXT PRIMARY KEY,
+    partition_column TEXT NOT NULL,
+    granularity TEXT NOT NULL CHECK (granularity IN ('day', 'week', 'month')),
+    premake INTEGER NOT NULL DEFAULT 3,
+    retention INTERVAL
+);
+
+INSERT INTO partition_config (parent_table, partition_column, granularity, premake, retention) VALUES
+('raw_ingestion_data', 'timestamp', 'day', 7, INTERVAL '90 days'),
+('trend_scores', 'timestamp', 'week', 4, INTERVAL '90 days'),
+('normalized_trend_bins', 'bin_timestamp', 'month', 2, INTERVAL '90 days');
+
+-- Rows outside every partition (late or far-future timestamps) land here instead of failing
+CREATE TABLE raw_ingestion_data_default PARTITION OF raw_ingestion_data DEFAULT;
+CREATE TABLE trend_scores_default PARTITION OF trend_scores DEFAULT;
+CREATE TABLE normalized_trend_bins_default PARTITION OF normalized_trend_bins DEFAULT;
+
+-- Create the partition covering for_time; returns its name, or NULL if it already exists
+CREATE OR REPLACE FUNCTION create_time_partition(parent TEXT, for_time TIMESTAMP WITH TIME ZONE)
+RETURNS TEXT AS $$
+DECLARE
+    cfg partition_config%ROWTYPE;
+    lower_bound TIMESTAMP WITH TIME ZONE;
+    upper_bound TIMESTAMP WITH TIME ZONE;
+    partition_name TEXT;
+BEGIN
+    SELECT * INTO cfg FROM partition_config WHERE parent_table = parent;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'No partition_config entry for %', parent;
+    END IF;
+    
+    lower_bound := date_trunc(cfg.granularity, for_time AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    upper_bound := lower_bound + ('1 ' || cfg.granularity)::INTERVAL;
+    partition_name := parent || '_p' || to_char(lower_bound AT TIME ZONE 'UTC', 'YYYYMMDD');
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+    
+    -- Rows already sitting in the default partition for this range move into the new
+    -- partition before it is attached; otherwise the attach would fail
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, parent);
+    EXECUTE format('WITH moved AS (DELETE FROM %I WHERE %I >= $1 AND %I < $2 RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                   parent || '_default', cfg.partition_column, cfg.partition_column, partition_name)
+        USING lower_bound, upper_bound;
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   parent, partition_name, lower_bound, upper_bound);
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Detach and drop partitions that end before the retention cutoff
+CREATE OR REPLACE FUNCTION drop_expired_partitions(parent TEXT, keep INTERVAL DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    cfg partition_config%ROWTYPE;
+    cutoff TIMESTAMP WITH TIME ZONE;
+    part RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    SELECT * INTO cfg FROM partition_config WHERE parent_table = parent;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'No partition_config entry for %', parent;
+    END IF;
+    IF COALESCE(keep, cfg.retention) IS NULL THEN
+        RETURN 0;
+    END IF;
+    cutoff := NOW() - COALESCE(keep, cfg.retention);
+    
+    FOR part IN
+        SELECT c.relname,
+               substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \(''([^'']+)''\)')::TIMESTAMP WITH TIME ZONE AS upper_bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = parent::REGCLASS
+        AND pg_get_expr(c.relpartbound, c.oid) <> 'DEFAULT'
+    LOOP
+        IF part.upper_bound <= cutoff THEN
+            EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, part.relname);
+            EXECUTE format('DROP TABLE %I', part.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+    
+    -- Stragglers older than any partition only ever reach the (small) default partition
+    EXECUTE format('DELETE FROM %I WHERE %I < $1', parent || '_default', cfg.partition_column) USING cutoff;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create upcoming partitions and drop expired ones for every configured table.
+-- Scheduled daily through pg_cron when available; the pipeline also calls it.
+CREATE OR REPLACE FUNCTION maintain_time_partitions()
+RETURNS TABLE(maintained_table TEXT, partitions_created INTEGER, partitions_dropped INTEGER) AS $$
+DECLARE
+    cfg partition_config%ROWTYPE;
+    step INTEGER;
+BEGIN
+    FOR cfg IN SELECT * FROM partition_config ORDER BY parent_table LOOP
+        maintained_table := cfg.parent_table;
+        partitions_created := 0;
+        FOR step IN 0..cfg.premake LOOP
+            IF create_time_partition(cfg.parent_table, NOW() + (step || ' ' || cfg.granularity)::INTERVAL) IS NOT NULL THEN
+                partitions_created := partitions_created + 1;
+            END IF;
+        END LOOP;
+        partitions_dropped := drop_expired_partitions(cfg.parent_table);
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+SELECT * FROM maintain_time_partitions();
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('wavescope-partition-maintenance', '5 0 * * *',
+                              'SELECT * FROM maintain_time_partitions()');
+        -- Picks up WaveScores from writers that do not call apply_wavescore_summaries
+        PERFORM cron.schedule('wavescope-summary-refresh', '*/10 * * * *',
+                              'SELECT refresh_wavescore_summaries(NOW() - INTERVAL ''15 minutes'')');
+    END IF;
+END $$;
+
 -- =====================================================
 -- Indexes for Performance
 -- =====================================================
@@ -312,9 +547,25 @@ CREATE TABLE users (
 -- Raw ingestion data indexes
 CREATE INDEX idx_raw_ingestion_timestamp ON raw_ingestion_data(timestamp DESC);
 CREATE INDEX idx_raw_ingestion_source ON raw_ingestion_data(source, platform_source);
-CREATE INDEX idx_raw_ingestion_category ON raw_ingestion_data(category);
+-- (category, timestamp) access path; INCLUDE columns let list reads skip the heap
+CREATE INDEX idx_raw_ingestion_category_ts ON raw_ingestion_data(category, timestamp DESC)
+    INCLUDE (content_id, platform_source, title);
 CREATE INDEX idx_raw_ingestion_content_id ON raw_ingestion_data(content_id);
 CREATE INDEX idx_raw_ingestion_published ON raw_ingestion_data(published_at DESC);
+CREATE INDEX idx_raw_ingestion_source_content_ts ON raw_ingestion_data(source, content_id, timestamp DESC);
+-- Substring title search (ILIKE '%term%') through pg_trgm
+CREATE INDEX idx_raw_ingestion_title_trgm ON raw_ingestion_data USING GIN (title gin_trgm_ops);
+-- Hot JSONB metric keys. Expressions match PostgREST's json arrow filters
+-- (normalized_metrics->engagement_score=gte.5), which compare as jsonb.
+CREATE INDEX idx_raw_ingestion_engagement ON raw_ingestion_data((normalized_metrics->'engagement_score'));
+CREATE INDEX idx_raw_ingestion_viral_velocity ON raw_ingestion_data((normalized_metrics->'viral_velocity'));
+CREATE INDEX idx_raw_ingestion_reach ON raw_ingestion_data((normalized_metrics->'reach_estimate'));
+CREATE INDEX idx_raw_ingestion_view_count ON raw_ingestion_data((raw_metrics->'view_count'));
+
+-- Video metadata indexes
+CREATE INDEX idx_video_metadata_category ON video_metadata(category);
+CREATE INDEX idx_video_metadata_channel ON video_metadata(channel_id);
+CREATE INDEX idx_video_metadata_title_trgm ON video_metadata USING GIN (title gin_trgm_ops);
 
 -- Trend scores indexes
 CREATE INDEX idx_trend_scores_trend_id ON trend_scores(trend_id);
@@ -338,6 +589,13 @@ CREATE INDEX idx_variants_trend_id ON trend_variants(trend_id);
 CREATE INDEX idx_variants_type ON trend_variants(variant_type);
 CREATE INDEX idx_variants_time_range ON trend_variants(time_range_start, time_range_end);
 
+-- Rollup indexes
+CREATE INDEX idx_rollups_resolution_bucket ON trend_rollups(resolution, bucket_start DESC);
+
+CREATE INDEX idx_latest_wavescores_score ON latest_wavescores(wave_score DESC);
+CREATE INDEX idx_latest_wavescores_bucket ON latest_wavescores(category, platform_source, snapshot_at);
+CREATE INDEX idx_trending_summary_hour ON trending_summary(hour_bucket DESC, avg_wave_score DESC);
+
 -- Analysis indexes
 CREATE INDEX idx_insights_analysis_date ON trend_insights(analysis_date DESC);
 CREATE INDEX idx_insights_category ON trend_insights(category);
@@ -377,6 +635,10 @@ CREATE TRIGGER update_raw_ingestion_updated_at
     BEFORE UPDATE ON raw_ingestion_data 
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_video_metadata_updated_at 
+    BEFORE UPDATE ON video_metadata 
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_users_updated_at 
     BEFORE UPDATE ON users 
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -385,44 +647,8 @@ CREATE TRIGGER update_users_updated_at
 -- Views for Common Queries
 -- =====================================================
 
--- Latest WaveScores with trend information
-CREATE VIEW latest_wavescores AS
-SELECT 
-    w.trend_id,
-    w.wave_score,
-    w.confidence,
-    w.normalized_engagement,
-    w.growth_rate,
-    w.sentiment_momentum,
-    w.audience_diversity,
-    w.calculated_at,
-    r.title,
-    r.category,
-    r.platform_source,
-    r.published_at
-FROM wavescores w
-JOIN raw_ingestion_data r ON w.content_id = r.content_id
-WHERE w.calculated_at = (
-    SELECT MAX(calculated_at) 
-    FROM wavescores w2 
-    WHERE w2.trend_id = w.trend_id
-);
-
--- Trending content summary
-CREATE VIEW trending_summary AS
-SELECT 
-    r.category,
-    r.platform_source,
-    COUNT(*) as content_count,
-    AVG(w.wave_score) as avg_wave_score,
-    MAX(w.wave_score) as max_wave_score,
-    SUM(CAST(r.raw_metrics->>'view_count' AS BIGINT)) as total_views,
-    DATE_TRUNC('hour', r.timestamp) as hour_bucket
-FROM raw_ingestion_data r
-JOIN wavescores w ON r.content_id = w.content_id
-WHERE r.timestamp >= NOW() - INTERVAL '24 hours'
-GROUP BY r.category, r.platform_source, DATE_TRUNC('hour', r.timestamp)
-ORDER BY hour_bucket DESC, avg_wave_score DESC;
+-- latest_wavescores and trending_summary are tables maintained incrementally;
+-- see apply_wavescore_summaries() below
 
 -- Anomaly summary view
 CREATE VIEW recent_anomalies AS
@@ -445,62 +671,205 @@ ORDER BY a.detection_timestamp DESC, a.anomaly_score DESC;
 -- =====================================================
 
 -- Function to clean old data
+-- Partitioned time-series tables drop whole partitions past the cutoff instead of
+-- deleting rows; returns the number of partitions dropped
 CREATE OR REPLACE FUNCTION cleanup_old_data(days_to_keep INTEGER DEFAULT 90)
 RETURNS INTEGER AS $$
 DECLARE
-    deleted_count INTEGER := 0;
-    cutoff_date TIMESTAMP WITH TIME ZONE;
+    dropped_count INTEGER := 0;
+    parent TEXT;
 BEGIN
-    cutoff_date := NOW() - (days_to_keep || ' days')::INTERVAL;
+    FOR parent IN SELECT parent_table FROM partition_config LOOP
+        dropped_count := dropped_count + drop_expired_partitions(parent, (days_to_keep || ' days')::INTERVAL);
+    END LOOP;
     
-    -- Clean old raw ingestion data
-    DELETE FROM raw_ingestion_data 
-    WHERE timestamp < cutoff_date;
-    GET DIAGNOSTICS deleted_count = ROW_COUNT;
-    
-    -- Clean old trend scores
-    DELETE FROM trend_scores 
-    WHERE timestamp < cutoff_date;
-    
-    -- Clean old normalized bins
-    DELETE FROM normalized_trend_bins 
-    WHERE bin_timestamp < cutoff_date;
+    -- Summaries of trends not scored within the window expire with their buckets
+    DELETE FROM latest_wavescores
+    WHERE calculated_at < NOW() - (days_to_keep || ' days')::INTERVAL;
+    DELETE FROM trending_summary
+    WHERE hour_bucket < NOW() - (days_to_keep || ' days')::INTERVAL;
     
     -- Clean old forecasts
     DELETE FROM forecast 
     WHERE valid_until < NOW();
     
-    RETURN deleted_count;
+    RETURN dropped_count;
 END;
 $$ LANGUAGE plpgsql;
 
--- Function to calculate trend statistics
+-- Fold newly written WaveScores into latest_wavescores and recompute only the
+-- trending_summary buckets those trends leave or enter. entries is a JSON array of
+-- latest_wavescores rows; the Python WaveScore engine sends one per write batch.
+CREATE OR REPLACE FUNCTION apply_wavescore_summaries(entries JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    touched JSONB;
+    applied INTEGER := 0;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS incoming_wavescores (LIKE latest_wavescores) ON COMMIT DROP;
+    TRUNCATE incoming_wavescores;
+    INSERT INTO incoming_wavescores
+    SELECT DISTINCT ON (e.trend_id) e.*
+    FROM jsonb_populate_recordset(NULL::latest_wavescores, entries) e
+    WHERE e.trend_id IS NOT NULL
+    ORDER BY e.trend_id, e.calculated_at DESC;
+    
+    -- Buckets the trends are leaving, captured before their rows change
+    SELECT jsonb_agg(DISTINCT jsonb_build_object(
+               'category', l.category, 'platform_source', l.platform_source,
+               'hour_bucket', date_trunc('hour', l.snapshot_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'))
+    INTO touched
+    FROM latest_wavescores l
+    JOIN incoming_wavescores i ON i.trend_id = l.trend_id AND i.calculated_at >= l.calculated_at
+    WHERE l.snapshot_at IS NOT NULL;
+    
+    INSERT INTO latest_wavescores AS l (trend_id, content_id, wave_score, confidence, normalized_engagement,
+        growth_rate, sentiment_momentum, audience_diversity, calculated_at, title, category,
+        platform_source, published_at, snapshot_at, view_count, updated_at)
+    SELECT trend_id, content_id, wave_score, confidence, normalized_engagement,
+        growth_rate, sentiment_momentum, audience_diversity, calculated_at, title, category,
+        platform_source, published_at, snapshot_at, COALESCE(view_count, 0), NOW()
+    FROM incoming_wavescores
+    ON CONFLICT (trend_id) DO UPDATE SET
+        content_id = EXCLUDED.content_id,
+        wave_score = EXCLUDED.wave_score,
+        confidence = EXCLUDED.confidence,
+        normalized_engagement = EXCLUDED.normalized_engagement,
+        growth_rate = EXCLUDED.growth_rate,
+        sentiment_momentum = EXCLUDED.sentiment_momentum,
+        audience_diversity = EXCLUDED.audience_diversity,
+        calculated_at = EXCLUDED.calculated_at,
+        title = EXCLUDED.title,
+        category = EXCLUDED.category,
+        platform_source = EXCLUDED.platform_source,
+        published_at = EXCLUDED.published_at,
+        snapshot_at = EXCLUDED.snapshot_at,
+        view_count = EXCLUDED.view_count,
+        updated_at = NOW()
+    WHERE l.calculated_at <= EXCLUDED.calculated_at;
+    GET DIAGNOSTICS applied = ROW_COUNT;
+    
+    -- ...plus the buckets they enter
+    SELECT COALESCE(touched, '[]'::JSONB) || COALESCE(jsonb_agg(DISTINCT jsonb_build_object(
+               'category', category, 'platform_source', platform_source,
+               'hour_bucket', date_trunc('hour', snapshot_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC')), '[]'::JSONB)
+    INTO touched
+    FROM incoming_wavescores
+    WHERE snapshot_at IS NOT NULL;
+    
+    WITH buckets AS (
+        SELECT DISTINCT b.category, b.platform_source, b.hour_bucket
+        FROM jsonb_to_recordset(touched) AS b(category VARCHAR(50), platform_source VARCHAR(20),
+                                              hour_bucket TIMESTAMP WITH TIME ZONE)
+        WHERE b.category IS NOT NULL AND b.platform_source IS NOT NULL
+    )
+    INSERT INTO trending_summary (category, platform_source, hour_bucket, content_count,
+                                  avg_wave_score, max_wave_score, total_views, updated_at)
+    SELECT b.category, b.platform_source, b.hour_bucket, COUNT(l.trend_id),
+           COALESCE(AVG(l.wave_score), 0), COALESCE(MAX(l.wave_score), 0), COALESCE(SUM(l.view_count), 0), NOW()
+    FROM buckets b
+    LEFT JOIN latest_wavescores l
+        ON l.category = b.category AND l.platform_source = b.platform_source
+        AND l.snapshot_at >= b.hour_bucket AND l.snapshot_at < b.hour_bucket + INTERVAL '1 hour'
+    GROUP BY b.category, b.platform_source, b.hour_bucket
+    ON CONFLICT (category, platform_source, hour_bucket) DO UPDATE SET
+        content_count = EXCLUDED.content_count,
+        avg_wave_score = EXCLUDED.avg_wave_score,
+        max_wave_score = EXCLUDED.max_wave_score,
+        total_views = EXCLUDED.total_views,
+        updated_at = NOW();
+    
+    DELETE FROM trending_summary t
+    USING jsonb_to_recordset(touched) AS b(category VARCHAR(50), platform_source VARCHAR(20),
+                                           hour_bucket TIMESTAMP WITH TIME ZONE)
+    WHERE t.category = b.category AND t.platform_source = b.platform_source
+    AND t.hour_bucket = b.hour_bucket AND t.content_count = 0;
+    RETURN applied;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Refresh job for writers that do not maintain the summaries themselves (the JS
+-- generators) and for backfills: only trends scored since changed_since are touched
+CREATE OR REPLACE FUNCTION refresh_wavescore_summaries(
+    changed_since TIMESTAMP WITH TIME ZONE DEFAULT NOW() - INTERVAL '1 hour'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    entries JSONB;
+BEGIN
+    SELECT COALESCE(jsonb_agg(to_jsonb(x)), '[]'::JSONB) INTO entries
+    FROM (
+        SELECT DISTINCT ON (w.trend_id)
+            w.trend_id, w.content_id, w.wave_score, w.confidence, w.normalized_engagement,
+            w.growth_rate, w.sentiment_momentum, w.audience_diversity, w.calculated_at,
+            r.title, r.category, r.platform_source, r.published_at,
+            r.timestamp AS snapshot_at,
+            (r.raw_metrics->>'view_count')::NUMERIC::BIGINT AS view_count
+        FROM wavescores w
+        LEFT JOIN LATERAL (
+            SELECT title, category, platform_source, published_at, timestamp, raw_metrics
+            FROM raw_ingestion_data
+            WHERE content_id = w.content_id AND timestamp <= w.calculated_at
+            ORDER BY timestamp DESC
+            LIMIT 1
+        ) r ON TRUE
+        WHERE w.calculated_at >= changed_since
+        ORDER BY w.trend_id, w.calculated_at DESC
+    ) x;
+    RETURN apply_wavescore_summaries(entries);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Trend statistics for many trends in one pass over trend_scores. The
+-- UNIQUE(trend_id, timestamp) index serves the trend_id/time filter, and the
+-- direction comes from the least-squares slope (score points per hour) instead
+-- of comparing an aggregate with itself.
+DROP FUNCTION IF EXISTS calculate_trend_stats(VARCHAR, INTEGER);
 CREATE OR REPLACE FUNCTION calculate_trend_stats(
-    trend_id_param VARCHAR(150),
-    hours_back INTEGER DEFAULT 24
+    trend_ids TEXT[],
+    hours_back INTEGER DEFAULT 24,
+    flat_slope DOUBLE PRECISION DEFAULT 0.1
 )
 RETURNS TABLE(
+    trend_id VARCHAR(150),
+    point_count INTEGER,
     avg_score DECIMAL(5,2),
     max_score DECIMAL(5,2),
-    trend_direction VARCHAR(10),
-    volatility DECIMAL(5,2)
+    latest_score DECIMAL(5,2),
+    volatility DECIMAL(5,2),
+    slope_per_hour DOUBLE PRECISION,
+    trend_direction VARCHAR(10)
 ) AS $$
-BEGIN
-    RETURN QUERY
     SELECT 
-        AVG(normalized_trend_score)::DECIMAL(5,2) as avg_score,
-        MAX(normalized_trend_score)::DECIMAL(5,2) as max_score,
-        CASE 
-            WHEN AVG(normalized_trend_score) > LAG(AVG(normalized_trend_score)) OVER (ORDER BY timestamp) THEN 'rising'
-            WHEN AVG(normalized_trend_score) < LAG(AVG(normalized_trend_score)) OVER (ORDER BY timestamp) THEN 'falling'
+        s.trend_id,
+        s.point_count,
+        s.avg_score,
+        s.max_score,
+        s.latest_score,
+        s.volatility,
+        s.slope_per_hour,
+        (CASE 
+            WHEN s.slope_per_hour > flat_slope THEN 'rising'
+            WHEN s.slope_per_hour < -flat_slope THEN 'falling'
             ELSE 'stable'
-        END::VARCHAR(10) as trend_direction,
-        STDDEV(normalized_trend_score)::DECIMAL(5,2) as volatility
-    FROM trend_scores 
-    WHERE trend_id = trend_id_param 
-    AND timestamp >= NOW() - (hours_back || ' hours')::INTERVAL;
-END;
-$$ LANGUAGE plpgsql;
+        END)::VARCHAR(10)
+    FROM (
+        SELECT 
+            ts.trend_id,
+            COUNT(*)::INTEGER AS point_count,
+            AVG(ts.normalized_trend_score)::DECIMAL(5,2) AS avg_score,
+            MAX(ts.normalized_trend_score)::DECIMAL(5,2) AS max_score,
+            (ARRAY_AGG(ts.normalized_trend_score ORDER BY ts.timestamp DESC))[1]::DECIMAL(5,2) AS latest_score,
+            COALESCE(STDDEV_SAMP(ts.normalized_trend_score), 0)::DECIMAL(5,2) AS volatility,
+            -- NULL with fewer than two distinct timestamps; treated as flat
+            COALESCE(REGR_SLOPE(ts.normalized_trend_score::DOUBLE PRECISION,
+                                EXTRACT(EPOCH FROM ts.timestamp) / 3600.0), 0) AS slope_per_hour
+        FROM trend_scores ts
+        WHERE ts.trend_id = ANY(trend_ids)
+        AND ts.timestamp >= NOW() - hours_back * INTERVAL '1 hour'
+        GROUP BY ts.trend_id
+    ) s;
+$$ LANGUAGE sql STABLE;
 
 -- =====================================================
 -- Security and Permissions
@@ -525,15 +894,20 @@ ON CONFLICT (trend_name, analysis_date) DO NOTHING;
 
 -- Comments
 COMMENT ON TABLE raw_ingestion_data IS 'Raw data ingested from various social media platforms';
+COMMENT ON TABLE video_metadata IS 'Static video metadata stored once per content_id; snapshots live in raw_ingestion_data';
 COMMENT ON TABLE trend_scores IS 'Time-series scoring data for trend analysis';
 COMMENT ON TABLE normalized_trend_bins IS 'Aggregated trend data in temporal bins';
 COMMENT ON TABLE wavescores IS 'Advanced WaveScore calculations with multi-factor analysis';
 COMMENT ON TABLE trend_variants IS 'Historical variants and projections for trends';
+COMMENT ON TABLE latest_wavescores IS 'Latest WaveScore per trend, maintained at write time';
+COMMENT ON TABLE trending_summary IS 'Hourly category/platform WaveScore summary, maintained incrementally';
+COMMENT ON TABLE trend_rollups IS 'Hourly, daily and weekly WaveScore aggregates maintained incrementally';
 COMMENT ON TABLE trend_insights IS 'High-level trend insights and cultural analysis';
 COMMENT ON TABLE comments_analysis IS 'Sentiment analysis results from content and comments';
 COMMENT ON TABLE forecast IS 'Predictive analytics and forecasting results';
 COMMENT ON TABLE anomaly_detection IS 'Anomaly detection and spike identification';
 COMMENT ON TABLE users IS 'User management and preferences';
+COMMENT ON TABLE partition_config IS 'Partition width, premake and retention for the time-partitioned tables';
 
 -- Schema version for migration tracking
 CREATE TABLE IF NOT EXISTS schema_migrations (
@@ -541,7 +915,8 @@ CREATE TABLE IF NOT EXISTS schema_migrations (
     applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
-INSERT INTO schema_migrations (version) VALUES ('enhanced_v1.0.0') 
+INSERT INTO schema_migrations (version) VALUES ('enhanced_v1.0.0'), ('enhanced_v1.1.0_partitioned'),
+('enhanced_v1.2.0_summaries'), ('enhanced_v1.3.0_search_indexes') 
 ON CONFLICT (version) DO NOTHING;
 
 -- Success message
@@ -0,0 +1,314 @@
+-- WaveScope migration: time-partition the high-volume tables
+-- Converts an existing enhanced_v1.0.0 database (plain raw_ingestion_data,
+-- trend_scores and normalized_trend_bins) to the partitioned layout of
+-- enhanced_supabase_schema.sql without losing data.
+--
+-- Run once, in a quiet window (writers pause for the duration of the copy):
+--   psql "$DATABASE_URL" -f CONFIG/partition_migration.sql
+-- The old tables are kept as *_unpartitioned until you drop them at the end.
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM schema_migrations WHERE version = 'enhanced_v1.1.0_partitioned') THEN
+        RAISE EXCEPTION 'Partition migration already applied';
+    END IF;
+END $$;
+
+-- Views and the comments_analysis foreign key reference the old tables
+DROP VIEW IF EXISTS latest_wavescores;
+DROP VIEW IF EXISTS trending_summary;
+DROP VIEW IF EXISTS recent_anomalies;
+ALTER TABLE comments_analysis DROP CONSTRAINT IF EXISTS comments_analysis_content_id_fkey;
+
+-- =====================================================
+-- Move the old tables aside
+-- =====================================================
+
+ALTER TABLE raw_ingestion_data RENAME TO raw_ingestion_data_unpartitioned;
+ALTER TABLE trend_scores RENAME TO trend_scores_unpartitioned;
+ALTER TABLE normalized_trend_bins RENAME TO normalized_trend_bins_unpartitioned;
+
+-- Index and constraint names must be free for the new tables
+DO $$
+DECLARE
+    idx RECORD;
+BEGIN
+    FOR idx IN
+        SELECT i.indexname, i.tablename FROM pg_indexes i
+        WHERE i.schemaname = 'public'
+        AND i.tablename IN ('raw_ingestion_data_unpartitioned', 'trend_scores_unpartitioned',
+                            'normalized_trend_bins_unpartitioned')
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', idx.indexname, left(idx.indexname, 50) || '_unpart');
+    END LOOP;
+END $$;
+DROP TRIGGER IF EXISTS update_raw_ingestion_updated_at ON raw_ingestion_data_unpartitioned;
+
+-- =====================================================
+-- Partitioned tables (same columns as before)
+-- =====================================================
+
+CREATE TABLE raw_ingestion_data (LIKE raw_ingestion_data_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (id, timestamp),
+    UNIQUE(content_id, source, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE trend_scores (LIKE trend_scores_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (id, timestamp),
+    UNIQUE(trend_id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE normalized_trend_bins (LIKE normalized_trend_bins_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (id, bin_timestamp),
+    UNIQUE(bin_timestamp, platform_source, category)
+) PARTITION BY RANGE (bin_timestamp);
+
+CREATE TABLE raw_ingestion_data_default PARTITION OF raw_ingestion_data DEFAULT;
+CREATE TABLE trend_scores_default PARTITION OF trend_scores DEFAULT;
+CREATE TABLE normalized_trend_bins_default PARTITION OF normalized_trend_bins DEFAULT;
+
+-- partition_config and the partition functions, as in the full schema
+CREATE TABLE IF NOT EXISTS partition_config (
+    parent_table TEXT PRIMARY KEY,
+    partition_column TEXT NOT NULL,
+    granularity TEXT NOT NULL CHECK (granularity IN ('day', 'week', 'month')),
+    premake INTEGER NOT NULL DEFAULT 3,
+    retention INTERVAL
+);
+
+INSERT INTO partition_config (parent_table, partition_column, granularity, premake, retention) VALUES
+('raw_ingestion_data', 'timestamp', 'day', 7, INTERVAL '90 days'),
+('trend_scores', 'timestamp', 'week', 4, INTERVAL '90 days'),
+('normalized_trend_bins', 'bin_timestamp', 'month', 2, INTERVAL '90 days')
+ON CONFLICT (parent_table) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION create_time_partition(parent TEXT, for_time TIMESTAMP WITH TIME ZONE)
+RETURNS TEXT AS $$
+DECLARE
+    cfg partition_config%ROWTYPE;
+    lower_bound TIMESTAMP WITH TIME ZONE;
+    upper_bound TIMESTAMP WITH TIME ZONE;
+    partition_name TEXT;
+BEGIN
+    SELECT * INTO cfg FROM partition_config WHERE parent_table = parent;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'No partition_config entry for %', parent;
+    END IF;
+
+    lower_bound := date_trunc(cfg.granularity, for_time AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    upper_bound := lower_bound + ('1 ' || cfg.granularity)::INTERVAL;
+    partition_name := parent || '_p' || to_char(lower_bound AT TIME ZONE 'UTC', 'YYYYMMDD');
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name, parent);
+    EXECUTE format('WITH moved AS (DELETE FROM %I WHERE %I >= $1 AND %I < $2 RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                   parent || '_default', cfg.partition_column, cfg.partition_column, partition_name)
+        USING lower_bound, upper_bound;
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   parent, partition_name, lower_bound, upper_bound);
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION drop_expired_partitions(parent TEXT, keep INTERVAL DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    cfg partition_config%ROWTYPE;
+    cutoff TIMESTAMP WITH TIME ZONE;
+    part RECORD;
+    dropped INTEGER := 0;
+BEGIN
+    SELECT * INTO cfg FROM partition_config WHERE parent_table = parent;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'No partition_config entry for %', parent;
+    END IF;
+    IF COALESCE(keep, cfg.retention) IS NULL THEN
+        RETURN 0;
+    END IF;
+    cutoff := NOW() - COALESCE(keep, cfg.retention);
+
+    FOR part IN
+        SELECT c.relname,
+               substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \(''([^'']+)''\)')::TIMESTAMP WITH TIME ZONE AS upper_bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = parent::REGCLASS
+        AND pg_get_expr(c.relpartbound, c.oid) <> 'DEFAULT'
+    LOOP
+        IF part.upper_bound <= cutoff THEN
+            EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, part.relname);
+            EXECUTE format('DROP TABLE %I', part.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+
+    EXECUTE format('DELETE FROM %I WHERE %I < $1', parent || '_default', cfg.partition_column) USING cutoff;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_time_partitions()
+RETURNS TABLE(maintained_table TEXT, partitions_created INTEGER, partitions_dropped INTEGER) AS $$
+DECLARE
+    cfg partition_config%ROWTYPE;
+    step INTEGER;
+BEGIN
+    FOR cfg IN SELECT * FROM partition_config ORDER BY parent_table LOOP
+        maintained_table := cfg.parent_table;
+        partitions_created := 0;
+        FOR step IN 0..cfg.premake LOOP
+            IF create_time_partition(cfg.parent_table, NOW() + (step || ' ' || cfg.granularity)::INTERVAL) IS NOT NULL THEN
+                partitions_created := partitions_created + 1;
+            END IF;
+        END LOOP;
+        partitions_dropped := drop_expired_partitions(cfg.parent_table);
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- =====================================================
+-- Create partitions for the retained history and copy it over
+-- =====================================================
+
+-- Rows older than the retention window are not copied; they would be dropped anyway
+DO $$
+DECLARE
+    cfg partition_config%ROWTYPE;
+    bucket TIMESTAMP WITH TIME ZONE;
+    oldest TIMESTAMP WITH TIME ZONE;
+    copied BIGINT;
+BEGIN
+    FOR cfg IN SELECT * FROM partition_config ORDER BY parent_table LOOP
+        EXECUTE format('SELECT MIN(%I) FROM %I', cfg.partition_column, cfg.parent_table || '_unpartitioned') INTO oldest;
+        oldest := GREATEST(oldest, NOW() - COALESCE(cfg.retention, NOW() - oldest));
+        bucket := oldest;
+        WHILE bucket IS NOT NULL AND bucket < NOW() + (cfg.premake || ' ' || cfg.granularity)::INTERVAL LOOP
+            PERFORM create_time_partition(cfg.parent_table, bucket);
+            bucket := bucket + ('1 ' || cfg.granularity)::INTERVAL;
+        END LOOP;
+
+        EXECUTE format('INSERT INTO %I SELECT * FROM %I WHERE %I >= $1',
+                       cfg.parent_table, cfg.parent_table || '_unpartitioned', cfg.partition_column)
+            USING COALESCE(oldest, '-infinity'::TIMESTAMP WITH TIME ZONE);
+        GET DIAGNOSTICS copied = ROW_COUNT;
+        RAISE NOTICE 'Copied % rows into partitioned %', copied, cfg.parent_table;
+    END LOOP;
+END $$;
+
+SELECT * FROM maintain_time_partitions();
+
+-- =====================================================
+-- Indexes, triggers, views and retention
+-- =====================================================
+
+CREATE INDEX idx_raw_ingestion_timestamp ON raw_ingestion_data(timestamp DESC);
+CREATE INDEX idx_raw_ingestion_source ON raw_ingestion_data(source, platform_source);
+CREATE INDEX idx_raw_ingestion_category ON raw_ingestion_data(category);
+CREATE INDEX idx_raw_ingestion_content_id ON raw_ingestion_data(content_id);
+CREATE INDEX idx_raw_ingestion_published ON raw_ingestion_data(published_at DESC);
+CREATE INDEX idx_raw_ingestion_source_content_ts ON raw_ingestion_data(source, content_id, timestamp DESC);
+
+CREATE INDEX idx_trend_scores_trend_id ON trend_scores(trend_id);
+CREATE INDEX idx_trend_scores_timestamp ON trend_scores(timestamp DESC);
+CREATE INDEX idx_trend_scores_platform ON trend_scores(platform_source);
+CREATE INDEX idx_trend_scores_score ON trend_scores(normalized_trend_score DESC);
+
+CREATE INDEX idx_normalized_bins_timestamp ON normalized_trend_bins(bin_timestamp DESC);
+CREATE INDEX idx_normalized_bins_platform_category ON normalized_trend_bins(platform_source, category);
+CREATE INDEX idx_normalized_bins_score ON normalized_trend_bins(avg_normalized_score DESC);
+
+CREATE TRIGGER update_raw_ingestion_updated_at
+    BEFORE UPDATE ON raw_ingestion_data
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE VIEW latest_wavescores AS
+SELECT
+    w.trend_id,
+    w.wave_score,
+    w.confidence,
+    w.normalized_engagement,
+    w.growth_rate,
+    w.sentiment_momentum,
+    w.audience_diversity,
+    w.calculated_at,
+    r.title,
+    r.category,
+    r.platform_source,
+    r.published_at
+FROM wavescores w
+JOIN raw_ingestion_data r ON w.content_id = r.content_id
+WHERE w.calculated_at = (
+    SELECT MAX(calculated_at)
+    FROM wavescores w2
+    WHERE w2.trend_id = w.trend_id
+);
+
+CREATE VIEW trending_summary AS
+SELECT
+    r.category,
+    r.platform_source,
+    COUNT(*) as content_count,
+    AVG(w.wave_score) as avg_wave_score,
+    MAX(w.wave_score) as max_wave_score,
+    SUM(CAST(r.raw_metrics->>'view_count' AS BIGINT)) as total_views,
+    DATE_TRUNC('hour', r.timestamp) as hour_bucket
+FROM raw_ingestion_data r
+JOIN wavescores w ON r.content_id = w.content_id
+WHERE r.timestamp >= NOW() - INTERVAL '24 hours'
+GROUP BY r.category, r.platform_source, DATE_TRUNC('hour', r.timestamp)
+ORDER BY hour_bucket DESC, avg_wave_score DESC;
+
+CREATE VIEW recent_anomalies AS
+SELECT
+    a.trend_id,
+    a.anomaly_type,
+    a.severity,
+    a.anomaly_score,
+    a.detection_timestamp,
+    r.title,
+    r.category,
+    r.platform_source
+FROM anomaly_detection a
+JOIN raw_ingestion_data r ON a.trend_id = CONCAT(r.source, '_', r.content_id)
+WHERE a.detection_timestamp >= NOW() - INTERVAL '7 days'
+ORDER BY a.detection_timestamp DESC, a.anomaly_score DESC;
+
+CREATE OR REPLACE FUNCTION cleanup_old_data(days_to_keep INTEGER DEFAULT 90)
+RETURNS INTEGER AS $$
+DECLARE
+    dropped_count INTEGER := 0;
+    parent TEXT;
+BEGIN
+    FOR parent IN SELECT parent_table FROM partition_config LOOP
+        dropped_count := dropped_count + drop_expired_partitions(parent, (days_to_keep || ' days')::INTERVAL);
+    END LOOP;
+
+    DELETE FROM forecast
+    WHERE valid_until < NOW();
+
+    RETURN dropped_count;
+END;
+$$ LANGUAGE plpgsql;
+
+INSERT INTO schema_migrations (version) VALUES ('enhanced_v1.1.0_partitioned')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
+
+-- Outside the transaction: schedule maintenance if pg_cron is installed
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('wavescope-partition-maintenance', '5 0 * * *',
+                              'SELECT * FROM maintain_time_partitions()');
+    END IF;
+END $$;
+
+-- After checking row counts, reclaim the space of the old tables:
+--   DROP TABLE raw_ingestion_data_unpartitioned, trend_scores_unpartitioned,
+--              normalized_trend_bins_unpartitioned;
@@ -0,0 +1,25 @@
+-- WaveScope migration: title search, JSONB metric and covering indexes
+-- Apply after partition_migration.sql:
+--   psql "$DATABASE_URL" -f CONFIG/search_index_migration.sql
+-- Indexes on a partitioned parent cannot be built CONCURRENTLY; each partition's
+-- index is built under a write lock on that partition, so run this off-peak.
+
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+CREATE INDEX IF NOT EXISTS idx_raw_ingestion_category_ts ON raw_ingestion_data(category, timestamp DESC)
+    INCLUDE (content_id, platform_source, title);
+-- Superseded by the (category, timestamp) index above
+DROP INDEX IF EXISTS idx_raw_ingestion_category;
+
+CREATE INDEX IF NOT EXISTS idx_raw_ingestion_title_trgm ON raw_ingestion_data USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_raw_ingestion_engagement ON raw_ingestion_data((normalized_metrics->'engagement_score'));
+CREATE INDEX IF NOT EXISTS idx_raw_ingestion_viral_velocity ON raw_ingestion_data((normalized_metrics->'viral_velocity'));
+CREATE INDEX IF NOT EXISTS idx_raw_ingestion_reach ON raw_ingestion_data((normalized_metrics->'reach_estimate'));
+CREATE INDEX IF NOT EXISTS idx_raw_ingestion_view_count ON raw_ingestion_data((raw_metrics->'view_count'));
+CREATE INDEX IF NOT EXISTS idx_video_metadata_title_trgm ON video_metadata USING GIN (title gin_trgm_ops);
+
+ANALYZE raw_ingestion_data;
+ANALYZE video_metadata;
+
+INSERT INTO schema_migrations (version) VALUES ('enhanced_v1.3.0_search_indexes')
+ON CONFLICT (version) DO NOTHING;
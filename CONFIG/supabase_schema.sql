@@ -197,7 +197,8 @@ CREATE TABLE IF NOT EXISTS trend_insights (
     geographic_regions TEXT,
     influencer_involvement TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    UNIQUE(trend_name, analysis_date::DATE)
+    -- analysis_date is the start of a snapshot bucket (see save_trend_insights)
+    UNIQUE(trend_name, analysis_date)
 );
 
 -- Create indexes for trend insights
@@ -0,0 +1,224 @@
+-- WaveScope migration: incrementally maintained dashboard summaries
+-- Replaces the latest_wavescores and trending_summary views, which re-scanned
+-- wavescores and raw_ingestion_data on every read, with tables kept current at
+-- write time. Apply after partition_migration.sql:
+--   psql "$DATABASE_URL" -f CONFIG/wavescore_summary_migration.sql
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM schema_migrations WHERE version = 'enhanced_v1.2.0_summaries') THEN
+        RAISE EXCEPTION 'Summary migration already applied';
+    END IF;
+END $$;
+
+DROP VIEW IF EXISTS latest_wavescores;
+DROP VIEW IF EXISTS trending_summary;
+
+-- Latest WaveScore per trend with its content details, kept current at write time
+-- (apply_wavescore_summaries) so dashboard reads never scan wavescores history
+CREATE TABLE latest_wavescores (
+    trend_id VARCHAR(150) PRIMARY KEY,
+    content_id VARCHAR(100) NOT NULL,
+    wave_score DECIMAL(5,2) NOT NULL,
+    confidence DECIMAL(3,2) NOT NULL,
+    normalized_engagement DECIMAL(5,2) DEFAULT 0,
+    growth_rate DECIMAL(5,2) DEFAULT 0,
+    sentiment_momentum DECIMAL(5,2) DEFAULT 0,
+    audience_diversity DECIMAL(5,2) DEFAULT 0,
+    calculated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    
+    -- Scored snapshot
+    title TEXT,
+    category VARCHAR(50),
+    platform_source VARCHAR(20),
+    published_at TIMESTAMP WITH TIME ZONE,
+    snapshot_at TIMESTAMP WITH TIME ZONE,
+    view_count BIGINT DEFAULT 0,
+    
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Hourly trending summary per category/platform. Each trend counts once, in the
+-- hour of its latest scored snapshot; only buckets a write touches are recomputed.
+CREATE TABLE trending_summary (
+    category VARCHAR(50) NOT NULL,
+    platform_source VARCHAR(20) NOT NULL,
+    hour_bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    
+    content_count INTEGER NOT NULL DEFAULT 0,
+    avg_wave_score DECIMAL(5,2) DEFAULT 0,
+    max_wave_score DECIMAL(5,2) DEFAULT 0,
+    total_views BIGINT DEFAULT 0,
+    
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    
+    PRIMARY KEY (category, platform_source, hour_bucket)
+);
+
+CREATE INDEX idx_latest_wavescores_score ON latest_wavescores(wave_score DESC);
+CREATE INDEX idx_latest_wavescores_bucket ON latest_wavescores(category, platform_source, snapshot_at);
+CREATE INDEX idx_trending_summary_hour ON trending_summary(hour_bucket DESC, avg_wave_score DESC);
+
+-- Fold newly written WaveScores into latest_wavescores and recompute only the
+-- trending_summary buckets those trends leave or enter. entries is a JSON array of
+-- latest_wavescores rows; the Python WaveScore engine sends one per write batch.
+CREATE OR REPLACE FUNCTION apply_wavescore_summaries(entries JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    touched JSONB;
+    applied INTEGER := 0;
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS incoming_wavescores (LIKE latest_wavescores) ON COMMIT DROP;
+    TRUNCATE incoming_wavescores;
+    INSERT INTO incoming_wavescores
+    SELECT DISTINCT ON (e.trend_id) e.*
+    FROM jsonb_populate_recordset(NULL::latest_wavescores, entries) e
+    WHERE e.trend_id IS NOT NULL
+    ORDER BY e.trend_id, e.calculated_at DESC;
+    
+    -- Buckets the trends are leaving, captured before their rows change
+    SELECT jsonb_agg(DISTINCT jsonb_build_object(
+               'category', l.category, 'platform_source', l.platform_source,
+               'hour_bucket', date_trunc('hour', l.snapshot_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'))
+    INTO touched
+    FROM latest_wavescores l
+    JOIN incoming_wavescores i ON i.trend_id = l.trend_id AND i.calculated_at >= l.calculated_at
+    WHERE l.snapshot_at IS NOT NULL;
+    
+    INSERT INTO latest_wavescores AS l (trend_id, content_id, wave_score, confidence, normalized_engagement,
+        growth_rate, sentiment_momentum, audience_diversity, calculated_at, title, category,
+        platform_source, published_at, snapshot_at, view_count, updated_at)
+    SELECT trend_id, content_id, wave_score, confidence, normalized_engagement,
+        growth_rate, sentiment_momentum, audience_diversity, calculated_at, title, category,
+        platform_source, published_at, snapshot_at, COALESCE(view_count, 0), NOW()
+    FROM incoming_wavescores
+    ON CONFLICT (trend_id) DO UPDATE SET
+        content_id = EXCLUDED.content_id,
+        wave_score = EXCLUDED.wave_score,
+        confidence = EXCLUDED.confidence,
+        normalized_engagement = EXCLUDED.normalized_engagement,
+        growth_rate = EXCLUDED.growth_rate,
+        sentiment_momentum = EXCLUDED.sentiment_momentum,
+        audience_diversity = EXCLUDED.audience_diversity,
+        calculated_at = EXCLUDED.calculated_at,
+        title = EXCLUDED.title,
+        category = EXCLUDED.category,
+        platform_source = EXCLUDED.platform_source,
+        published_at = EXCLUDED.published_at,
+        snapshot_at = EXCLUDED.snapshot_at,
+        view_count = EXCLUDED.view_count,
+        updated_at = NOW()
+    WHERE l.calculated_at <= EXCLUDED.calculated_at;
+    GET DIAGNOSTICS applied = ROW_COUNT;
+    
+    -- ...plus the buckets they enter
+    SELECT COALESCE(touched, '[]'::JSONB) || COALESCE(jsonb_agg(DISTINCT jsonb_build_object(
+               'category', category, 'platform_source', platform_source,
+               'hour_bucket', date_trunc('hour', snapshot_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC')), '[]'::JSONB)
+    INTO touched
+    FROM incoming_wavescores
+    WHERE snapshot_at IS NOT NULL;
+    
+    WITH buckets AS (
+        SELECT DISTINCT b.category, b.platform_source, b.hour_bucket
+        FROM jsonb_to_recordset(touched) AS b(category VARCHAR(50), platform_source VARCHAR(20),
+                                              hour_bucket TIMESTAMP WITH TIME ZONE)
+        WHERE b.category IS NOT NULL AND b.platform_source IS NOT NULL
+    )
+    INSERT INTO trending_summary (category, platform_source, hour_bucket, content_count,
+                                  avg_wave_score, max_wave_score, total_views, updated_at)
+    SELECT b.category, b.platform_source, b.hour_bucket, COUNT(l.trend_id),
+           COALESCE(AVG(l.wave_score), 0), COALESCE(MAX(l.wave_score), 0), COALESCE(SUM(l.view_count), 0), NOW()
+    FROM buckets b
+    LEFT JOIN latest_wavescores l
+        ON l.category = b.category AND l.platform_source = b.platform_source
+        AND l.snapshot_at >= b.hour_bucket AND l.snapshot_at < b.hour_bucket + INTERVAL '1 hour'
+    GROUP BY b.category, b.platform_source, b.hour_bucket
+    ON CONFLICT (category, platform_source, hour_bucket) DO UPDATE SET
+        content_count = EXCLUDED.content_count,
+        avg_wave_score = EXCLUDED.avg_wave_score,
+        max_wave_score = EXCLUDED.max_wave_score,
+        total_views = EXCLUDED.total_views,
+        updated_at = NOW();
+    
+    DELETE FROM trending_summary t
+    USING jsonb_to_recordset(touched) AS b(category VARCHAR(50), platform_source VARCHAR(20),
+                                           hour_bucket TIMESTAMP WITH TIME ZONE)
+    WHERE t.category = b.category AND t.platform_source = b.platform_source
+    AND t.hour_bucket = b.hour_bucket AND t.content_count = 0;
+    RETURN applied;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Refresh job for writers that do not maintain the summaries themselves (the JS
+-- generators) and for backfills: only trends scored since changed_since are touched
+CREATE OR REPLACE FUNCTION refresh_wavescore_summaries(
+    changed_since TIMESTAMP WITH TIME ZONE DEFAULT NOW() - INTERVAL '1 hour'
+)
+RETURNS INTEGER AS $$
+DECLARE
+    entries JSONB;
+BEGIN
+    SELECT COALESCE(jsonb_agg(to_jsonb(x)), '[]'::JSONB) INTO entries
+    FROM (
+        SELECT DISTINCT ON (w.trend_id)
+            w.trend_id, w.content_id, w.wave_score, w.confidence, w.normalized_engagement,
+            w.growth_rate, w.sentiment_momentum, w.audience_diversity, w.calculated_at,
+            r.title, r.category, r.platform_source, r.published_at,
+            r.timestamp AS snapshot_at,
+            (r.raw_metrics->>'view_count')::NUMERIC::BIGINT AS view_count
+        FROM wavescores w
+        LEFT JOIN LATERAL (
+            SELECT title, category, platform_source, published_at, timestamp, raw_metrics
+            FROM raw_ingestion_data
+            WHERE content_id = w.content_id AND timestamp <= w.calculated_at
+            ORDER BY timestamp DESC
+            LIMIT 1
+        ) r ON TRUE
+        WHERE w.calculated_at >= changed_since
+        ORDER BY w.trend_id, w.calculated_at DESC
+    ) x;
+    RETURN apply_wavescore_summaries(entries);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention also expires summaries of trends that stopped being scored
+CREATE OR REPLACE FUNCTION cleanup_old_data(days_to_keep INTEGER DEFAULT 90)
+RETURNS INTEGER AS $$
+DECLARE
+    dropped_count INTEGER := 0;
+    parent TEXT;
+BEGIN
+    FOR parent IN SELECT parent_table FROM partition_config LOOP
+        dropped_count := dropped_count + drop_expired_partitions(parent, (days_to_keep || ' days')::INTERVAL);
+    END LOOP;
+    
+    DELETE FROM latest_wavescores
+    WHERE calculated_at < NOW() - (days_to_keep || ' days')::INTERVAL;
+    DELETE FROM trending_summary
+    WHERE hour_bucket < NOW() - (days_to_keep || ' days')::INTERVAL;
+    
+    DELETE FROM forecast 
+    WHERE valid_until < NOW();
+    
+    RETURN dropped_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill from the retained history
+SELECT refresh_wavescore_summaries(NOW() - INTERVAL '90 days');
+
+INSERT INTO schema_migrations (version) VALUES ('enhanced_v1.2.0_summaries')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('wavescope-summary-refresh', '*/10 * * * *',
+                              'SELECT refresh_wavescore_summaries(NOW() - INTERVAL ''15 minutes'')');
+    END IF;
+END $$;
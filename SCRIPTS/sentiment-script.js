@@ -957,35 +957,59 @@ async function analyzeSentiment() {
     }
 }
 
+// Store a cultural trend in localStorage for the Cultural Compass to pick up
+function storeCompassTrend(culturalTrend) {
+    const existingTrends = JSON.parse(localStorage.getItem('compassTrends') || '[]');
+    const updatedTrends = existingTrends.filter(trend => trend.topic !== culturalTrend.topic);
+    updatedTrends.push(culturalTrend);
+    localStorage.setItem('compassTrends', JSON.stringify(updatedTrends));
+}
+
+// Poll a Cultural Compass job, handing each finished trend to onTrend as it arrives
+async function pollCompassJob(jobId, onTrend, intervalMs = 2000) {
+    let seen = 0;
+
+    while (true) {
+        const response = await fetch(`http://0.0.0.0:5001/api/cultural-compass/jobs/${jobId}?since=${seen}`);
+        if (!response.ok) {
+            throw new Error(`Job status request failed: ${response.status}`);
+        }
+
+        const job = await response.json();
+        job.data.forEach(onTrend);
+        seen += job.data.length;
+
+        if (job.status === 'completed') {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
 // Send analyzed trend to Cultural Compass
 async function sendToCompass(topic, sentimentData) {
     try {
         console.log(`🧭 Sending ${topic} to Cultural Compass...`);
 
-        // Request Cultural Compass analysis for this specific topic
-        const compassResponse = await fetch('http://0.0.0.0:5001/api/cultural-compass', {
+        // Queue Cultural Compass analysis for this topic and poll for the result
+        const jobResponse = await fetch('http://0.0.0.0:5001/api/cultural-compass/jobs', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ topics: [topic] })
         });
 
-        if (compassResponse.ok) {
-            const compassResult = await compassResponse.json();
-            if (compassResult.success && compassResult.data.length > 0) {
-                const culturalTrend = compassResult.data[0];
+        if (jobResponse.ok) {
+            const { job_id: jobId } = await jobResponse.json();
 
-                // Store in localStorage for Cultural Compass to pick up
-                const existingTrends = JSON.parse(localStorage.getItem('compassTrends') || '[]');
-                const updatedTrends = existingTrends.filter(trend => trend.topic !== topic);
-                updatedTrends.push(culturalTrend);
-                localStorage.setItem('compassTrends', JSON.stringify(updatedTrends));
+            await pollCompassJob(jobId, culturalTrend => {
+                storeCompassTrend(culturalTrend);
 
                 // Show success message with link to Cultural Compass
                 const compassLink = `<a href="cultural-compass.html" style="color: #5ee3ff; text-decoration: underline;">View in Cultural Compass →</a>`;
-                showSuccess(`✅ "${topic}" analyzed and added to Cultural Compass! ${compassLink}`);
+                showSuccess(`✅ "${culturalTrend.topic}" analyzed and added to Cultural Compass! ${compassLink}`);
 
-                console.log(`✅ ${topic} sent to Cultural Compass at coordinates (${culturalTrend.coordinates?.x}, ${culturalTrend.coordinates?.y})`);
-            }
+                console.log(`✅ ${culturalTrend.topic} sent to Cultural Compass at coordinates (${culturalTrend.coordinates?.x}, ${culturalTrend.coordinates?.y})`);
+            });
         }
     } catch (error) {
         console.log(`⚠️ Could not send to Cultural Compass: ${error.message}`);
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Streaming Anomaly Detection for WaveScope
+Keeps per-trend EWMA/CUSUM state between runs and only reads trend_scores points
+newer than the last processed watermark.
+"""
+
+import os
+import math
+import time
+import logging
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from pipeline_state import STATE_DIR, read_json, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# Thresholds mirror the JS AnomalyDetectionAI
+ANOMALY_THRESHOLDS = {
+    'spike': {'z_score': 2.5, 'rapid_growth': 0.5},
+    'drop': {'z_score': -2.0, 'rapid_decline': -0.4},
+    # CUSUM slack and decision interval, in baseline standard deviations
+    'cusum': {'slack': 0.5, 'decision': 5.0}
+}
+
+
+@dataclass
+class DetectorConfig:
+    """Tuning for the streaming detectors"""
+    ewma_alpha: float = 0.1       # Weight of each new point in the running baseline
+    warmup_points: int = 12       # Points needed before a trend can raise anomalies
+    min_std: float = 1.0          # Floor for the baseline spread, in score points
+    stale_after_days: int = 14    # Forget trends with no new points for this long
+
+
+@dataclass
+class TrendState:
+    """Incremental baseline for one trend"""
+    count: int = 0
+    mean: float = 0.0
+    variance: float = 0.0
+    cusum_pos: float = 0.0
+    cusum_neg: float = 0.0
+    last_value: Optional[float] = None
+    last_timestamp: Optional[str] = None
+    platform_source: str = ''
+
+    def observe(self, value: float, timestamp: str, config: DetectorConfig) -> Optional[Dict]:
+        """Fold one point into the baseline; return anomaly fields if it is anomalous"""
+        anomaly = None
+        if self.count >= config.warmup_points:
+            anomaly = self._detect(value, config)
+
+        # Exponentially weighted mean and variance
+        if self.count == 0:
+            self.mean = value
+            self.variance = 0.0
+        else:
+            diff = value - self.mean
+            increment = config.ewma_alpha * diff
+            self.mean += increment
+            self.variance = (1 - config.ewma_alpha) * (self.variance + diff * increment)
+
+        self.count += 1
+        self.last_value = value
+        self.last_timestamp = timestamp
+        return anomaly
+
+    def _detect(self, value: float, config: DetectorConfig) -> Optional[Dict]:
+        std = max(math.sqrt(self.variance), config.min_std)
+        z_score = (value - self.mean) / std
+        previous = self.last_value or 0.0
+        change_rate = (value - previous) / previous if previous > 0 else 0.0
+
+        # Two-sided CUSUM on standardized deviations catches slow sustained shifts
+        cusum = ANOMALY_THRESHOLDS['cusum']
+        self.cusum_pos = max(0.0, self.cusum_pos + z_score - cusum['slack'])
+        self.cusum_neg = max(0.0, self.cusum_neg - z_score - cusum['slack'])
+
+        spike = ANOMALY_THRESHOLDS['spike']
+        drop = ANOMALY_THRESHOLDS['drop']
+        is_statistical_spike = z_score > spike['z_score']
+        is_rapid_growth = change_rate > spike['rapid_growth'] and z_score > 1.0
+        is_statistical_drop = z_score < drop['z_score']
+        is_significant_drop = change_rate < drop['rapid_decline'] and previous > 60 and value < 40
+
+        base = {
+            'baseline_value': round(self.mean, 4),
+            'anomaly_value': round(value, 4),
+            'metadata': {
+                'z_score': round(z_score, 4),
+                'change_rate': round(change_rate, 4),
+                'baseline_mean': round(self.mean, 4),
+                'baseline_std': round(std, 4),
+                'points_observed': self.count
+            }
+        }
+
+        if is_statistical_spike or is_rapid_growth or is_statistical_drop or is_significant_drop:
+            # The point-level alert already covers this move; restart the shift detector
+            self.cusum_pos = 0.0
+            self.cusum_neg = 0.0
+
+        if is_statistical_spike or is_rapid_growth:
+            return {
+                **base,
+                'anomaly_type': 'spike',
+                'severity': spike_severity(z_score, change_rate, value),
+                'anomaly_score': min(100.0, z_score * 10 + max(change_rate, 0) * 50),
+                'threshold_exceeded': round(z_score, 4),
+                'probable_causes': spike_causes(change_rate, z_score, self.platform_source),
+                'confidence': detection_confidence(z_score, change_rate),
+                'detection_method': 'ewma_zscore'
+            }
+
+        if is_statistical_drop or is_significant_drop:
+            return {
+                **base,
+                'anomaly_type': 'drop',
+                'severity': drop_severity(z_score, change_rate, value),
+                'anomaly_score': min(100.0, abs(z_score) * 10 + abs(min(change_rate, 0)) * 50),
+                'threshold_exceeded': round(abs(z_score), 4),
+                'probable_causes': drop_causes(change_rate, z_score),
+                'confidence': detection_confidence(z_score, change_rate),
+                'detection_method': 'ewma_zscore'
+            }
+
+        if self.cusum_pos > cusum['decision'] or self.cusum_neg > cusum['decision']:
+            rising = self.cusum_pos > cusum['decision']
+            statistic = self.cusum_pos if rising else self.cusum_neg
+            self.cusum_pos = 0.0
+            self.cusum_neg = 0.0
+            base['metadata']['pattern_type'] = 'sustained_increase' if rising else 'sustained_decrease'
+            base['metadata']['cusum'] = round(statistic, 4)
+            return {
+                **base,
+                'anomaly_type': 'unusual_pattern',
+                'severity': 'medium' if statistic > 2 * cusum['decision'] else 'low',
+                'anomaly_score': min(100.0, statistic * 10),
+                'threshold_exceeded': round(statistic - cusum['decision'], 4),
+                'probable_causes': ['sustained_shift', 'irregular_pattern', 'external_factors'],
+                'confidence': 0.7,
+                'detection_method': 'cusum'
+            }
+
+        return None
+
+
+def spike_severity(z_score, growth_rate, current_score):
+    if z_score > 3.5 or growth_rate > 1.0 or current_score > 90:
+        return 'critical'
+    if z_score > 3.0 or growth_rate > 0.7 or current_score > 85:
+        return 'high'
+    if z_score > 2.5 or growth_rate > 0.5 or current_score > 75:
+        return 'medium'
+    return 'low'
+
+
+def drop_severity(z_score, decline_rate, current_score):
+    if abs(z_score) > 3.0 or abs(decline_rate) > 0.8 or current_score < 10:
+        return 'high'
+    if abs(z_score) > 2.5 or abs(decline_rate) > 0.6 or current_score < 20:
+        return 'medium'
+    return 'low'
+
+
+def detection_confidence(z_score, change_rate):
+    z_confidence = min(1.0, abs(z_score) / 4.0)
+    change_confidence = min(1.0, abs(change_rate))
+    return round((z_confidence + change_confidence) / 2, 2)
+
+
+def spike_causes(growth_rate, z_score, platform_source):
+    causes = []
+    if growth_rate > 0.8:
+        causes.append('viral_acceleration')
+    if z_score > 3.0:
+        causes.append('statistical_outlier')
+    if platform_source == 'tiktok':
+        causes.append('tiktok_algorithm_boost')
+    if platform_source == 'youtube':
+        causes.append('youtube_trending')
+    causes.extend(['possible_external_event', 'influencer_mention', 'news_coverage'])
+    return causes
+
+
+def drop_causes(decline_rate, z_score):
+    causes = []
+    if abs(decline_rate) > 0.6:
+        causes.append('rapid_decline')
+    if abs(z_score) > 2.5:
+        causes.append('statistical_drop')
+    causes.extend(['user_fatigue', 'algorithm_change', 'competing_content', 'trend_saturation'])
+    return causes
+
+
+@dataclass
+class DetectorState:
+    """Everything carried from one run to the next"""
+    watermark: Optional[str] = None
+    watermark_ids: List[str] = field(default_factory=list)
+    trends: Dict[str, TrendState] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> 'DetectorState':
+        raw = read_json(path)
+        if raw is None:
+            return cls()
+        return cls(
+            watermark=raw.get('watermark'),
+            watermark_ids=raw.get('watermark_ids', []),
+            trends={trend_id: TrendState(**state) for trend_id, state in raw.get('trends', {}).items()}
+        )
+
+    def save(self, path: str):
+        write_json_atomic(path, {
+            'watermark': self.watermark,
+            'watermark_ids': self.watermark_ids,
+            'trends': {trend_id: asdict(state) for trend_id, state in self.trends.items()}
+        })
+
+
+class StreamingAnomalyDetector:
+    """Feeds new trend_scores points through per-trend streaming detectors"""
+
+    def __init__(self, supabase, state_path: Optional[str] = None, config: Optional[DetectorConfig] = None,
+                 chunk_size: int = 1000, write_batch_size: int = 500):
+        self.supabase = supabase
+        self.state_path = state_path or os.path.join(STATE_DIR, "anomaly_state.json")
+        self.config = config or DetectorConfig()
+        self.chunk_size = chunk_size
+        self.write_batch_size = write_batch_size
+        self.state = DetectorState.load(self.state_path)
+
+    def process_points(self, points: List[Dict]) -> List[Dict]:
+        """Update trend state with points in timestamp order and return anomaly records"""
+        anomalies = {}
+        for point in points:
+            trend_id = point['trend_id']
+            value = point.get('normalized_trend_score')
+            if value is None:
+                continue
+            trend = self.state.trends.get(trend_id)
+            if trend is None:
+                trend = TrendState(platform_source=point.get('platform_source') or '')
+                self.state.trends[trend_id] = trend
+
+            detected = trend.observe(float(value), point['timestamp'], self.config)
+            if detected:
+                record = {
+                    'trend_id': trend_id,
+                    'detection_timestamp': point['timestamp'],
+                    'anomaly_duration_minutes': None,
+                    **detected
+                }
+                record['anomaly_score'] = round(record['anomaly_score'], 2)
+                # One record per (trend, timestamp, type) so a batch upsert never hits a row twice
+                anomalies[(trend_id, point['timestamp'], record['anomaly_type'])] = record
+        return list(anomalies.values())
+
+    def iter_new_points(self):
+        """Page through trend_scores rows at or after the watermark, oldest first"""
+        offset = 0
+        # Pin the starting watermark; the live one advances as chunks are committed
+        watermark = self.state.watermark
+        seen_at_watermark = set(self.state.watermark_ids)
+        while True:
+            query = self.supabase.table("trend_scores")\
+                .select("id,trend_id,timestamp,platform_source,normalized_trend_score")
+            if watermark:
+                query = query.gte("timestamp", watermark)
+            # trend_id then id break timestamp ties so offset pages never overlap or skip rows
+            response = query.order("timestamp").order("trend_id").order("id")\
+                .range(offset, offset + self.chunk_size - 1).execute()
+            rows = response.data or []
+            fresh = [row for row in rows
+                     if not (row['timestamp'] == watermark and row.get('id') in seen_at_watermark)]
+            if fresh:
+                yield fresh
+            if len(rows) < self.chunk_size:
+                return
+            offset += self.chunk_size
+
+    def write_anomalies(self, anomalies: List[Dict]) -> int:
+        for start in range(0, len(anomalies), self.write_batch_size):
+            batch = anomalies[start:start + self.write_batch_size]
+            self.supabase.table("anomaly_detection")\
+                .upsert(batch, on_conflict="trend_id,detection_timestamp,anomaly_type")\
+                .execute()
+        return len(anomalies)
+
+    def _advance_watermark(self, points: List[Dict]):
+        latest = points[-1]['timestamp']
+        if latest != self.state.watermark:
+            self.state.watermark = latest
+            self.state.watermark_ids = []
+        self.state.watermark_ids.extend(p['id'] for p in points if p['timestamp'] == latest and p.get('id'))
+
+    def _prune_stale_trends(self):
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.config.stale_after_days)).isoformat()
+        stale = [trend_id for trend_id, trend in self.state.trends.items()
+                 if trend.last_timestamp and trend.last_timestamp < cutoff]
+        for trend_id in stale:
+            del self.state.trends[trend_id]
+        return len(stale)
+
+    def run(self) -> Dict:
+        """Process every point since the last run; cost scales with new points only"""
+        started = time.time()
+        points_processed = 0
+        anomalies_written = 0
+        by_type = {}
+
+        for points in self.iter_new_points():
+            anomalies = self.process_points(points)
+            anomalies_written += self.write_anomalies(anomalies)
+            for anomaly in anomalies:
+                by_type[anomaly['anomaly_type']] = by_type.get(anomaly['anomaly_type'], 0) + 1
+            points_processed += len(points)
+            self._advance_watermark(points)
+            # Persist after every written chunk so a crash never re-reads committed work
+            self.state.save(self.state_path)
+
+        pruned = self._prune_stale_trends()
+        self.state.save(self.state_path)
+
+        return {
+            "anomalies_detected": anomalies_written,
+            "anomalies_by_type": by_type,
+            "points_processed": points_processed,
+            "trends_tracked": len(self.state.trends),
+            "trends_pruned": pruned,
+            "watermark": self.state.watermark,
+            "duration_seconds": round(time.time() - started, 3),
+            "status": "success"
+        }
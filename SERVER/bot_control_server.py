@@ -10,6 +10,7 @@ import time
 import logging
 import subprocess
 import threading
+from collections import deque
 from datetime import datetime
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -17,6 +18,9 @@ from flask_cors import CORS
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from pipeline_events import PipelineMetrics, parse_event
+from pipeline_worker import PipelineWorker
+
 app = Flask(__name__)
 CORS(app)
 
@@ -24,17 +28,62 @@ CORS(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 'inprocess' runs the pipeline on a thread that imports it once per server process;
+# 'subprocess' launches run-wavescope-pipeline.py as a supervised child instead
+PIPELINE_WORKER = os.getenv("BOT_PIPELINE_WORKER", "inprocess")
+PIPELINE_INTERVAL_JITTER = float(os.getenv("PIPELINE_INTERVAL_JITTER", "0.1"))
+# Load the in-process pipeline at server start so the first start is instant
+PRELOAD_WORKER = os.getenv("BOT_WORKER_PRELOAD", "").lower() in ("1", "true", "yes")
+
+# Child output kept in memory for /api/bot/logs
+OUTPUT_BUFFER_LINES = 500
+# Restart backoff after an unexpected exit; a run that stayed up this long resets it
+RESTART_BACKOFF_SECONDS = 5
+RESTART_BACKOFF_MAX_SECONDS = 300
+RESTART_RESET_AFTER_SECONDS = 600
+
 class BotManager:
     def __init__(self):
         self.is_running = False
         self.start_time = None
-        self.record_count = 0
         self.last_activity = None
         self.pipeline_process = None
-        self.collection_thread = None
+        self.process_started_at = None
+        self.monitor_thread = None
+        self.mode = None
+        self.interval = None
+        self.command = None
+        self.restart_count = 0
+        self.last_exit_code = None
+        self.next_restart_at = None
+        self.output = deque(maxlen=OUTPUT_BUFFER_LINES)
+        self.metrics = PipelineMetrics()
+        self.stopping = threading.Event()
+        self.worker_kind = PIPELINE_WORKER
+        self.worker = PipelineWorker(on_event=self._on_event, on_exit=self._on_worker_exit)
+        if PRELOAD_WORKER and self.worker_kind == 'inprocess':
+            threading.Thread(target=self._preload, name="pipeline-preload", daemon=True).start()
+        # Serializes start/stop/restart when the server runs with multiple threads
+        self.lock = threading.Lock()
+        # Guards is_running against the worker's on_exit; never held while joining the worker
+        self.state_lock = threading.Lock()
+        
+    @property
+    def record_count(self):
+        return self.metrics.rows_written
+    
+    def _preload(self):
+        try:
+            self.worker.load()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not preload pipeline: {e}")
         
     def start_pipeline(self, mode='continuous', interval=300):
         """Start the WaveScope data collection pipeline"""
+        with self.lock:
+            return self._start_pipeline(mode, interval)
+    
+    def _start_pipeline(self, mode, interval):
         if self.is_running:
             return {"error": "Bot is already running"}
         
@@ -42,25 +91,39 @@ class BotManager:
             # Try to start the pipeline script
             pipeline_script = os.path.join(os.path.dirname(__file__), 'run-wavescope-pipeline.py')
             
-            if os.path.exists(pipeline_script):
+            if os.path.exists(pipeline_script) and self.worker_kind == 'inprocess':
+                return self._start_worker(mode, interval)
+            elif os.path.exists(pipeline_script):
                 logger.info("🚀 Starting WaveScope pipeline...")
                 
-                # Start pipeline in background
-                self.pipeline_process = subprocess.Popen([
-                    sys.executable, pipeline_script
-                ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                # Continuous mode keeps one pipeline process running incremental cycles
+                command = [sys.executable, pipeline_script]
+                if mode == 'continuous':
+                    command += ['--continuous', '--interval', str(int(interval))]
+                
+                self.mode = mode
+                self.interval = interval
+                self.command = command
+                self.restart_count = 0
+                self.last_exit_code = None
+                self.output.clear()
+                self.metrics.reset()
+                self.stopping.clear()
+                self._launch()
                 
                 self.is_running = True
                 self.start_time = datetime.now()
-                self.last_activity = datetime.now()
                 
-                # Start data collection simulation
-                self.start_data_collection_simulation()
+                # Supervise the child: reap it and restart it with backoff if it dies
+                self.monitor_thread = threading.Thread(target=self._monitor, name="pipeline-monitor", daemon=True)
+                self.monitor_thread.start()
                 
                 logger.info("✅ Pipeline started successfully")
                 return {
                     "success": True,
                     "message": "Bot started successfully",
+                    "mode": mode,
+                    "interval": interval,
                     "pid": self.pipeline_process.pid,
                     "start_time": self.start_time.isoformat()
                 }
@@ -79,21 +142,162 @@ class BotManager:
             logger.error(f"❌ Failed to start pipeline: {e}")
             return {"error": f"Failed to start bot: {str(e)}"}
     
+    def _start_worker(self, mode, interval):
+        """Run cycles on the in-process worker; only the first start pays the import cost"""
+        logger.info("🚀 Starting in-process WaveScope pipeline worker...")
+        self.mode = mode
+        self.interval = interval
+        self.metrics.reset()
+        # Marked running first: a run that ends at once must leave on_exit's False behind
+        with self.state_lock:
+            self.is_running = True
+            self.start_time = datetime.now()
+            self.last_activity = datetime.now()
+        try:
+            self.worker.start(mode, float(interval), PIPELINE_INTERVAL_JITTER)
+        except Exception:
+            with self.state_lock:
+                self.is_running = False
+            raise
+        
+        logger.info("✅ Pipeline worker started")
+        return {
+            "success": True,
+            "message": "Bot started successfully",
+            "mode": mode,
+            "interval": interval,
+            "worker": "inprocess",
+            "start_time": self.start_time.isoformat()
+        }
+    
+    def _on_event(self, event):
+        self.metrics.observe(event)
+        self.last_activity = datetime.now()
+    
+    def _on_worker_exit(self):
+        # Called from the worker thread; stop_pipeline may hold self.lock while joining it
+        with self.state_lock:
+            self.is_running = False
+    
+    def pause_pipeline(self):
+        """Let the current cycle finish, then hold off new ones until resumed"""
+        with self.lock:
+            if self.worker_kind != 'inprocess':
+                return {"error": "Pause needs the in-process worker (BOT_PIPELINE_WORKER=inprocess)"}
+            try:
+                self.worker.pause()
+            except RuntimeError as e:
+                return {"error": str(e)}
+            return {"success": True, "message": "Bot paused after the current cycle", "paused": True}
+    
+    def resume_pipeline(self):
+        with self.lock:
+            if self.worker_kind != 'inprocess':
+                return {"error": "Resume needs the in-process worker (BOT_PIPELINE_WORKER=inprocess)"}
+            try:
+                self.worker.resume()
+            except RuntimeError as e:
+                return {"error": str(e)}
+            return {"success": True, "message": "Bot resumed", "paused": False}
+    
+    def _launch(self):
+        """Start the child process and a reader thread per output pipe"""
+        env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+        self.pipeline_process = subprocess.Popen(
+            self.command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, bufsize=1, errors="replace", env=env
+        )
+        self.process_started_at = time.time()
+        self.last_activity = datetime.now()
+        self.next_restart_at = None
+        for name, stream in (("stdout", self.pipeline_process.stdout), ("stderr", self.pipeline_process.stderr)):
+            threading.Thread(target=self._read_stream, args=(stream, name),
+                             name=f"pipeline-{name}", daemon=True).start()
+    
+    def _read_stream(self, stream, name):
+        """Drain one pipe so the child never blocks on a full buffer"""
+        for line in iter(stream.readline, ''):
+            line = line.rstrip("\n")
+            event = parse_event(line)
+            if event:
+                self.metrics.observe(event)
+            self.output.append({"ts": time.time(), "stream": name, "line": line})
+            self.last_activity = datetime.now()
+        stream.close()
+    
+    def _monitor(self):
+        """Wait for the child to exit and restart it unless it was stopped or finished cleanly"""
+        backoff = RESTART_BACKOFF_SECONDS
+        while True:
+            process = self.pipeline_process
+            exit_code = process.wait()
+            self.last_exit_code = exit_code
+            if self.stopping.is_set():
+                return
+            
+            if self.mode != 'continuous' and exit_code == 0:
+                logger.info("✅ Pipeline run finished")
+                with self.lock:
+                    self.is_running = False
+                    self.pipeline_process = None
+                return
+            
+            if time.time() - self.process_started_at >= RESTART_RESET_AFTER_SECONDS:
+                backoff = RESTART_BACKOFF_SECONDS
+            logger.warning(f"⚠️ Pipeline exited with code {exit_code}; restarting in {backoff}s")
+            self.next_restart_at = time.time() + backoff
+            if self.stopping.wait(backoff):
+                return
+            
+            with self.lock:
+                if self.stopping.is_set():
+                    return
+                try:
+                    self._launch()
+                    self.restart_count += 1
+                    logger.info(f"🔄 Pipeline restarted (restart #{self.restart_count}, pid {self.pipeline_process.pid})")
+                except Exception as e:
+                    logger.error(f"❌ Failed to restart pipeline: {e}")
+                    self.is_running = False
+                    self.pipeline_process = None
+                    return
+            backoff = min(backoff * 2, RESTART_BACKOFF_MAX_SECONDS)
+    
     def stop_pipeline(self):
         """Stop the WaveScope data collection pipeline"""
+        with self.lock:
+            return self._stop_pipeline()
+    
+    def _stop_pipeline(self):
         if not self.is_running:
             return {"error": "Bot is not running"}
         
+        if self.worker_kind == 'inprocess' and self.mode != 'demo':
+            stopped = self.worker.stop(timeout=10)
+            if stopped:
+                self.is_running = False
+            logger.info("✅ Pipeline worker stopped" if stopped else "⏳ Pipeline worker stopping after the current cycle")
+            return {
+                "success": True,
+                "message": "Bot stopped successfully" if stopped else "Bot stopping after the current cycle",
+                "stop_time": datetime.now().isoformat()
+            }
+        
+        self.stopping.set()
         try:
-            # Stop the pipeline process
+            # Stop the pipeline process; continuous mode finishes its current cycle on SIGTERM
             if self.pipeline_process:
                 self.pipeline_process.terminate()
-                self.pipeline_process.wait(timeout=10)
+                try:
+                    self.pipeline_process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    logger.warning("⚠️ Pipeline did not exit after SIGTERM, killing it")
+                    self.pipeline_process.kill()
+                    self.pipeline_process.wait(timeout=5)
                 self.pipeline_process = None
             
-            # Stop data collection simulation
             self.is_running = False
-            self.collection_thread = None
+            self.next_restart_at = None
             
             logger.info("✅ Pipeline stopped successfully")
             return {
@@ -114,47 +318,72 @@ class BotManager:
             }
     
     def get_status(self):
-        """Get current bot status"""
+        """Get current bot status with live throughput from pipeline progress events"""
         runtime_seconds = 0
         if self.start_time and self.is_running:
             runtime_seconds = (datetime.now() - self.start_time).total_seconds()
         
+        metrics = self.metrics.snapshot()
+        process = self.pipeline_process
         return {
             "isRunning": self.is_running,
+            "mode": self.mode,
+            "worker": self.worker_kind,
+            "paused": self.worker.paused if self.worker_kind == 'inprocess' else False,
+            "workerLoadSeconds": self.worker.load_seconds,
+            "workerCrashes": self.worker.crashes,
+            "lastError": self.worker.last_error,
             "startTime": self.start_time.isoformat() if self.start_time else None,
-            "recordCount": self.record_count,
+            "recordCount": metrics["rowsWritten"],
+            "rowsPerSecond": metrics["rowsPerSecond"],
+            "averageRowsPerSecond": metrics["averageRowsPerSecond"],
+            "rowsRead": metrics["rowsRead"],
+            "rowsByStage": metrics["rowsByStage"],
+            "runsCompleted": metrics["runsCompleted"],
+            "stageFailures": metrics["stageFailures"],
+            "lastEvent": metrics["lastEvent"],
             "lastActivity": self.last_activity.isoformat() if self.last_activity else None,
             "runtimeSeconds": runtime_seconds,
-            "pid": self.pipeline_process.pid if self.pipeline_process else None
+            "pid": process.pid if process else None,
+            "restarts": self.restart_count,
+            "lastExitCode": self.last_exit_code,
+            "nextRestartAt": datetime.fromtimestamp(self.next_restart_at).isoformat() if self.next_restart_at else None
         }
     
+    def get_output(self, lines=100):
+        """Most recent lines of child output"""
+        return list(self.output)[-lines:]
+    
     def start_demo_mode(self):
-        """Start demo mode with simulated data collection"""
+        """Start demo mode; nothing is collected, so every count stays at zero"""
+        self.mode = 'demo'
+        self.metrics.reset()
         self.is_running = True
         self.start_time = datetime.now()
         self.last_activity = datetime.now()
-        self.start_data_collection_simulation()
-    
-    def start_data_collection_simulation(self):
-        """Start background thread to simulate data collection"""
-        def simulate_collection():
-            while self.is_running:
-                # Simulate data collection
-                import random
-                time.sleep(10)  # Simulate collection every 10 seconds
-                
-                if self.is_running:
-                    # Add random records
-                    self.record_count += random.randint(1, 5)
-                    self.last_activity = datetime.now()
-        
-        if not self.collection_thread or not self.collection_thread.is_alive():
-            self.collection_thread = threading.Thread(target=simulate_collection, daemon=True)
-            self.collection_thread.start()
+
+    def shutdown(self):
+        """Stop any running pipeline when the server process exits"""
+        if self.is_running:
+            logger.info("🛑 Stopping pipeline for server shutdown...")
+            self.stop_pipeline()
 
 # Initialize bot manager
 bot_manager = BotManager()
 
+def reset_process_state():
+    """Give a forked worker its own BotManager
+
+    The manager owns a worker thread or a child process with its monitor thread;
+    a forked copy would report the parent's pipeline as its own and could never
+    stop or reap it.
+    """
+    global bot_manager
+    bot_manager = BotManager()
+
+def shutdown_process_state():
+    bot_manager.shutdown()
+
 @app.route('/api/pipeline/start', methods=['POST'])
 def start_pipeline():
     """Start the data collection pipeline"""
@@ -171,12 +400,28 @@ def stop_pipeline():
     result = bot_manager.stop_pipeline()
     return jsonify(result)
 
+@app.route('/api/pipeline/pause', methods=['POST'])
+def pause_pipeline():
+    """Pause continuous cycles after the current one finishes"""
+    return jsonify(bot_manager.pause_pipeline())
+
+@app.route('/api/pipeline/resume', methods=['POST'])
+def resume_pipeline():
+    """Resume paused continuous cycles"""
+    return jsonify(bot_manager.resume_pipeline())
+
 @app.route('/api/bot/status', methods=['GET'])
 def get_bot_status():
     """Get current bot status"""
     status = bot_manager.get_status()
     return jsonify(status)
 
+@app.route('/api/bot/logs', methods=['GET'])
+def get_bot_logs():
+    """Recent pipeline output from the in-memory ring buffer"""
+    lines = min(request.args.get('lines', 100, type=int), OUTPUT_BUFFER_LINES)
+    return jsonify({"lines": bot_manager.get_output(lines)})
+
 @app.route('/api/bot/start', methods=['POST'])
 def start_bot():
     """Alternative endpoint for starting bot"""
@@ -202,7 +447,10 @@ if __name__ == '__main__':
     print("📍 Available endpoints:")
     print("  POST /api/pipeline/start - Start data collection")
     print("  POST /api/pipeline/stop  - Stop data collection")
+    print("  POST /api/pipeline/pause - Pause after the current cycle")
+    print("  POST /api/pipeline/resume - Resume cycles")
     print("  GET  /api/bot/status     - Get bot status")
+    print("  GET  /api/bot/logs       - Recent pipeline output")
     print("  GET  /health             - Health check")
     print()
     
@@ -2,23 +2,40 @@
 import os
 import requests
 import json
-from datetime import datetime, timedelta
-from supabase import create_client, Client
+from datetime import datetime, timedelta, timezone
+from datastore import create_client
 from trend_categorizer import TrendCategorizer, process_cultural_trends
+from write_spool import write_or_spool
 
 # Configuration
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# trend_insights snapshots: one row per trend per bucket, written only when metrics move
+INSIGHT_SNAPSHOT_CONFIG = {
+    'bucket_minutes': int(os.getenv("INSIGHT_BUCKET_MINUTES", "360")),
+    'tolerance': float(os.getenv("INSIGHT_CHANGE_TOLERANCE", "0.02")),  # Relative change per metric
+    'heartbeat_hours': 24,    # Unchanged trends still get a row this often
+    'baseline_days': 7,       # How far back to look for the last stored snapshot
+}
+# PostgREST caps each response (1000 rows by default), so snapshot lookups are paged
+INSIGHT_PAGE_SIZE = 1000
+INSIGHT_METRICS = ('total_videos', 'total_reach', 'engagement_rate', 'wave_score', 'sentiment_score', 'trend_score')
+
 # Initialize clients
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
 
-def fetch_youtube_data():
-    """Fetch recent YouTube trend data from database"""
+def fetch_youtube_data(archive=None):
+    """Fetch recent YouTube trend data from database, or from a history_archive.HistoryReader"""
     try:
         # Get data from last 7 days
         week_ago = datetime.now() - timedelta(days=7)
         
+        if archive is not None:
+            videos = archive.rows("youtube_trends", start=week_ago.astimezone(timezone.utc))
+            print(f"📺 Read {len(videos)} archived YouTube videos from last 7 days")
+            return videos
+        
         response = supabase.table("youtube_trends")\
             .select("*")\
             .gte("published_at", week_ago.isoformat())\
@@ -72,16 +89,76 @@ def fetch_reddit_sentiment_data():
         print(f"❌ Error fetching Reddit sentiment: {e}")
         return {}
 
-def save_trend_insights(insights):
-    """Save processed trend insights to database"""
+def snapshot_bucket(now, bucket_minutes):
+    """Start of the snapshot period containing `now`; reruns within it hit the same row"""
+    bucket_seconds = bucket_minutes * 60
+    return datetime.fromtimestamp(int(now.timestamp()) // bucket_seconds * bucket_seconds, tz=timezone.utc)
+
+def metrics_changed(previous, current, tolerance):
+    """True if any tracked metric moved by more than `tolerance` relative to its old value"""
+    for metric in INSIGHT_METRICS:
+        old = float(previous.get(metric) or 0)
+        new = float(current.get(metric) or 0)
+        if abs(new - old) > tolerance * max(abs(old), 1.0):
+            return True
+    return False
+
+def fetch_latest_insights(trend_names, since):
+    """Most recent stored snapshot per trend, paging newest first until every trend is found"""
+    wanted = sorted(set(trend_names))
+    latest = {}
+    offset = 0
+    while len(latest) < len(wanted):
+        page = supabase.table("trend_insights")\
+            .select(",".join(("trend_name", "analysis_date") + INSIGHT_METRICS))\
+            .in_("trend_name", wanted)\
+            .gte("analysis_date", since.isoformat())\
+            .order("analysis_date", desc=True)\
+            .order("trend_name")\
+            .range(offset, offset + INSIGHT_PAGE_SIZE - 1)\
+            .execute().data or []
+        for row in page:
+            latest.setdefault(row['trend_name'], row)
+        if len(page) < INSIGHT_PAGE_SIZE:
+            break
+        offset += INSIGHT_PAGE_SIZE
+    return latest
+
+def save_trend_insights(insights, config=None):
+    """Save processed trend insights to database
+
+    analysis_date is the start of the current snapshot bucket, so repeated runs
+    update one row per trend per bucket; trends whose metrics stayed within the
+    tolerance of their last stored snapshot are not written again until the
+    heartbeat interval has passed.
+    """
+    config = {**INSIGHT_SNAPSHOT_CONFIG, **(config or {})}
     try:
         if not insights:
             print("ℹ️ No insights to save")
             return
         
+        now = datetime.now(timezone.utc)
+        bucket = snapshot_bucket(now, config['bucket_minutes'])
+        try:
+            latest = fetch_latest_insights({insight['trend_name'] for insight in insights},
+                                           now - timedelta(days=config['baseline_days']))
+        except Exception as e:
+            print(f"⚠️ Could not load previous insights, writing all: {e}")
+            latest = {}
+        
         # Prepare data for insertion
         formatted_insights = []
+        unchanged = 0
         for insight in insights:
+            previous = latest.get(insight['trend_name'])
+            if previous and not metrics_changed(previous, insight, config['tolerance']):
+                stored_at = datetime.fromisoformat(previous['analysis_date'].replace('Z', '+00:00'))
+                if stored_at.tzinfo is None:
+                    stored_at = stored_at.replace(tzinfo=timezone.utc)
+                if now - stored_at < timedelta(hours=config['heartbeat_hours']):
+                    unchanged += 1
+                    continue
             formatted_insight = {
                 'trend_name': insight['trend_name'],
                 'category': insight['category'],
@@ -92,16 +169,23 @@ def save_trend_insights(insights):
                 'sentiment_score': insight['sentiment_score'],
                 'trend_score': insight['trend_score'],
                 'data_sources': json.dumps(insight['data_sources']),
-                'analysis_date': datetime.now().isoformat(),
+                'analysis_date': bucket.isoformat(),
                 'top_video_title': insight.get('top_content', {}).get('title', '') if insight.get('top_content') else '',
                 'top_video_views': insight.get('top_content', {}).get('views', 0) if insight.get('top_content') else 0
             }
             formatted_insights.append(formatted_insight)
         
-        # Insert into database
-        response = supabase.table("trend_insights")\
-            .upsert(formatted_insights, on_conflict='trend_name,analysis_date')\
-            .execute()
+        if unchanged:
+            print(f"⏭️ {unchanged} trend insights unchanged since their last snapshot")
+        if not formatted_insights:
+            return []
+        
+        # Insert into database; insights are spooled locally if Supabase is down
+        response = write_or_spool(supabase, "trend_insights", formatted_insights,
+                                  op="upsert", on_conflict='trend_name,analysis_date')
+        if response is None:
+            print(f"📦 Spooled {len(formatted_insights)} trend insights for replay")
+            return []
         
         print(f"✅ Saved {len(formatted_insights)} trend insights to database")
         return response.data
@@ -110,14 +194,14 @@ def save_trend_insights(insights):
         print(f"❌ Error saving trend insights: {e}")
         return None
 
-def run_cultural_trend_analysis():
+def run_cultural_trend_analysis(archive=None):
     """Main function to run comprehensive cultural trend analysis"""
     print("🌊 Starting Cultural Trend Analysis...")
     print("=" * 50)
     
     # Step 1: Fetch YouTube data
     print("📺 Step 1: Fetching YouTube trend data...")
-    youtube_data = fetch_youtube_data()
+    youtube_data = fetch_youtube_data(archive)
     
     if not youtube_data:
         print("❌ No YouTube data available")
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Datastore Client Factory
+SUPABASE_URL picks the backend: a Supabase project URL gets the Supabase client,
+sqlite:///path/to/wavescope.db (or sqlite://:memory:) the embedded local datastore.
+"""
+
+LOCAL_SCHEME = "sqlite://"
+
+
+def is_local(url) -> bool:
+    return bool(url) and url.startswith(LOCAL_SCHEME)
+
+
+def create_client(url, key):
+    """Drop-in for supabase.create_client; the key is ignored for local datastores"""
+    if is_local(url):
+        from local_datastore import open_datastore
+        return open_datastore(url[len(LOCAL_SCHEME):] or ":memory:")
+    # Imported here: the SDK is slow to import and not needed for local runs
+    from supabase import create_client as create_supabase_client
+    return create_supabase_client(url, key)
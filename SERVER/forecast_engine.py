@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Forecast Engine - batch port of the JS AnomalyDetectionAI forecasting models
+Every trend's WaveScore history is laid out on one hourly matrix; least squares and
+Holt smoothing run across all rows at once and are blended into an ensemble forecast.
+"""
+
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FORECAST_CONFIG = {
+    'holt_alpha': 0.3,        # Level smoothing (JS exponentialSmoothingForecast alpha)
+    'holt_beta': 0.1,         # Trend smoothing
+    'min_points': 10,         # Trends with fewer hourly observations are skipped
+    'confidence_level': 0.95,
+    'z_value': 1.96,          # Two-sided normal quantile for confidence_level
+    'min_accuracy': 0.05      # Floor so a poor model still gets a small ensemble weight
+}
+
+
+def hourly_matrix(history: pd.DataFrame):
+    """Average scores into hourly buckets and pivot to a trends x hours matrix (NaN = no data)"""
+    buckets = history['calculated_at'].dt.floor('h')
+    grouped = history.assign(bucket=buckets)\
+        .groupby(['trend_id', 'bucket'], sort=False)['wave_score'].mean()\
+        .reset_index()
+
+    trend_codes, trend_ids = pd.factorize(grouped['trend_id'])
+    start = grouped['bucket'].min()
+    hours = ((grouped['bucket'] - start).dt.total_seconds() // 3600).astype(int).to_numpy()
+
+    matrix = np.full((len(trend_ids), hours.max() + 1), np.nan)
+    matrix[trend_codes, hours] = grouped['wave_score'].to_numpy(dtype=float)
+    return matrix, np.asarray(trend_ids)
+
+
+def fit_linear(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """Closed-form least squares per row, ignoring missing hours"""
+    observed = ~np.isnan(matrix)
+    y = np.where(observed, matrix, 0.0)
+    x = np.broadcast_to(np.arange(matrix.shape[1], dtype=float), matrix.shape)
+    w = observed.astype(float)
+
+    n = w.sum(axis=1)
+    x_mean = (w * x).sum(axis=1) / n
+    y_mean = (w * y).sum(axis=1) / n
+    dx = np.where(observed, x - x_mean[:, None], 0.0)
+    dy = np.where(observed, y - y_mean[:, None], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    sxy = (dx * dy).sum(axis=1)
+    syy = (dy * dy).sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        intercept = y_mean - slope * x_mean
+        residuals = np.where(observed, y - (intercept[:, None] + slope[:, None] * x), 0.0)
+        ss_res = (residuals * residuals).sum(axis=1)
+        r_squared = np.where(syy > 0, 1 - ss_res / syy, 0.0)
+        sigma = np.sqrt(ss_res / np.maximum(n - 2, 1))
+
+    return {
+        'slope': slope, 'intercept': intercept, 'r_squared': np.clip(r_squared, 0, 1),
+        'sigma': sigma, 'n': n, 'x_mean': x_mean, 'sxx': sxx
+    }
+
+
+def fit_holt(matrix: np.ndarray, alpha: float, beta: float) -> Dict[str, np.ndarray]:
+    """Holt's linear smoothing stepped over hours, vectorized over trends"""
+    rows = matrix.shape[0]
+    level = np.full(rows, np.nan)
+    trend = np.zeros(rows)
+    sq_error = np.zeros(rows)
+    errors = np.zeros(rows)
+
+    for column in matrix.T:
+        has_value = ~np.isnan(column)
+        started = ~np.isnan(level)
+        first = has_value & ~started
+        update = has_value & started
+
+        # One-step-ahead error measured before the update
+        predicted = level + trend
+        error = np.where(update, column - predicted, 0.0)
+        sq_error += error * error
+        errors += update
+
+        new_level = alpha * column + (1 - alpha) * predicted
+        new_trend = beta * (new_level - level) + (1 - beta) * trend
+        level = np.where(update, new_level, np.where(started, predicted, level))
+        trend = np.where(update, new_trend, trend)
+        level = np.where(first, column, level)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.sqrt(np.where(errors > 0, sq_error / errors, 0.0))
+        # Accuracy compares one-step errors with the series' own variance, like an R²
+        y = np.where(np.isnan(matrix), 0.0, matrix)
+        observed = ~np.isnan(matrix)
+        n = observed.sum(axis=1)
+        y_mean = y.sum(axis=1) / np.maximum(n, 1)
+        sq_total = (np.where(observed, y - y_mean[:, None], 0.0) ** 2).sum(axis=1)
+        accuracy = np.where(sq_total > 0, 1 - (sq_error / np.maximum(errors, 1)) / (sq_total / np.maximum(n, 1)), 0.0)
+
+    return {'level': level, 'trend': trend, 'sigma': sigma, 'accuracy': np.clip(accuracy, 0, 1)}
+
+
+def ensemble_forecast(matrix: np.ndarray, horizon_hours: int, config: Dict = None) -> Dict[str, np.ndarray]:
+    """Accuracy-weighted blend of linear and Holt forecasts for horizons 1..horizon_hours"""
+    config = config or FORECAST_CONFIG
+    linear = fit_linear(matrix)
+    holt = fit_holt(matrix, config['holt_alpha'], config['holt_beta'])
+
+    last_hour = matrix.shape[1] - 1
+    steps = np.arange(1, horizon_hours + 1, dtype=float)
+    future_x = last_hour + steps
+
+    linear_pred = linear['intercept'][:, None] + linear['slope'][:, None] * future_x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        leverage = np.where(linear['sxx'][:, None] > 0,
+                            (future_x - linear['x_mean'][:, None]) ** 2 / linear['sxx'][:, None], 0.0)
+    linear_se = linear['sigma'][:, None] * np.sqrt(1 + 1 / linear['n'][:, None] + leverage)
+
+    holt_pred = holt['level'][:, None] + holt['trend'][:, None] * steps
+    holt_se = holt['sigma'][:, None] * np.sqrt(steps)
+
+    linear_weight = np.maximum(linear['r_squared'], config['min_accuracy'])
+    holt_weight = np.maximum(holt['accuracy'], config['min_accuracy'])
+    total = linear_weight + holt_weight
+    lw = (linear_weight / total)[:, None]
+    hw = (holt_weight / total)[:, None]
+
+    predicted = lw * linear_pred + hw * holt_pred
+    margin = config['z_value'] * (lw * linear_se + hw * holt_se)
+
+    return {
+        'predicted': np.clip(predicted, 0, 100),
+        'lower': np.clip(predicted - margin, 0, 100),
+        'upper': np.clip(predicted + margin, 0, 100),
+        'accuracy': (lw[:, 0] * linear['r_squared'] + hw[:, 0] * holt['accuracy']),
+        'linear_weight': lw[:, 0],
+        'holt_weight': hw[:, 0],
+        'slope': linear['slope'],
+        'r_squared': linear['r_squared'],
+        'holt_level': holt['level'],
+        'holt_trend': holt['trend'],
+        'training_points': linear['n'].astype(int)
+    }
+
+
+def forecast_warnings(path: np.ndarray, accuracy: float) -> List[str]:
+    """Same flags the JS assessForecastWarnings raises"""
+    warnings = []
+    if (path > 95).any():
+        warnings.append('extreme_high_prediction')
+    if (path < 5).any():
+        warnings.append('extreme_low_prediction')
+    if accuracy < 0.4:
+        warnings.append('low_confidence')
+    if path.std() > 20:
+        warnings.append('high_volatility_forecast')
+    return warnings
+
+
+class ForecastEngine:
+    """Forecasts every recently scored trend and stores the ensemble in the forecast table"""
+
+    def __init__(self, supabase, chunk_size: int = 1000, write_batch_size: int = 500, config: Optional[Dict] = None):
+        self.supabase = supabase
+        self.chunk_size = chunk_size
+        self.write_batch_size = write_batch_size
+        self.config = {**FORECAST_CONFIG, **(config or {})}
+
+    def load_history(self, since: datetime) -> pd.DataFrame:
+        """Read (trend_id, wave_score, calculated_at) for every trend in the window"""
+        frames = []
+        offset = 0
+        while True:
+            response = self.supabase.table("wavescores")\
+                .select("trend_id,wave_score,calculated_at")\
+                .gte("calculated_at", since.isoformat())\
+                .order("calculated_at")\
+                .order("id")\
+                .range(offset, offset + self.chunk_size - 1)\
+                .execute()
+            rows = response.data or []
+            if rows:
+                frames.append(pd.DataFrame.from_records(rows))
+            if len(rows) < self.chunk_size:
+                break
+            offset += self.chunk_size
+
+        if not frames:
+            return pd.DataFrame(columns=['trend_id', 'wave_score', 'calculated_at'])
+        history = pd.concat(frames, ignore_index=True)
+        history['wave_score'] = pd.to_numeric(history['wave_score'], errors='coerce')
+        history['calculated_at'] = pd.to_datetime(history['calculated_at'], utc=True, errors='coerce', format='ISO8601')
+        return history.dropna(subset=['wave_score', 'calculated_at'])
+
+    def build_records(self, trend_ids, result: Dict, horizon_hours: int, now: datetime) -> List[Dict]:
+        forecasted_at = now.isoformat()
+        valid_until = (now + timedelta(hours=horizon_hours)).isoformat()
+        records = []
+        for i, trend_id in enumerate(trend_ids):
+            path = result['predicted'][i]
+            accuracy = float(result['accuracy'][i])
+            records.append({
+                'trend_id': trend_id,
+                'forecast_type': 'wavescore',
+                'forecast_horizon_hours': horizon_hours,
+                'predicted_value': round(float(path[-1]), 4),
+                'confidence_lower': round(float(result['lower'][i, -1]), 4),
+                'confidence_upper': round(float(result['upper'][i, -1]), 4),
+                'confidence_level': self.config['confidence_level'],
+                'model_type': 'ensemble',
+                'model_accuracy': round(accuracy, 3),
+                'training_data_points': int(result['training_points'][i]),
+                'forecast_metadata': {
+                    'component_models': ['linear_regression', 'exponential_smoothing'],
+                    'model_weights': {
+                        'linear_regression': round(float(result['linear_weight'][i]), 3),
+                        'exponential_smoothing': round(float(result['holt_weight'][i]), 3)
+                    },
+                    'slope_per_hour': round(float(result['slope'][i]), 4),
+                    'r_squared': round(float(result['r_squared'][i]), 3),
+                    'holt_level': round(float(result['holt_level'][i]), 4),
+                    'holt_trend': round(float(result['holt_trend'][i]), 4),
+                    'hourly_predictions': [round(float(v), 2) for v in path],
+                    'hourly_lower': [round(float(v), 2) for v in result['lower'][i]],
+                    'hourly_upper': [round(float(v), 2) for v in result['upper'][i]]
+                },
+                'warning_flags': forecast_warnings(path, accuracy),
+                'forecasted_at': forecasted_at,
+                'valid_until': valid_until
+            })
+        return records
+
+    def write_forecasts(self, records: List[Dict]) -> int:
+        for start in range(0, len(records), self.write_batch_size):
+            batch = records[start:start + self.write_batch_size]
+            self.supabase.table("forecast")\
+                .upsert(batch, on_conflict="trend_id,forecast_type,forecasted_at")\
+                .execute()
+        return len(records)
+
+    def run(self, lookback_hours: int = 168, horizon_hours: int = 24) -> Dict:
+        """Fit and store forecasts for every trend with enough recent history"""
+        started = time.time()
+        now = datetime.now(timezone.utc)
+        history = self.load_history(now - timedelta(hours=lookback_hours))
+
+        written = 0
+        trends_seen = 0
+        trends_forecast = 0
+        if not history.empty:
+            matrix, trend_ids = hourly_matrix(history)
+            trends_seen = len(trend_ids)
+            enough = (~np.isnan(matrix)).sum(axis=1) >= self.config['min_points']
+            matrix, trend_ids = matrix[enough], trend_ids[enough]
+            trends_forecast = len(trend_ids)
+
+            if trends_forecast:
+                result = ensemble_forecast(matrix, horizon_hours, self.config)
+                written = self.write_forecasts(self.build_records(trend_ids, result, horizon_hours, now))
+
+        return {
+            "forecasts_generated": written,
+            "trends_seen": trends_seen,
+            "trends_skipped": trends_seen - trends_forecast,
+            "history_rows": len(history),
+            "horizon_hours": horizon_hours,
+            "duration_seconds": round(time.time() - started, 3),
+            "status": "success"
+        }
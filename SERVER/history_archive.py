@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Columnar History Archive for WaveScope
+Exports raw_ingestion_data and youtube_trends into day/platform partitioned
+Parquet (or Arrow IPC) files with the nested metric documents flattened into
+columns, and reads them back memory-mapped so backfills and re-scoring run
+from local disk instead of paging JSON out of Supabase.
+"""
+
+import os
+import sys
+import json
+import shutil
+import logging
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:  # The archive is optional; nothing else in the pipeline needs pyarrow
+    pa = None
+
+from pipeline_state import STATE_DIR, read_json, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("WAVESCOPE_ARCHIVE_DIR", os.path.join(STATE_DIR, "archive"))
+# "parquet" is compact; "arrow" (uncompressed IPC) maps straight into memory with no decoding
+ARCHIVE_FORMAT = os.getenv("WAVESCOPE_ARCHIVE_FORMAT", "parquet")
+
+ARCHIVE_TABLES = {
+    'raw_ingestion_data': {
+        'time_column': 'timestamp',
+        'platform_column': 'platform_source',
+        'flatten': ('raw_metrics', 'normalized_metrics', 'metadata'),
+        'refresh_days': 2,      # Late and spool-replayed rows can still land in recent days
+    },
+    'youtube_trends': {
+        'time_column': 'published_at',
+        'platform': 'youtube',
+        'flatten': (),
+        'refresh_days': 7,      # Counters on recent videos are updated in place
+    },
+}
+
+EXPORT_PAGE_SIZE = 1000
+TIMESTAMP_COLUMNS = {'timestamp', 'published_at', 'created_at', 'updated_at', 'first_seen_at'}
+FILE_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for the history archive: pip install pyarrow")
+
+
+def flat_name(column: str, key: str) -> str:
+    """Archive column holding `key` of the JSONB column `column`"""
+    return f"{column}__{key}"
+
+
+def archive_columns(select: str) -> Dict[str, str]:
+    """Archive column -> output name for a PostgREST select such as RAW_SELECT"""
+    columns = {}
+    for item in select.split(","):
+        alias, sep, expression = item.strip().partition(":")
+        if not sep:
+            alias, expression = item.strip(), item.strip()
+        source, _, key = expression.replace("->>", "->").partition("->")
+        columns[flat_name(source, key) if key else source] = alias
+    return columns
+
+
+def _utc(moment) -> Optional[datetime]:
+    if moment is None:
+        return None
+    if isinstance(moment, str):
+        moment = datetime.fromisoformat(moment.replace("Z", "+00:00"))
+    elif not isinstance(moment, datetime):
+        moment = datetime(moment.year, moment.month, moment.day)
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def flatten_row(row: Dict, nested_columns) -> Dict:
+    """One level of each JSONB document becomes its own column; deeper values stay JSON"""
+    flat = {}
+    for column, value in row.items():
+        if column in nested_columns:
+            if isinstance(value, str):
+                value = json.loads(value or "{}")
+            for key, item in (value or {}).items():
+                flat[flat_name(column, key)] = json.dumps(item) if isinstance(item, (dict, list)) else item
+        elif isinstance(value, (dict, list)):
+            flat[column] = json.dumps(value)
+        else:
+            flat[column] = value
+    return flat
+
+
+def _column_array(name: str, values: list):
+    present = [value for value in values if value is not None]
+    if not present:
+        return pa.nulls(len(values))
+    if name in TIMESTAMP_COLUMNS:
+        return pa.array([_utc(value) for value in values], type=pa.timestamp('us', tz='UTC'))
+    if all(isinstance(value, bool) for value in present):
+        return pa.array(values, type=pa.bool_())
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return pa.array(values, type=pa.int64())
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return pa.array([None if value is None else float(value) for value in values], type=pa.float64())
+    return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def rows_to_table(rows: List[Dict], time_column: str):
+    """Arrow table with stable column types, sorted by time so scans come out ordered"""
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    table = pa.table({name: _column_array(name, [row.get(name) for row in rows]) for name in names})
+    return table.sort_by(time_column)
+
+
+class HistoryArchiver:
+    """Exports completed days of ingestion history into the archive"""
+
+    def __init__(self, supabase, directory: Optional[str] = None, fmt: Optional[str] = None):
+        require_pyarrow()
+        self.supabase = supabase
+        self.directory = directory or ARCHIVE_DIR
+        self.format = fmt or ARCHIVE_FORMAT
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+        self.description_cache: Dict[tuple, str] = {}
+
+    def manifest(self) -> Dict:
+        return read_json(self.manifest_path, {}) or {}
+
+    def fetch_rows(self, table: str, start: datetime, end: datetime) -> List[Dict]:
+        time_column = ARCHIVE_TABLES[table]['time_column']
+        rows, offset = [], 0
+        while True:
+            page = self.supabase.table(table)\
+                .select("*")\
+                .gte(time_column, start.isoformat())\
+                .lt(time_column, end.isoformat())\
+                .order(time_column)\
+                .order("id")\
+                .range(offset, offset + EXPORT_PAGE_SIZE - 1)\
+                .execute().data or []
+            rows.extend(page)
+            if len(page) < EXPORT_PAGE_SIZE:
+                return rows
+            offset += EXPORT_PAGE_SIZE
+
+    def fill_descriptions(self, rows: List[Dict]):
+        """Copy descriptions from video_metadata so compact snapshots are self-contained"""
+        column = flat_name('metadata', 'description')
+        wanted = {(row['source'], row['content_id']) for row in rows
+                  if not row.get(column) and (row['source'], row['content_id']) not in self.description_cache}
+        for source in {source for source, _ in wanted}:
+            ids = sorted(content_id for s, content_id in wanted if s == source)
+            for start in range(0, len(ids), 200):
+                response = self.supabase.table("video_metadata")\
+                    .select("content_id,description")\
+                    .eq("source", source)\
+                    .in_("content_id", ids[start:start + 200])\
+                    .execute()
+                for row in response.data or []:
+                    self.description_cache[(source, row["content_id"])] = row.get("description") or ''
+            for content_id in ids:
+                self.description_cache.setdefault((source, content_id), '')
+        for row in rows:
+            if not row.get(column):
+                row[column] = self.description_cache.get((row['source'], row['content_id']), '')
+
+    def export_day(self, table: str, day: date) -> Dict:
+        """Replace the archived partitions of one UTC day"""
+        config = ARCHIVE_TABLES[table]
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        rows = [flatten_row(row, config['flatten']) for row in self.fetch_rows(table, start, start + timedelta(days=1))]
+        if table == 'raw_ingestion_data' and rows:
+            self.fill_descriptions(rows)
+
+        by_platform: Dict[str, List[Dict]] = {}
+        for row in rows:
+            platform = config.get('platform') or row.get(config['platform_column']) or 'unknown'
+            by_platform.setdefault(platform, []).append(row)
+
+        # Built beside the live partition and swapped in, so readers never see half a day
+        day_dir = os.path.join(self.directory, table, f"date={day.isoformat()}")
+        staging = day_dir + ".tmp"
+        retired = day_dir + ".old"
+        if os.path.isdir(retired) and not os.path.isdir(day_dir):
+            os.replace(retired, day_dir)  # An earlier export died mid-swap; put the old day back
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(retired, ignore_errors=True)
+        for platform, platform_rows in by_platform.items():
+            path = os.path.join(staging, f"platform={platform}", "part-0" + FILE_EXTENSIONS[self.format])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            arrow_table = rows_to_table(platform_rows, config['time_column'])
+            if self.format == 'arrow':
+                with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                    writer.write_table(arrow_table)
+            else:
+                pq.write_table(arrow_table, path, compression='zstd')
+        # Renames only: the live day is never deleted until its replacement is in place
+        if os.path.isdir(day_dir):
+            os.replace(day_dir, retired)
+        if by_platform:
+            os.replace(staging, day_dir)
+        shutil.rmtree(retired, ignore_errors=True)
+
+        return {'rows': len(rows), 'platforms': sorted(by_platform),
+                'exported_at': datetime.now(timezone.utc).isoformat()}
+
+    def run(self, lookback_days: int = 7, tables=None) -> Dict:
+        """Export completed days that are missing or still settling; returns rows per table"""
+        today = datetime.now(timezone.utc).date()
+        manifest = self.manifest()
+        summary = {}
+        for table in tables or ARCHIVE_TABLES:
+            done = manifest.setdefault(table, {})
+            refresh_from = today - timedelta(days=ARCHIVE_TABLES[table]['refresh_days'])
+            exported = 0
+            for offset in range(lookback_days, 0, -1):
+                day = today - timedelta(days=offset)
+                if day.isoformat() in done and day < refresh_from:
+                    continue
+                entry = self.export_day(table, day)
+                done[day.isoformat()] = entry
+                exported += entry['rows']
+                # Written per day so an interrupted backfill resumes where it stopped
+                write_json_atomic(self.manifest_path, manifest)
+            summary[table] = exported
+        logger.info("🗄️ History archive export: " + ", ".join(f"{t} {n} rows" for t, n in summary.items()))
+        return summary
+
+
+class HistoryReader:
+    """Memory-mapped reads over the archive, pruned to the requested days and platforms"""
+
+    def __init__(self, directory: Optional[str] = None, fmt: Optional[str] = None):
+        require_pyarrow()
+        self.directory = directory or ARCHIVE_DIR
+        self.format = fmt or ARCHIVE_FORMAT
+        self.filesystem = pafs.LocalFileSystem(use_mmap=True)
+
+    def days(self, table: str) -> List[str]:
+        table_dir = os.path.join(self.directory, table)
+        if not os.path.isdir(table_dir):
+            return []
+        return sorted(name[len("date="):] for name in os.listdir(table_dir)
+                      if name.startswith("date=") and not name.endswith((".tmp", ".old")))
+
+    def files(self, table: str, start=None, end=None, platforms=None) -> List[str]:
+        """Partition files covering [start, end), chosen from directory names alone"""
+        start, end = _utc(start), _utc(end)
+        first = start.date().isoformat() if start else None
+        last = end.date().isoformat() if end else None
+        paths = []
+        for day in self.days(table):
+            if (first and day < first) or (last and day > last):
+                continue
+            day_dir = os.path.join(self.directory, table, f"date={day}")
+            try:
+                names = sorted(os.listdir(day_dir))
+            except FileNotFoundError:
+                continue  # Being swapped by an export right now
+            for name in names:
+                if platforms and name[len("platform="):] not in platforms:
+                    continue
+                part_dir = os.path.join(day_dir, name)
+                paths.extend(os.path.join(part_dir, f) for f in sorted(os.listdir(part_dir))
+                             if f.endswith(FILE_EXTENSIONS[self.format]))
+        return paths
+
+    def _schema(self, path: str):
+        if self.format == 'arrow':
+            with pa.memory_map(path) as source:
+                return pa.ipc.open_file(source).schema
+        return pq.read_schema(path, memory_map=True)
+
+    def dataset(self, table: str, start=None, end=None, platforms=None):
+        paths = self.files(table, start, end, platforms)
+        if not paths:
+            return None
+        # Days written at different times may differ in columns or int/float types
+        schema = pa.unify_schemas([self._schema(path) for path in paths], promote_options='permissive')
+        return ds.dataset(paths, schema=schema, format='ipc' if self.format == 'arrow' else 'parquet',
+                          filesystem=self.filesystem)
+
+    def _filter(self, table: str, start=None, end=None):
+        time_column = ds.field(ARCHIVE_TABLES[table]['time_column'])
+        conditions = []
+        if start is not None:
+            conditions.append(time_column >= pa.scalar(_utc(start), type=pa.timestamp('us', tz='UTC')))
+        if end is not None:
+            conditions.append(time_column < pa.scalar(_utc(end), type=pa.timestamp('us', tz='UTC')))
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def read(self, table: str, start=None, end=None, platforms=None, columns=None):
+        """Arrow table of the rows in [start, end); missing columns are left out"""
+        dataset = self.dataset(table, start, end, platforms)
+        if dataset is None:
+            return None
+        if columns is not None:
+            columns = [column for column in columns if column in dataset.schema.names]
+        return dataset.to_table(columns=columns, filter=self._filter(table, start, end))
+
+    def frames(self, table: str, start=None, end=None, platforms=None, columns=None,
+               chunk_size: int = 10000, newest_first: bool = False) -> Iterator:
+        """DataFrames of at most chunk_size rows, one day at a time in time order"""
+        start, end = _utc(start), _utc(end)
+        time_column = ARCHIVE_TABLES[table]['time_column']
+        if columns is not None and time_column not in columns:
+            columns = list(columns) + [time_column]
+        days = [day for day in self.days(table)
+                if (not start or day >= start.date().isoformat()) and (not end or day <= end.date().isoformat())]
+        for day in (reversed(days) if newest_first else days):
+            day_start = datetime.fromisoformat(day).replace(tzinfo=timezone.utc)
+            day_end = day_start + timedelta(days=1)
+            arrow_table = self.read(table, max(start, day_start) if start else day_start,
+                                    min(end, day_end) if end else day_end, platforms, columns)
+            if arrow_table is None or not arrow_table.num_rows:
+                continue
+            arrow_table = arrow_table.sort_by([(time_column, 'descending' if newest_first else 'ascending')])
+            for offset in range(0, arrow_table.num_rows, chunk_size):
+                yield arrow_table.slice(offset, chunk_size).to_pandas()
+
+    def rows(self, table: str, start=None, end=None, platforms=None, columns=None) -> List[Dict]:
+        arrow_table = self.read(table, start, end, platforms, columns)
+        return arrow_table.to_pylist() if arrow_table is not None else []
+
+    def stats(self) -> Dict:
+        return {table: {'days': len(self.days(table)),
+                        'bytes': sum(os.path.getsize(path) for path in self.files(table))}
+                for table in ARCHIVE_TABLES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export ingestion history to the columnar archive or reprocess from it")
+    parser.add_argument("command", choices=["export", "rescore", "trends", "stats"])
+    parser.add_argument("--days", type=int, default=7, help="days to export, or to re-score")
+    parser.add_argument("--table", choices=sorted(ARCHIVE_TABLES), action="append")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if pa is None:
+        print("❌ pyarrow is required: pip install pyarrow")
+        return 1
+    if args.command == "stats":
+        print(json.dumps(HistoryReader().stats(), indent=2))
+        return 0
+
+    from dotenv import load_dotenv
+    from datastore import create_client
+    load_dotenv()
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY"))
+    if args.command == "export":
+        summary = HistoryArchiver(client).run(lookback_days=args.days, tables=args.table)
+        print(f"🗄️ Archived {sum(summary.values())} rows")
+        return 0
+
+    if args.command == "trends":
+        # Rebuilds trend_insights from the last 7 archived days of youtube_trends
+        from cultural_trend_processor import run_cultural_trend_analysis
+        trend_insights = run_cultural_trend_analysis(archive=HistoryReader())
+        return 0 if trend_insights else 1
+
+    from wavescore_engine import WaveScoreEngine
+    result = WaveScoreEngine(client).run(lookback_hours=args.days * 24, archive=HistoryReader())
+    print(json.dumps(result, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,786 @@
+#!/usr/bin/env python3
+"""
+Local Embedded Datastore for WaveScope
+SQLite stand-in for the Supabase client: the CONFIG/ schema plus the fluent
+table/select/insert/upsert/filter subset and the RPCs the SERVER/ modules use,
+so load tests, benchmarks and dev runs never touch the network.
+Select it with SUPABASE_URL=sqlite:///path/to/wavescope.db (see datastore.py).
+"""
+
+import os
+import re
+import json
+import uuid
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "CONFIG"))
+
+# Loaded in order; a table defined in more than one file keeps its first definition
+SCHEMA_FILES = ("enhanced_supabase_schema.sql", "supabase_schema.sql", "tiktok_schema.sql")
+
+
+class LocalDatastoreError(Exception):
+    """Raised wherever PostgREST would answer with an error"""
+
+
+# ----------------------------------------------------------------------
+# Schema translation
+# ----------------------------------------------------------------------
+
+_CREATE_TABLE = re.compile(r"CREATE TABLE (?:IF NOT EXISTS )?(\w+)\s*\((.*?)\n\s*\)\s*(?:PARTITION BY [^;]*)?;",
+                           re.S | re.I)
+_CREATE_INDEX = re.compile(r"CREATE (UNIQUE )?INDEX (?:IF NOT EXISTS )?(\w+)\s+ON (\w+)\s*\(([\w\s,]+)\)\s*;", re.I)
+_DEFAULT = re.compile(r"\bDEFAULT\s+('(?:[^']|'')*'|[\w.+-]+(?:\(\))?)", re.I)
+_KEY_COLUMNS = re.compile(r"\(([^)]*)\)")
+
+
+class Column:
+    __slots__ = ('name', 'kind', 'default', 'serial')
+
+    def __init__(self, name: str, kind: str, default=None, serial: bool = False):
+        self.name = name
+        self.kind = kind          # text | integer | real | bool | json | timestamp | date
+        self.default = default    # None, ('value', v) or ('now' | 'today' | 'uuid', None)
+        self.serial = serial
+
+
+class TableSpec:
+    def __init__(self, name: str):
+        self.name = name
+        self.columns: Dict[str, Column] = {}
+        self.primary_key: List[str] = []
+        self.unique: List[List[str]] = []
+        self.column_sql: List[str] = []
+
+
+def _split_top_level(text: str, separator: str = ",") -> List[str]:
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == "'":
+            quoted = not quoted
+        elif quoted:
+            pass
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == separator and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _column_kind(type_sql: str) -> Tuple[str, str]:
+    """(kind, SQLite type) for a Postgres column type"""
+    upper = type_sql.upper()
+    if "[]" in upper or upper.startswith("JSON"):
+        return 'json', "TEXT"
+    if upper.startswith("TIMESTAMP"):
+        return 'timestamp', "TEXT"
+    if upper.startswith("DATE"):
+        return 'date', "TEXT"
+    if upper.startswith("INTERVAL"):
+        return 'text', "TEXT"
+    if upper.startswith("BOOL"):
+        return 'bool', "INTEGER"
+    if upper.startswith(("INT", "BIGINT", "SMALLINT", "SERIAL", "BIGSERIAL")):
+        return 'integer', "INTEGER"
+    if upper.startswith(("DECIMAL", "NUMERIC", "FLOAT", "REAL", "DOUBLE")):
+        return 'real', "REAL"
+    return 'text', "TEXT"  # VARCHAR, CHAR, TEXT, UUID
+
+
+def _parse_default(definition: str, kind: str):
+    match = _DEFAULT.search(definition)
+    if not match:
+        return None
+    raw = match.group(1)
+    lowered = raw.lower()
+    if lowered in ("now()", "current_timestamp"):
+        return ('now', None)
+    if lowered == "current_date":
+        return ('today', None)
+    if lowered in ("uuid_generate_v4()", "gen_random_uuid()"):
+        return ('uuid', None)
+    if lowered in ("true", "false"):
+        return ('value', lowered == "true")
+    if raw.startswith("'"):
+        value = raw[1:-1].replace("''", "'")
+        if kind == 'json':
+            if value.startswith("{") and "[]" in definition.split("DEFAULT")[0]:
+                # Postgres array literal '{a,b}'
+                value = [item.strip().strip('"') for item in value[1:-1].split(",") if item.strip()]
+            else:
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    return None
+        return ('value', value)
+    try:
+        return ('value', int(raw))
+    except ValueError:
+        try:
+            return ('value', float(raw))
+        except ValueError:
+            return None  # Expression defaults are left to the caller
+
+
+def parse_schema(sql: str) -> Tuple[List[TableSpec], List[str]]:
+    """Tables and plain column indexes from a Postgres schema file"""
+    sql = re.sub(r"--[^\n]*", "", sql)
+    tables = []
+    for match in _CREATE_TABLE.finditer(sql):
+        spec = TableSpec(match.group(1))
+        for definition in _split_top_level(match.group(2)):
+            head = re.match(r"\w+", definition).group(0).upper()
+            if head in ("INDEX", "KEY"):
+                continue  # MySQL-style inline index; Postgres rejects these too
+            if head in ("PRIMARY", "UNIQUE", "CONSTRAINT", "CHECK", "FOREIGN", "EXCLUDE"):
+                key = _KEY_COLUMNS.search(definition)
+                upper = definition.upper()
+                if key and "PRIMARY KEY" in upper:
+                    spec.primary_key = [c.strip() for c in key.group(1).split(",")]
+                elif key and "UNIQUE" in upper:
+                    spec.unique.append([c.strip() for c in key.group(1).split(",")])
+                continue
+            name, type_sql = definition.split(None, 1)
+            upper = type_sql.upper()
+            kind, sqlite_type = _column_kind(type_sql)
+            serial = upper.startswith(("SERIAL", "BIGSERIAL"))
+            column = Column(name, kind, _parse_default(type_sql, kind), serial)
+            spec.columns[name] = column
+            if serial:
+                spec.column_sql.append(f'"{name}" INTEGER PRIMARY KEY AUTOINCREMENT')
+                spec.primary_key = [name]
+                continue
+            clauses = [f'"{name}" {sqlite_type}']
+            if "NOT NULL" in upper:
+                clauses.append("NOT NULL")
+            if "PRIMARY KEY" in upper:
+                spec.primary_key = [name]
+            elif re.search(r"\bUNIQUE\b", upper):
+                clauses.append("UNIQUE")
+            spec.column_sql.append(" ".join(clauses))
+        tables.append(spec)
+
+    indexes = []
+    for match in _CREATE_INDEX.finditer(sql):
+        unique, name, table, columns = match.groups()
+        columns = ", ".join(f'"{c.split()[0]}"' + (" DESC" if "DESC" in c.upper() else "")
+                            for c in columns.split(","))
+        indexes.append(f'CREATE {unique or ""}INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns})')
+    return tables, indexes
+
+
+def table_ddl(spec: TableSpec) -> str:
+    clauses = list(spec.column_sql)
+    serial = any(column.serial for column in spec.columns.values())
+    if spec.primary_key and not serial:
+        clauses.append("PRIMARY KEY (" + ", ".join(f'"{c}"' for c in spec.primary_key) + ")")
+    for columns in spec.unique:
+        clauses.append("UNIQUE (" + ", ".join(f'"{c}"' for c in columns) + ")")
+    return f'CREATE TABLE IF NOT EXISTS "{spec.name}" (\n    ' + ",\n    ".join(clauses) + "\n)"
+
+
+# ----------------------------------------------------------------------
+# Value conversion
+# ----------------------------------------------------------------------
+
+def to_timestamp(value) -> Optional[str]:
+    """UTC ISO string, so stored timestamps sort and compare as text"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, date):
+        moment = datetime(value.year, value.month, value.day)
+    else:
+        try:
+            moment = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise LocalDatastoreError(f'invalid input syntax for type timestamp with time zone: "{value}"')
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+def encode_value(column: Column, value):
+    if value is None:
+        return None
+    if column.kind == 'json':
+        return json.dumps(value, default=str)
+    if column.kind == 'timestamp':
+        return to_timestamp(value)
+    if column.kind == 'date':
+        return value.isoformat()[:10] if isinstance(value, (date, datetime)) else str(value)[:10]
+    if column.kind == 'bool':
+        if isinstance(value, str):
+            return int(value.lower() in ("true", "t", "1", "yes"))
+        return int(bool(value))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def decode_value(column: Optional[Column], value):
+    if value is None or column is None:
+        return value
+    if column.kind == 'json':
+        return json.loads(value)
+    if column.kind == 'bool':
+        return bool(value)
+    return value
+
+
+def _json_path(keys: List[str]) -> str:
+    return "$" + "".join(f"[{key}]" if key.isdigit() else '."' + key.replace('"', '\\"') + '"' for key in keys)
+
+
+def _default_value(column: Column):
+    kind, value = column.default
+    if kind == 'now':
+        return datetime.now(timezone.utc)
+    if kind == 'today':
+        return datetime.now(timezone.utc).date()
+    if kind == 'uuid':
+        return str(uuid.uuid4())
+    return value
+
+
+# ----------------------------------------------------------------------
+# Query builder
+# ----------------------------------------------------------------------
+
+class LocalResponse:
+    """Matches the .data/.count shape of a postgrest APIResponse"""
+
+    def __init__(self, data, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class LocalQuery:
+    """One table request, built fluently and run by execute()"""
+
+    def __init__(self, store: 'LocalDatastore', table: str):
+        self.store = store
+        self.table = table
+        self.operation = 'select'
+        self.columns = "*"
+        self.count_mode = None
+        self.payload = None
+        self.on_conflict = None
+        self.ignore_duplicates = False
+        self.filters: List[Tuple[str, list]] = []
+        self.orders: List[str] = []
+        self.limit_count = None
+        self.offset_count = None
+
+    # Operations
+    def select(self, *columns, count: Optional[str] = None, **kwargs):
+        self.operation = 'select'
+        self.columns = ",".join(columns) or "*"
+        self.count_mode = count
+        return self
+
+    def insert(self, json, count: Optional[str] = None, **kwargs):
+        self.operation, self.payload, self.count_mode = 'insert', json, count
+        return self
+
+    def upsert(self, json, on_conflict: str = "", ignore_duplicates: bool = False, count: Optional[str] = None,
+               **kwargs):
+        self.operation, self.payload, self.count_mode = 'upsert', json, count
+        self.on_conflict = on_conflict
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json, count: Optional[str] = None, **kwargs):
+        self.operation, self.payload, self.count_mode = 'update', json, count
+        return self
+
+    def delete(self, count: Optional[str] = None, **kwargs):
+        self.operation, self.count_mode = 'delete', count
+        return self
+
+    # Filters
+    def _compare(self, column: str, operator: str, value):
+        expression, encode = self.store.filter_expression(self.table, column)
+        self.filters.append((f"{expression} {operator} ?", [encode(value)]))
+        return self
+
+    def eq(self, column: str, value):
+        return self._compare(column, "=", value)
+
+    def neq(self, column: str, value):
+        return self._compare(column, "!=", value)
+
+    def gt(self, column: str, value):
+        return self._compare(column, ">", value)
+
+    def gte(self, column: str, value):
+        return self._compare(column, ">=", value)
+
+    def lt(self, column: str, value):
+        return self._compare(column, "<", value)
+
+    def lte(self, column: str, value):
+        return self._compare(column, "<=", value)
+
+    def like(self, column: str, pattern: str):
+        expression, _ = self.store.filter_expression(self.table, column)
+        self.filters.append((f"{expression} LIKE ? ESCAPE '\\'", [pattern.replace("*", "%")]))
+        return self
+
+    def ilike(self, column: str, pattern: str):
+        expression, _ = self.store.filter_expression(self.table, column)
+        self.filters.append((f"lower({expression}) LIKE lower(?) ESCAPE '\\'", [pattern.replace("*", "%")]))
+        return self
+
+    def is_(self, column: str, value):
+        expression, _ = self.store.filter_expression(self.table, column)
+        if value is None or str(value).lower() == "null":
+            self.filters.append((f"{expression} IS NULL", []))
+        else:
+            self.filters.append((f"{expression} = ?", [int(str(value).lower() == "true")]))
+        return self
+
+    def in_(self, column: str, values):
+        expression, encode = self.store.filter_expression(self.table, column)
+        values = list(values)
+        if not values:
+            self.filters.append(("0", []))
+        else:
+            self.filters.append((f"{expression} IN ({', '.join('?' * len(values))})", [encode(v) for v in values]))
+        return self
+
+    def match(self, query: Dict):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None, **kwargs):
+        expression, _ = self.store.filter_expression(self.table, column)
+        # Postgres puts NULLs last ascending and first descending unless told otherwise
+        nulls_first = desc if nullsfirst is None else nullsfirst
+        self.orders.append(f"({expression} IS NULL) {'DESC' if nulls_first else 'ASC'}")
+        self.orders.append(f"{expression} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size: int, **kwargs):
+        self.limit_count = size
+        return self
+
+    def offset(self, size: int):
+        self.offset_count = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs):
+        self.offset_count = start
+        self.limit_count = end - start + 1
+        return self
+
+    def execute(self) -> LocalResponse:
+        return self.store.run_query(self)
+
+
+class LocalRpc:
+    def __init__(self, store: 'LocalDatastore', name: str, params: Optional[Dict]):
+        self.store = store
+        self.name = name
+        self.params = params or {}
+
+    def execute(self) -> LocalResponse:
+        return LocalResponse(self.store.call(self.name, self.params))
+
+
+# ----------------------------------------------------------------------
+# Datastore
+# ----------------------------------------------------------------------
+
+RPC_HANDLERS: Dict[str, Callable] = {}
+
+
+def register_rpc(name: str):
+    """Register a Python stand-in for a SQL function: handler(store, params) -> data"""
+    def decorator(handler):
+        RPC_HANDLERS[name] = handler
+        return handler
+    return decorator
+
+
+class LocalDatastore:
+    """Supabase-compatible client over one SQLite database"""
+
+    def __init__(self, path: str = ":memory:", schema_files=SCHEMA_FILES, schema_dir: str = CONFIG_DIR):
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA case_sensitive_like = ON")
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.tables: Dict[str, TableSpec] = {}
+        self.load_schema([os.path.join(schema_dir, name) for name in schema_files])
+
+    def load_schema(self, paths: List[str]):
+        statements = []
+        for path in paths:
+            with open(path) as f:
+                tables, indexes = parse_schema(f.read())
+            for spec in tables:
+                if spec.name not in self.tables:
+                    self.tables[spec.name] = spec
+                    statements.append(table_ddl(spec))
+            statements.extend(indexes)
+        with self.lock:
+            for statement in statements:
+                try:
+                    self.connection.execute(statement)
+                except sqlite3.Error as e:
+                    logger.debug(f"Skipped schema statement ({e}): {statement[:80]}")
+            for spec in self.tables.values():
+                # A database file from an older schema gets the columns added since
+                existing = {row[1] for row in self.connection.execute(f'PRAGMA table_info("{spec.name}")')}
+                if not existing:
+                    continue
+                for name, column in spec.columns.items():
+                    if name not in existing:
+                        sqlite_type = "INTEGER" if column.kind in ('integer', 'bool') else \
+                            "REAL" if column.kind == 'real' else "TEXT"
+                        self.connection.execute(f'ALTER TABLE "{spec.name}" ADD COLUMN "{name}" {sqlite_type}')
+        logger.info(f"🗄️ Local datastore ready: {self.path} ({len(self.tables)} tables)")
+
+    # Client API
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> LocalRpc:
+        return LocalRpc(self, name, params)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    # Internals
+    def spec(self, table: str) -> TableSpec:
+        if table not in self.tables:
+            raise LocalDatastoreError(f'relation "public.{table}" does not exist')
+        return self.tables[table]
+
+    def column(self, table: str, name: str) -> Column:
+        spec = self.spec(table)
+        if name not in spec.columns:
+            raise LocalDatastoreError(f"column {table}.{name} does not exist")
+        return spec.columns[name]
+
+    def filter_expression(self, table: str, path: str) -> Tuple[str, Callable]:
+        """SQL expression and value encoder for a column or PostgREST json path"""
+        parts = re.split(r"(->>|->)", path.strip())
+        column = self.column(table, parts[0])
+        if len(parts) == 1:
+            return f'"{column.name}"', lambda value: encode_value(column, value)
+        json_path = _json_path(parts[2::2])
+        if parts[-2] == "->>":
+            return f"CAST(json_extract(\"{column.name}\", '{json_path}') AS TEXT)", \
+                lambda value: None if value is None else str(value)
+
+        def encode_json(value):
+            # PostgREST parses the value as jsonb for -> comparisons
+            if isinstance(value, str):
+                try:
+                    return json.loads(value)
+                except ValueError:
+                    return value
+            return value
+        return f"json_extract(\"{column.name}\", '{json_path}')", encode_json
+
+    def select_list(self, table: str, columns: str) -> Tuple[str, List[Tuple[str, Callable]]]:
+        spec = self.spec(table)
+        expressions, outputs = [], []
+        for item in _split_top_level(columns):
+            if "(" in item:
+                raise LocalDatastoreError(f"embedded resources are not supported locally: {item}")
+            if item == "*":
+                for column in spec.columns.values():
+                    expressions.append(f'"{column.name}"')
+                    outputs.append((column.name, lambda value, column=column: decode_value(column, value)))
+                continue
+            alias, sep, expression = item.partition(":")
+            if not sep:
+                alias, expression = None, item
+            parts = re.split(r"(->>|->)", expression.strip())
+            column = self.column(table, parts[0])
+            if len(parts) == 1:
+                expressions.append(f'"{column.name}"')
+                outputs.append((alias or column.name, lambda value, column=column: decode_value(column, value)))
+                continue
+            json_path = _json_path(parts[2::2])
+            if parts[-2] == "->>":
+                expressions.append(f"json_extract(\"{column.name}\", '{json_path}')")
+                outputs.append((alias or parts[-1], lambda value: None if value is None else str(value)))
+            else:
+                expressions.append(f"json_quote(json_extract(\"{column.name}\", '{json_path}'))")
+                outputs.append((alias or parts[-1], lambda value: None if value is None else json.loads(value)))
+        return ", ".join(expressions), outputs
+
+    def _rows(self, cursor, outputs) -> List[Dict]:
+        return [{key: decode(value) for (key, decode), value in zip(outputs, row)} for row in cursor.fetchall()]
+
+    def _returning(self, spec: TableSpec) -> Tuple[str, List]:
+        outputs = [(c.name, lambda value, column=c: decode_value(column, value)) for c in spec.columns.values()]
+        return ", ".join(f'"{name}"' for name in spec.columns), outputs
+
+    def _where(self, query: LocalQuery) -> Tuple[str, list]:
+        if not query.filters:
+            return "", []
+        params = [param for _, values in query.filters for param in values]
+        return " WHERE " + " AND ".join(f"({sql})" for sql, _ in query.filters), params
+
+    def _encode_row(self, spec: TableSpec, row: Dict, fill_defaults: bool) -> Dict:
+        for name in row:
+            if name not in spec.columns:
+                raise LocalDatastoreError(f"Could not find the '{name}' column of '{spec.name}' in the schema cache")
+        values = {name: encode_value(spec.columns[name], value) for name, value in row.items()}
+        if fill_defaults:
+            for name, column in spec.columns.items():
+                if name not in values and column.default is not None:
+                    values[name] = encode_value(column, _default_value(column))
+        return values
+
+    def run_query(self, query: LocalQuery) -> LocalResponse:
+        try:
+            with self.lock:
+                self.connection.execute("BEGIN")
+                try:
+                    response = getattr(self, f"_run_{query.operation}")(query)
+                except BaseException:
+                    self.connection.execute("ROLLBACK")
+                    raise
+                self.connection.execute("COMMIT")
+                return response
+        except sqlite3.Error as e:
+            raise LocalDatastoreError(str(e)) from e
+
+    def _run_select(self, query: LocalQuery) -> LocalResponse:
+        select_sql, outputs = self.select_list(query.table, query.columns)
+        where, params = self._where(query)
+        sql = f'SELECT {select_sql} FROM "{query.table}"{where}'
+        if query.orders:
+            sql += " ORDER BY " + ", ".join(query.orders)
+        if query.limit_count is not None or query.offset_count is not None:
+            sql += f" LIMIT {int(query.limit_count if query.limit_count is not None else -1)}" \
+                   f" OFFSET {int(query.offset_count or 0)}"
+        data = self._rows(self.connection.execute(sql, params), outputs)
+        count = None
+        if query.count_mode:
+            count = self.connection.execute(f'SELECT COUNT(*) FROM "{query.table}"{where}', params).fetchone()[0]
+        return LocalResponse(data, count)
+
+    def _run_insert(self, query: LocalQuery) -> LocalResponse:
+        return self._write_rows(query, upsert=False)
+
+    def _run_upsert(self, query: LocalQuery) -> LocalResponse:
+        return self._write_rows(query, upsert=True)
+
+    def _write_rows(self, query: LocalQuery, upsert: bool) -> LocalResponse:
+        spec = self.spec(query.table)
+        rows = query.payload if isinstance(query.payload, list) else [query.payload]
+        returning, outputs = self._returning(spec)
+        target = [c.strip() for c in (query.on_conflict or "").split(",") if c.strip()] or spec.primary_key
+        data = []
+        for row in rows:
+            values = self._encode_row(spec, row, fill_defaults=True)
+            columns = list(values)
+            sql = f'INSERT INTO "{spec.name}" ({", ".join(f"{chr(34)}{c}{chr(34)}" for c in columns)}) ' \
+                  f'VALUES ({", ".join("?" * len(columns))})'
+            if upsert:
+                updates = [c for c in row if c not in target]
+                conflict = ", ".join(f'"{c}"' for c in target)
+                if query.ignore_duplicates or not updates:
+                    sql += f" ON CONFLICT ({conflict}) DO NOTHING"
+                else:
+                    sql += f" ON CONFLICT ({conflict}) DO UPDATE SET " + \
+                           ", ".join(f'"{c}" = excluded."{c}"' for c in updates)
+            sql += f" RETURNING {returning}"
+            data.extend(self._rows(self.connection.execute(sql, [values[c] for c in columns]), outputs))
+        return LocalResponse(data, len(data) if query.count_mode else None)
+
+    def _run_update(self, query: LocalQuery) -> LocalResponse:
+        spec = self.spec(query.table)
+        values = self._encode_row(spec, query.payload, fill_defaults=False)
+        where, params = self._where(query)
+        returning, outputs = self._returning(spec)
+        sql = f'UPDATE "{spec.name}" SET ' + ", ".join(f'"{c}" = ?' for c in values) + where + \
+              f" RETURNING {returning}"
+        data = self._rows(self.connection.execute(sql, list(values.values()) + params), outputs)
+        return LocalResponse(data, len(data) if query.count_mode else None)
+
+    def _run_delete(self, query: LocalQuery) -> LocalResponse:
+        spec = self.spec(query.table)
+        where, params = self._where(query)
+        returning, outputs = self._returning(spec)
+        data = self._rows(self.connection.execute(f'DELETE FROM "{spec.name}"{where} RETURNING {returning}', params),
+                          outputs)
+        return LocalResponse(data, len(data) if query.count_mode else None)
+
+    def call(self, name: str, params: Dict):
+        handler = RPC_HANDLERS.get(name)
+        if handler is None:
+            raise LocalDatastoreError(f"Could not find the function public.{name} in the schema cache")
+        try:
+            with self.lock:
+                self.connection.execute("BEGIN")
+                try:
+                    result = handler(self, params)
+                except BaseException:
+                    self.connection.execute("ROLLBACK")
+                    raise
+                self.connection.execute("COMMIT")
+                return result
+        except sqlite3.Error as e:
+            raise LocalDatastoreError(str(e)) from e
+
+
+# ----------------------------------------------------------------------
+# SQL function stand-ins
+# ----------------------------------------------------------------------
+
+@register_rpc("maintain_time_partitions")
+def _maintain_time_partitions(store: LocalDatastore, params: Dict):
+    """Partitioned tables are plain tables locally; there is nothing to maintain"""
+    return []
+
+
+@register_rpc("calculate_trend_stats")
+def _calculate_trend_stats(store: LocalDatastore, params: Dict):
+    trend_ids = list(params.get("trend_ids") or [])
+    if not trend_ids:
+        return []
+    flat_slope = float(params.get("flat_slope", 0.1))
+    since = to_timestamp(datetime.now(timezone.utc) - timedelta(hours=int(params.get("hours_back", 24))))
+    cursor = store.connection.execute(
+        f"SELECT trend_id, normalized_trend_score, (julianday(timestamp) - 2440587.5) * 24.0 "
+        f"FROM trend_scores WHERE trend_id IN ({', '.join('?' * len(trend_ids))}) AND timestamp >= ? "
+        f"ORDER BY trend_id, timestamp", trend_ids + [since])
+    points: Dict[str, List[Tuple[float, float]]] = {}
+    for trend_id, score, hours in cursor.fetchall():
+        points.setdefault(trend_id, []).append((float(score), hours))
+
+    results = []
+    for trend_id, series in points.items():
+        count = len(series)
+        scores = [score for score, _ in series]
+        mean_score = sum(scores) / count
+        mean_hours = sum(hours for _, hours in series) / count
+        volatility = (sum((s - mean_score) ** 2 for s in scores) / (count - 1)) ** 0.5 if count > 1 else 0.0
+        spread = sum((hours - mean_hours) ** 2 for _, hours in series)
+        # Same as REGR_SLOPE: no slope without two distinct timestamps
+        slope = sum((hours - mean_hours) * (score - mean_score) for score, hours in series) / spread if spread else 0.0
+        results.append({
+            'trend_id': trend_id,
+            'point_count': count,
+            'avg_score': round(mean_score, 2),
+            'max_score': round(max(scores), 2),
+            'latest_score': round(scores[-1], 2),
+            'volatility': round(volatility, 2),
+            'slope_per_hour': slope,
+            'trend_direction': 'rising' if slope > flat_slope else 'falling' if slope < -flat_slope else 'stable',
+        })
+    return results
+
+
+def _hour_bucket(timestamp: Optional[str]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    moment = datetime.fromisoformat(timestamp)
+    return to_timestamp(moment.replace(minute=0, second=0, microsecond=0))
+
+
+@register_rpc("apply_wavescore_summaries")
+def _apply_wavescore_summaries(store: LocalDatastore, params: Dict):
+    """Same contract as the plpgsql function: newer scores win, touched buckets are recomputed"""
+    spec = store.spec("latest_wavescores")
+    incoming: Dict[str, Dict] = {}
+    for entry in params.get("entries") or []:
+        if not entry.get("trend_id"):
+            continue
+        # jsonb_populate_recordset ignores keys that are not columns
+        row = {name: encode_value(spec.columns[name], value) for name, value in entry.items() if name in spec.columns}
+        current = incoming.get(row['trend_id'])
+        if current is None or (row.get('calculated_at') or "") > (current.get('calculated_at') or ""):
+            incoming[row['trend_id']] = row
+
+    connection = store.connection
+    touched = set()
+    applied = 0
+    columns = [name for name in spec.columns if name != 'updated_at']
+    now = to_timestamp(datetime.now(timezone.utc))
+    for trend_id, row in incoming.items():
+        existing = connection.execute(
+            "SELECT category, platform_source, snapshot_at, calculated_at FROM latest_wavescores WHERE trend_id = ?",
+            [trend_id]).fetchone()
+        if existing and existing[2] and (row.get('calculated_at') or "") >= (existing[3] or ""):
+            touched.add((existing[0], existing[1], _hour_bucket(existing[2])))
+        values = [row.get(name) for name in columns]
+        values[columns.index('view_count')] = values[columns.index('view_count')] or 0
+        cursor = connection.execute(
+            f"INSERT INTO latest_wavescores ({', '.join(columns)}, updated_at) "
+            f"VALUES ({', '.join('?' * len(columns))}, ?) "
+            f"ON CONFLICT (trend_id) DO UPDATE SET "
+            + ", ".join(f"{name} = excluded.{name}" for name in columns if name != 'trend_id')
+            + ", updated_at = excluded.updated_at WHERE latest_wavescores.calculated_at <= excluded.calculated_at",
+            values + [now])
+        applied += cursor.rowcount
+        if row.get('snapshot_at'):
+            touched.add((row.get('category'), row.get('platform_source'), _hour_bucket(row['snapshot_at'])))
+
+    for category, platform_source, hour_bucket in touched:
+        if category is None or platform_source is None:
+            continue
+        bucket_end = to_timestamp(datetime.fromisoformat(hour_bucket) + timedelta(hours=1))
+        count, avg_score, max_score, total_views = connection.execute(
+            "SELECT COUNT(trend_id), COALESCE(AVG(wave_score), 0), COALESCE(MAX(wave_score), 0), "
+            "COALESCE(SUM(view_count), 0) FROM latest_wavescores "
+            "WHERE category = ? AND platform_source = ? AND snapshot_at >= ? AND snapshot_at < ?",
+            [category, platform_source, hour_bucket, bucket_end]).fetchone()
+        if count:
+            connection.execute(
+                "INSERT INTO trending_summary (category, platform_source, hour_bucket, content_count, "
+                "avg_wave_score, max_wave_score, total_views, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (category, platform_source, hour_bucket) DO UPDATE SET "
+                "content_count = excluded.content_count, avg_wave_score = excluded.avg_wave_score, "
+                "max_wave_score = excluded.max_wave_score, total_views = excluded.total_views, "
+                "updated_at = excluded.updated_at",
+                [category, platform_source, hour_bucket, count, round(avg_score, 2), max_score, total_views, now])
+        else:
+            connection.execute(
+                "DELETE FROM trending_summary WHERE category = ? AND platform_source = ? AND hour_bucket = ?",
+                [category, platform_source, hour_bucket])
+    return applied
+
+
+_datastores: Dict[str, LocalDatastore] = {}
+_datastores_lock = threading.Lock()
+
+
+def open_datastore(path: str = ":memory:") -> LocalDatastore:
+    """Process-wide datastore per path, so every client in a run sees the same data"""
+    key = path if path == ":memory:" else os.path.abspath(path)
+    with _datastores_lock:
+        if key not in _datastores:
+            _datastores[key] = LocalDatastore(path)
+        return _datastores[key]
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Pipeline DAG Executor for WaveScope
+Runs stages as soon as their dependencies finish, with per-stage timeouts, retries and timing.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimeout(Exception):
+    """A stage attempt ran past its timeout"""
+
+
+class PipelineError(Exception):
+    """One or more stages failed; carries the partial run report"""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+@dataclass
+class Stage:
+    """A named unit of pipeline work and the stages it waits for"""
+    name: str
+    func: Callable[[], Dict]
+    depends_on: Tuple[str, ...] = ()
+    timeout_seconds: Optional[float] = None
+    retries: int = 0
+    retry_backoff_seconds: float = 2.0
+
+
+@dataclass
+class StageRun:
+    """Outcome and wall-clock accounting for one stage"""
+    status: str = 'pending'  # pending, running, success, failed, skipped
+    attempts: int = 0
+    started_offset_seconds: Optional[float] = None
+    wall_seconds: float = 0.0
+    waited_seconds: float = 0.0
+    error: Optional[str] = None
+    result: Optional[Dict] = None
+    attempt_seconds: List[float] = field(default_factory=list)
+
+    def timing(self) -> Dict:
+        return {
+            'status': self.status,
+            'attempts': self.attempts,
+            'started_offset_seconds': self.started_offset_seconds,
+            'wall_seconds': round(self.wall_seconds, 3),
+            'waited_seconds': round(self.waited_seconds, 3),
+            'attempt_seconds': [round(s, 3) for s in self.attempt_seconds],
+            'error': self.error
+        }
+
+
+# Stage name -> thread of a timed-out attempt that may still be running
+_abandoned: Dict[str, threading.Thread] = {}
+_abandoned_lock = threading.Lock()
+
+
+def call_with_timeout(func: Callable[[], Dict], timeout_seconds: Optional[float], name: str) -> Dict:
+    """Run func on its own daemon thread; a timed-out attempt is abandoned, not killed
+
+    A stage whose abandoned attempt is still running is not started again, so two
+    copies of the same stateful engine never run at once.
+    """
+    with _abandoned_lock:
+        previous = _abandoned.get(name)
+        if previous is not None and previous.is_alive():
+            raise StageTimeout(f"{name} is still running from an earlier timed-out attempt")
+        _abandoned.pop(name, None)
+    if not timeout_seconds:
+        return func()
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func()
+        except BaseException as e:
+            outcome['error'] = e
+
+    worker = threading.Thread(target=target, name=f"stage-{name}", daemon=True)
+    worker.start()
+    worker.join(timeout_seconds)
+    if worker.is_alive():
+        with _abandoned_lock:
+            _abandoned[name] = worker
+        raise StageTimeout(f"{name} exceeded {timeout_seconds}s")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('result')
+
+
+class PipelineDAG:
+    """Dependency graph of stages executed on a thread pool"""
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = [stage.name for stage in stages]
+        self.max_workers = max_workers
+        self.validate()
+
+    def validate(self):
+        """Reject unknown dependencies and cycles before anything runs"""
+        for stage in self.stages.values():
+            unknown = [dep for dep in stage.depends_on if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {unknown}")
+
+        visiting, done = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.order:
+            visit(name, [])
+
+    def _attempt(self, stage: Stage, run: StageRun, started_at: float) -> Dict:
+        run.started_offset_seconds = round(time.time() - started_at, 3)
+        stage_started = time.time()
+        for attempt in range(stage.retries + 1):
+            run.attempts = attempt + 1
+            attempt_started = time.time()
+            try:
+                result = call_with_timeout(stage.func, stage.timeout_seconds, stage.name)
+                run.attempt_seconds.append(time.time() - attempt_started)
+                run.wall_seconds = time.time() - stage_started
+                return result
+            except Exception as e:
+                run.attempt_seconds.append(time.time() - attempt_started)
+                # A timed-out attempt is still running; retrying would run the stage twice at once
+                if attempt >= stage.retries or isinstance(e, StageTimeout):
+                    run.wall_seconds = time.time() - stage_started
+                    raise
+                delay = stage.retry_backoff_seconds * (2 ** attempt)
+                logger.warning(f"⚠️ Stage {stage.name} attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def critical_path(self, runs: Dict[str, StageRun]) -> Tuple[List[str], float]:
+        """Longest chain of dependent stage wall times"""
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def longest(name):
+            if name not in best:
+                chains = [longest(dep) for dep in self.stages[name].depends_on]
+                length, path = max(chains, key=lambda c: c[0]) if chains else (0.0, [])
+                best[name] = (length + runs[name].wall_seconds, path + [name])
+            return best[name]
+
+        length, path = max((longest(name) for name in self.order), key=lambda c: c[0])
+        return path, round(length, 3)
+
+    def run(self) -> Dict:
+        """Execute every stage once its dependencies succeed; dependents of a failure are skipped"""
+        started_at = time.time()
+        runs = {name: StageRun() for name in self.order}
+        ready_at = {name: started_at for name in self.order if not self.stages[name].depends_on}
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as pool:
+            while True:
+                for name in self.order:
+                    run = runs[name]
+                    if run.status != 'pending':
+                        continue
+                    deps = [runs[dep].status for dep in self.stages[name].depends_on]
+                    if any(status in ('failed', 'skipped') for status in deps):
+                        run.status = 'skipped'
+                        run.error = 'dependency failed'
+                        continue
+                    if all(status == 'success' for status in deps):
+                        run.status = 'running'
+                        run.waited_seconds = time.time() - ready_at.get(name, started_at)
+                        futures[pool.submit(self._attempt, self.stages[name], run, started_at)] = name
+
+                if not futures:
+                    if any(run.status == 'pending' for run in runs.values()):
+                        continue  # Newly skipped stages may unblock further skips
+                    break
+
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = futures.pop(future)
+                    run = runs[name]
+                    try:
+                        run.result = future.result()
+                        run.status = 'success'
+                        logger.info(f"✅ Stage {name} finished in {run.wall_seconds:.2f}s")
+                    except Exception as e:
+                        run.status = 'failed'
+                        run.error = str(e)
+                        logger.error(f"❌ Stage {name} failed after {run.attempts} attempt(s): {e}")
+                    now = time.time()
+                    for other in self.order:
+                        if name in self.stages[other].depends_on:
+                            ready_at[other] = now
+
+        path, path_seconds = self.critical_path(runs)
+        return {
+            'results': {name: run.result for name, run in runs.items() if run.status == 'success'},
+            'stage_timings': {name: run.timing() for name, run in runs.items()},
+            'failed_stages': [name for name, run in runs.items() if run.status == 'failed'],
+            'skipped_stages': [name for name, run in runs.items() if run.status == 'skipped'],
+            'critical_path': path,
+            'critical_path_seconds': path_seconds,
+            'stage_seconds_total': round(sum(run.wall_seconds for run in runs.values()), 3),
+            'wall_seconds': round(time.time() - started_at, 3)
+        }
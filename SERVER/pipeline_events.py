@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Pipeline Progress Events for WaveScope
+The pipeline reports each finished stage and run as an event: a prefixed JSON
+line on stdout for a child process, or a direct callback for an in-process worker.
+The bot control server turns them into live record counts and throughput.
+"""
+
+import sys
+import json
+import time
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+EVENT_PREFIX = "WAVESCOPE_EVENT "
+
+# In-process consumers (the bot server's worker); with none registered events go to stdout
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(callback):
+    with _listeners_lock:
+        _listeners.append(callback)
+
+
+def remove_listener(callback):
+    with _listeners_lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+def emit_event(event: str, **fields):
+    """Hand a progress event to in-process listeners, or write it to stdout as one line"""
+    payload = {"event": event, "ts": time.time(), **fields}
+    with _listeners_lock:
+        listeners = list(_listeners)
+    if listeners:
+        for callback in listeners:
+            callback(payload)
+        return
+    sys.stdout.write(EVENT_PREFIX + json.dumps(payload, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def parse_event(line: str) -> Optional[Dict]:
+    """Return the event carried by an output line, or None for ordinary output"""
+    if not line.startswith(EVENT_PREFIX):
+        return None
+    try:
+        event = json.loads(line[len(EVENT_PREFIX):])
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+class PipelineMetrics:
+    """Running totals and a sliding-window write rate built from progress events"""
+
+    def __init__(self, window_seconds: int = 60):
+        self.window_seconds = window_seconds
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started_at = time.time()
+            self.rows_written = 0
+            self.rows_read = 0
+            self.runs_completed = 0
+            self.stage_failures = 0
+            self.rows_by_stage = {}
+            self.last_event = None
+            self.last_event_at = None
+            self.recent = deque()  # (timestamp, rows written)
+
+    def observe(self, event: Dict):
+        now = time.time()
+        with self.lock:
+            self.last_event = event
+            self.last_event_at = now
+            if event.get("event") == "stage":
+                written = int(event.get("rows_written") or 0)
+                self.rows_written += written
+                self.rows_read += int(event.get("rows_read") or 0)
+                stage = event.get("stage")
+                self.rows_by_stage[stage] = self.rows_by_stage.get(stage, 0) + written
+                if event.get("status") == "failed":
+                    self.stage_failures += 1
+                if written:
+                    self.recent.append((now, written))
+            elif event.get("event") == "run":
+                self.runs_completed += 1
+            self._trim(now)
+
+    def _trim(self, now: float):
+        while self.recent and self.recent[0][0] < now - self.window_seconds:
+            self.recent.popleft()
+
+    def rows_per_second(self) -> float:
+        now = time.time()
+        with self.lock:
+            self._trim(now)
+            window = min(self.window_seconds, max(now - self.started_at, 1.0))
+            return round(sum(rows for _, rows in self.recent) / window, 3)
+
+    def snapshot(self) -> Dict:
+        rate = self.rows_per_second()
+        with self.lock:
+            elapsed = max(time.time() - self.started_at, 1.0)
+            return {
+                "rowsWritten": self.rows_written,
+                "rowsRead": self.rows_read,
+                "rowsPerSecond": rate,
+                "averageRowsPerSecond": round(self.rows_written / elapsed, 3),
+                "rowsByStage": dict(self.rows_by_stage),
+                "runsCompleted": self.runs_completed,
+                "stageFailures": self.stage_failures,
+                "lastEvent": self.last_event,
+            }
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Stage Profiler for the WaveScope pipeline
+Wall/CPU time, rows read and written, Supabase round trips and bytes, and YouTube API
+calls with quota units per stage, written as one JSON line per run.
+"""
+
+import os
+import json
+import time
+import cProfile
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# YouTube Data API v3 quota cost per method; anything unlisted costs 1 unit
+YOUTUBE_QUOTA_COSTS = {
+    'search.list': 100,
+    'videos.list': 1,
+    'videoCategories.list': 1,
+    'channels.list': 1,
+    'commentThreads.list': 1,
+}
+WRITE_METHODS = {'insert', 'upsert', 'update'}
+PLAIN_VALUES = (str, bytes, int, float, bool, dict, list, tuple, type(None))
+
+
+@dataclass
+class StageProfile:
+    """Resource usage of one stage within one run"""
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    attempts: int = 0
+    rows_read: int = 0
+    rows_written: int = 0
+    db_round_trips: int = 0
+    db_seconds: float = 0.0
+    db_bytes_sent: int = 0
+    db_bytes_received: int = 0
+    db_by_table: Dict[str, int] = field(default_factory=dict)
+    api_calls: Dict[str, int] = field(default_factory=dict)
+    quota_units: int = 0
+    profile_file: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        for key in ('wall_seconds', 'cpu_seconds', 'db_seconds'):
+            data[key] = round(data[key], 4)
+        return data
+
+
+def _payload_bytes(payload) -> int:
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _RecordingProxy:
+    """Wraps a fluent builder; every chained call stays wrapped until execute() is recorded"""
+
+    def __init__(self, target, on_execute, path, write_payload=None):
+        self._target = target
+        self._on_execute = on_execute
+        self._path = path
+        self._write_payload = write_payload
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name == 'execute':
+            return self._execute
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            payload = args[0] if name in WRITE_METHODS and args else self._write_payload
+            if isinstance(result, PLAIN_VALUES):
+                return result
+            return _RecordingProxy(result, self._on_execute, self._path + [name], payload)
+        return call
+
+    def _execute(self, *args, **kwargs):
+        started = time.perf_counter()
+        response = self._target.execute(*args, **kwargs)
+        self._on_execute(self._path, time.perf_counter() - started, self._write_payload, response)
+        return response
+
+
+class PipelineProfiler:
+    """Attributes work done on a stage's thread to that stage"""
+
+    def __init__(self, log_path: str = 'wavescope_pipeline.log', cprofile: bool = False):
+        base = os.path.splitext(log_path)[0]
+        self.report_path = f"{base}_profile.jsonl"
+        self.cprofile_dir = os.path.join(os.path.dirname(os.path.abspath(log_path)), 'pipeline_profiles')
+        self.cprofile = cprofile
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.run_id = None
+        self.started_at = None
+        self.stages: Dict[str, StageProfile] = {}
+
+    def start_run(self, run_id: str):
+        with self.lock:
+            self.run_id = run_id
+            self.started_at = datetime.now(timezone.utc).isoformat()
+            self.stages = {}
+
+    def _current(self) -> Optional[StageProfile]:
+        return getattr(self.local, 'stage', None)
+
+    # ------------------------------------------------------------------
+    # Stage wrapping
+    # ------------------------------------------------------------------
+
+    def wrap(self, stage: str, func):
+        """Measure a stage function on whatever thread ends up running it"""
+        def run_stage():
+            with self.lock:
+                profile = self.stages.setdefault(stage, StageProfile())
+            self.local.stage = profile
+            profiler = cProfile.Profile() if self.cprofile else None
+            wall_started = time.perf_counter()
+            cpu_started = time.thread_time()
+            if profiler:
+                try:
+                    profiler.enable()
+                except ValueError:
+                    # Python 3.12+ allows one active profiler; parallel stages take turns
+                    logger.warning(f"⚠️ cProfile busy with another stage, not profiling {stage}")
+                    profiler = None
+            try:
+                return func()
+            finally:
+                if profiler:
+                    profiler.disable()
+                    profile.profile_file = self._dump(stage, profiler)
+                with self.lock:
+                    profile.attempts += 1
+                    profile.wall_seconds += time.perf_counter() - wall_started
+                    profile.cpu_seconds += time.thread_time() - cpu_started
+                self.local.stage = None
+        return run_stage
+
+    def _dump(self, stage: str, profiler: cProfile.Profile) -> Optional[str]:
+        directory = os.path.join(self.cprofile_dir, self.run_id or 'adhoc')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{stage}.prof")
+            profiler.dump_stats(path)
+            return path
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write profile for {stage}: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Client instrumentation
+    # ------------------------------------------------------------------
+
+    def wrap_supabase(self, client):
+        """Count round trips, bytes and rows for every query built from this client"""
+        profiler = self
+
+        class InstrumentedSupabase:
+            def __getattr__(self, name):
+                attr = getattr(client, name)
+                if name not in ('table', 'from_', 'rpc'):
+                    return attr
+
+                def start(target, *args, **kwargs):
+                    return _RecordingProxy(attr(target, *args, **kwargs), profiler._record_db, [f"{name}:{target}"])
+                return start
+
+        return InstrumentedSupabase()
+
+    def _record_db(self, path, seconds, payload, response):
+        profile = self._current()
+        if profile is None:
+            return
+        data = getattr(response, 'data', None)
+        table = path[0].split(':', 1)[1]
+        is_write = any(step in WRITE_METHODS for step in path)
+        with self.lock:
+            profile.db_round_trips += 1
+            profile.db_seconds += seconds
+            profile.db_by_table[table] = profile.db_by_table.get(table, 0) + 1
+            profile.db_bytes_received += _payload_bytes(data)
+            if payload is not None:
+                profile.db_bytes_sent += _payload_bytes(payload)
+            if is_write:
+                profile.rows_written += len(payload) if isinstance(payload, list) else 1
+            elif isinstance(data, list):
+                profile.rows_read += len(data)
+
+    def wrap_youtube(self, resource):
+        """Count YouTube API requests and the quota units they spend"""
+        return _RecordingProxy(resource, self._record_api, ['youtube'])
+
+    def _record_api(self, path, seconds, payload, response):
+        profile = self._current()
+        if profile is None:
+            return
+        # path looks like ['youtube', 'videos', 'list']
+        method = '.'.join(path[-2:])
+        with self.lock:
+            profile.api_calls[method] = profile.api_calls.get(method, 0) + 1
+            profile.quota_units += YOUTUBE_QUOTA_COSTS.get(method, 1)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def report(self, extra: Optional[Dict] = None) -> Dict:
+        with self.lock:
+            stages = {name: profile.to_dict() for name, profile in self.stages.items()}
+        totals = {key: sum(stage[key] for stage in stages.values())
+                  for key in ('wall_seconds', 'cpu_seconds', 'rows_read', 'rows_written', 'db_round_trips',
+                              'db_seconds', 'db_bytes_sent', 'db_bytes_received', 'quota_units')}
+        return {
+            'run_id': self.run_id,
+            'started_at': self.started_at,
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'stages': stages,
+            'totals': {key: round(value, 4) if isinstance(value, float) else value for key, value in totals.items()},
+            **(extra or {})
+        }
+
+    def write(self, extra: Optional[Dict] = None) -> Dict:
+        """Append this run's profile as one JSON line"""
+        report = self.report(extra)
+        try:
+            with open(self.report_path, 'a') as f:
+                f.write(json.dumps(report, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write pipeline profile: {e}")
+        return report
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Local Pipeline State for WaveScope
+Where stage state lives on disk, plus per-run checkpoints so failed runs resume
+and repeat runs skip stages whose inputs have not moved.
+"""
+
+import os
+import json
+import uuid
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "pipeline_state")
+STATE_DIR = os.getenv("WAVESCOPE_STATE_DIR", DEFAULT_STATE_DIR)
+
+
+def write_json_atomic(path: str, payload):
+    """Write JSON via a temp file and rename so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str, default=None):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Ignoring unreadable state file {path}: {e}")
+        return default
+
+
+class CheckpointStore:
+    """Per-run stage checkpoints plus the input marks of each stage's last success"""
+
+    def __init__(self, state_dir: Optional[str] = None, keep_runs: int = 20, max_resumes: int = 3,
+                 max_resume_age_seconds: Optional[float] = 1800):
+        self.directory = os.path.join(state_dir or STATE_DIR, "checkpoints")
+        self.marks_path = os.path.join(self.directory, "stage_marks.json")
+        self.keep_runs = keep_runs
+        # A run that keeps failing downstream must not pin its stale ingestion output forever
+        self.max_resumes = max_resumes
+        self.max_resume_age_seconds = max_resume_age_seconds
+        self.lock = threading.Lock()
+        self.run = None
+
+    def _run_path(self, run_id: str) -> str:
+        return os.path.join(self.directory, f"run_{run_id}.json")
+
+    def latest_run(self) -> Optional[Dict]:
+        if not os.path.isdir(self.directory):
+            return None
+        runs = sorted(name for name in os.listdir(self.directory)
+                      if name.startswith("run_") and name.endswith(".json"))
+        return read_json(os.path.join(self.directory, runs[-1])) if runs else None
+
+    def resume_blocker(self, run: Dict) -> Optional[str]:
+        """Why an unfinished run is too old or resumed too often to resume again"""
+        if run.get("resume_count", 0) >= self.max_resumes:
+            return f"already resumed {run['resume_count']} times"
+        if self.max_resume_age_seconds is not None and run.get("started_at"):
+            age = (datetime.now(timezone.utc) - datetime.fromisoformat(run["started_at"])).total_seconds()
+            if age > self.max_resume_age_seconds:
+                return f"started {age / 60:.0f} minutes ago"
+        return None
+
+    def begin(self, resume: bool = True) -> Dict:
+        """Resume the latest unfinished run if it is recent enough, or start a new one"""
+        latest = self.latest_run() if resume else None
+        if latest and latest.get("status") != "success":
+            blocker = self.resume_blocker(latest)
+            if blocker:
+                logger.info(f"🆕 Not resuming pipeline run {latest['run_id']} ({blocker}); starting fresh")
+                latest["status"] = "abandoned"
+                write_json_atomic(self._run_path(latest["run_id"]), latest)
+                latest = None
+        if latest and latest.get("status") != "success":
+            self.run = latest
+            self.run["status"] = "running"
+            self.run["resumed_at"] = datetime.now(timezone.utc).isoformat()
+            self.run["resume_count"] = self.run.get("resume_count", 0) + 1
+            completed = [name for name, stage in latest.get("stages", {}).items() if stage.get("status") == "success"]
+            logger.info(f"♻️ Resuming pipeline run {latest['run_id']} (completed: {', '.join(completed) or 'none'})")
+        else:
+            # Sortable by name: start time first, then a short random suffix
+            run_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+            self.run = {"run_id": run_id, "status": "running",
+                        "started_at": datetime.now(timezone.utc).isoformat(), "stages": {}}
+            logger.info(f"🆕 Starting pipeline run {run_id}")
+        self._save_run()
+        return self.run
+
+    def completed_output(self, stage: str) -> Optional[Dict]:
+        """Output a resumed run already produced for this stage"""
+        with self.lock:
+            checkpoint = self.run["stages"].get(stage, {})
+            return checkpoint.get("output") if checkpoint.get("status") == "success" else None
+
+    def last_success(self, stage: str) -> Optional[Dict]:
+        """Input marks and output from the last time this stage succeeded in any run"""
+        with self.lock:
+            return read_json(self.marks_path, {}).get(stage)
+
+    def record(self, stage: str, status: str, output: Optional[Dict] = None,
+               input_marks: Optional[Dict] = None, error: Optional[str] = None):
+        with self.lock:
+            self.run["stages"][stage] = {
+                "status": status,
+                "output": output,
+                "input_marks": input_marks,
+                "error": error,
+                "recorded_at": datetime.now(timezone.utc).isoformat()
+            }
+            self._save_run()
+            if status == "success" and input_marks is not None:
+                marks = read_json(self.marks_path, {})
+                marks[stage] = {"input_marks": input_marks, "output": output, "run_id": self.run["run_id"]}
+                write_json_atomic(self.marks_path, marks)
+
+    def finish(self, status: str):
+        with self.lock:
+            self.run["status"] = status
+            self.run["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self._save_run()
+            self._prune()
+
+    def _save_run(self):
+        write_json_atomic(self._run_path(self.run["run_id"]), self.run)
+
+    def _prune(self):
+        runs = sorted(name for name in os.listdir(self.directory)
+                      if name.startswith("run_") and name.endswith(".json"))
+        for name in runs[:-self.keep_runs]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
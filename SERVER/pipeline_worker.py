@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+In-process Pipeline Worker for WaveScope
+Imports the orchestrator once per server process and runs it on a background
+thread, so supabase/googleapiclient imports, API discovery and engine state
+are paid for once per deployment instead of once per started run.
+"""
+
+import os
+import time
+import logging
+import threading
+import importlib.util
+from typing import Callable, Optional
+
+from pipeline_events import add_listener, remove_listener
+
+logger = logging.getLogger(__name__)
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+# Backoff before re-entering the cycle loop after it crashed outright
+CRASH_BACKOFF_SECONDS = 5
+CRASH_BACKOFF_MAX_SECONDS = 300
+
+
+def load_orchestrator_module():
+    """run-wavescope-pipeline.py has a hyphenated name, so import it by path"""
+    spec = importlib.util.spec_from_file_location(
+        "wavescope_pipeline_orchestrator", os.path.join(SERVER_DIR, "run-wavescope-pipeline.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class PipelineWorker:
+    """One long-lived orchestrator driven by start/pause/resume/stop"""
+
+    def __init__(self, on_event: Optional[Callable] = None, on_exit: Optional[Callable] = None):
+        self.on_event = on_event
+        self.on_exit = on_exit
+        self.orchestrator = None
+        self.thread = None
+        self.mode = None
+        self.crashes = 0
+        self.last_error = None
+        self.load_seconds = None
+        self.load_lock = threading.Lock()
+
+    def load(self):
+        """Import the pipeline and build the orchestrator the first time only"""
+        with self.load_lock:
+            if self.orchestrator is None:
+                started = time.time()
+                module = load_orchestrator_module()
+                self.orchestrator = module.WaveScopePipelineOrchestrator()
+                self.load_seconds = round(time.time() - started, 3)
+                logger.info(f"📦 Pipeline loaded in-process in {self.load_seconds:.2f}s")
+            return self.orchestrator
+
+    def is_alive(self) -> bool:
+        return bool(self.thread and self.thread.is_alive())
+
+    @property
+    def paused(self) -> bool:
+        return bool(self.orchestrator and not self.orchestrator.unpaused.is_set())
+
+    def start(self, mode: str, interval: float, jitter: float):
+        if self.is_alive():
+            raise RuntimeError("pipeline worker is already running")
+        orchestrator = self.load()
+        orchestrator.stop_event.clear()
+        orchestrator.unpaused.set()
+        self.mode = mode
+        self.last_error = None
+        self.thread = threading.Thread(target=self._run, args=(mode, interval, jitter),
+                                       name="pipeline-worker", daemon=True)
+        self.thread.start()
+
+    def _run(self, mode, interval, jitter):
+        if self.on_event:
+            add_listener(self.on_event)
+        orchestrator = self.orchestrator
+        backoff = CRASH_BACKOFF_SECONDS
+        try:
+            if mode != 'continuous':
+                orchestrator.run_complete_pipeline()
+                return
+            while not orchestrator.stop_event.is_set():
+                try:
+                    orchestrator.run_continuous(interval=interval, jitter=jitter)
+                except Exception as e:
+                    # Stage failures are handled per cycle; this is the loop itself dying
+                    self.crashes += 1
+                    self.last_error = str(e)
+                    logger.error(f"❌ Pipeline worker crashed: {e}; restarting in {backoff}s")
+                    if orchestrator.stop_event.wait(backoff):
+                        break
+                    backoff = min(backoff * 2, CRASH_BACKOFF_MAX_SECONDS)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"❌ Pipeline run failed: {e}")
+        finally:
+            if self.on_event:
+                remove_listener(self.on_event)
+            if self.on_exit:
+                self.on_exit()
+
+    def pause(self):
+        if not self.is_alive() or self.mode != 'continuous':
+            raise RuntimeError("only a running continuous worker can be paused")
+        self.orchestrator.pause()
+
+    def resume(self):
+        if not self.is_alive():
+            raise RuntimeError("pipeline worker is not running")
+        self.orchestrator.resume_cycles()
+
+    def stop(self, timeout: float = 10) -> bool:
+        """Ask the loop to stop after the current cycle; True once the thread has exited"""
+        if not self.is_alive():
+            return True
+        self.orchestrator.request_stop()
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
@@ -2,27 +2,46 @@
 import praw
 from flask import Flask, request, redirect, session
 import os
+import threading
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
+# Every worker process must sign sessions with the same key
+app.secret_key = os.getenv("FLASK_SECRET_KEY") or os.urandom(24)
 
-reddit = praw.Reddit(
-    client_id=os.getenv("REDDIT_CLIENT_ID"),
-    client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-    redirect_uri="https://YOUR_REPL_URL.replit.dev/reddit/callback",
-    user_agent="WaveSightSentimentBot"
-)
+_reddit = None
+_reddit_lock = threading.Lock()
+
+def get_reddit():
+    """Create the Reddit OAuth client on first use in this process"""
+    global _reddit
+    if _reddit is None:
+        with _reddit_lock:
+            if _reddit is None:
+                _reddit = praw.Reddit(
+                    client_id=os.getenv("REDDIT_CLIENT_ID"),
+                    client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+                    redirect_uri="https://YOUR_REPL_URL.replit.dev/reddit/callback",
+                    user_agent="WaveSightSentimentBot"
+                )
+    return _reddit
+
+def reset_process_state():
+    """Drop the inherited client after a fork so each worker builds its own"""
+    global _reddit, _reddit_lock
+    _reddit = None
+    _reddit_lock = threading.Lock()
 
 @app.route('/reddit/login')
 def reddit_login():
     # Generate authorization URL
-    auth_url = reddit.auth.url(["read"], "unique_state_string", "permanent")
+    auth_url = get_reddit().auth.url(["read"], "unique_state_string", "permanent")
     return redirect(auth_url)
 
 @app.route('/reddit/callback')
 def reddit_callback():
     code = request.args.get('code')
     if code:
+        reddit = get_reddit()
         # Exchange code for access token
         reddit.auth.authorize(code)
         # Now you can access user data
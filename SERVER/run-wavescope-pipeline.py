@@ -7,26 +7,76 @@ Runs the complete data pipeline from ingestion to analysis
 import os
 import sys
 import time
+import random
+import signal
+import argparse
 import logging
-from datetime import datetime
+import threading
+import importlib.util
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 # Add current directory to path for imports
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('wavescope_pipeline.log'),
-        logging.StreamHandler()
-    ]
-)
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SERVER_DIR)
+
+# Configure logging; per-run stage profiles are written next to this log
+PIPELINE_LOG_FILE = 'wavescope_pipeline.log'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+def attach_pipeline_log_handler():
+    """Log to PIPELINE_LOG_FILE even when the host process configured logging first
+
+    basicConfig is a no-op once the root logger has handlers, which is the case
+    when bot_control_server imports this module for its in-process worker.
+    """
+    root = logging.getLogger()
+    path = os.path.abspath(PIPELINE_LOG_FILE)
+    if any(isinstance(handler, logging.FileHandler) and handler.baseFilename == path
+           for handler in root.handlers):
+        return
+    handler = logging.FileHandler(PIPELINE_LOG_FILE)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(handler)
+
+attach_pipeline_log_handler()
 logger = logging.getLogger(__name__)
 
+# Stage graph: name, orchestrator method, dependencies, timeout seconds, retries.
+# Variant generation and anomaly detection only need WaveScores, so they run side by side.
+PIPELINE_STAGES = [
+    ("youtube_ingestion", "run_youtube_ingestion", (), 900, 1),
+    ("normalization", "run_normalization", ("youtube_ingestion",), 600, 1),
+    ("wavescore_generation", "run_wavescore_generation", ("normalization",), 900, 1),
+    ("variant_generation", "run_variant_generation", ("wavescore_generation",), 600, 1),
+    ("anomaly_detection", "run_anomaly_detection", ("wavescore_generation",), 600, 1),
+]
+
+# Tables/columns whose newest value marks each stage's input. A stage whose marks
+# match its last successful run is skipped. Ingestion reads the YouTube API, so its
+# mark is the current ingestion window instead.
+STAGE_INPUTS = {
+    "normalization": [("raw_ingestion_data", "timestamp")],
+    "wavescore_generation": [("raw_ingestion_data", "timestamp"), ("normalized_trend_bins", "bin_timestamp")],
+    "variant_generation": [("wavescores", "calculated_at")],
+    "anomaly_detection": [("trend_scores", "timestamp"), ("wavescores", "calculated_at")],
+}
+
+# Continuous mode: a cycle that reads at least this many new rows is behind and
+# shortens the interval; an idle cycle stretches it
+BACKLOG_HIGH_WATER = 1000
+
+def load_youtube_integrator():
+    """youtube-supabase-enhanced.py has a hyphenated name, so import it by path"""
+    spec = importlib.util.spec_from_file_location(
+        "youtube_supabase_enhanced", os.path.join(SERVER_DIR, "youtube-supabase-enhanced.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.YouTubeSupabaseIntegrator
+
 class WaveScopePipelineOrchestrator:
-    def __init__(self):
+    def __init__(self, resume=True, profile=False):
         """Initialize the pipeline orchestrator"""
         load_dotenv()
         
@@ -38,16 +88,76 @@ class WaveScopePipelineOrchestrator:
             raise ValueError(f"Missing required environment variables: {missing_vars}")
         
         self.start_time = time.time()
+        self._supabase = None
+        self._supabase_lock = threading.Lock()
+        self.max_parallel_stages = int(os.getenv("PIPELINE_MAX_WORKERS", "4"))
+        self.ingestion_interval_minutes = int(os.getenv("YOUTUBE_INGESTION_INTERVAL_MINUTES", "30"))
+        # resume=False (--fresh) starts a new run and ignores unchanged-input skips
+        self.resume = resume
+        self.checkpoints = None
+        
+        # Engines keep caches and detector state, so they live as long as the orchestrator
+        self.engines = {}
+        self._engines_lock = threading.Lock()
+        
+        # Continuous mode state, kept in memory between cycles
+        self.continuous = False
+        self.watermarks = {}
+        self.last_ingestion_window = None
+        self.last_forecast_at = 0.0
+        self.forecast_interval_minutes = int(os.getenv("FORECAST_INTERVAL_MINUTES", "60"))
+        self.stop_event = threading.Event()
+        # Cleared while paused; a paused loop finishes its current cycle, then waits
+        self.unpaused = threading.Event()
+        self.unpaused.set()
+        self.wavescore_lookback_hours = int(os.getenv("WAVESCORE_LOOKBACK_HOURS", "24"))
+        self.forecast_lookback_hours = int(os.getenv("FORECAST_LOOKBACK_HOURS", "168"))
+        self.forecast_horizon_hours = int(os.getenv("FORECAST_HORIZON_HOURS", "24"))
+        # Time partitions are created ahead and expired ones dropped (maintain_time_partitions)
+        self.partition_maintenance_hours = float(os.getenv("PARTITION_MAINTENANCE_HOURS", "6"))
+        self.last_partition_maintenance_at = 0.0
+        # Completed days are exported to the columnar history archive before retention drops them
+        self.archive_export_hours = float(os.getenv("ARCHIVE_EXPORT_HOURS", "24"))
+        self.archive_lookback_days = int(os.getenv("ARCHIVE_LOOKBACK_DAYS", "7"))
+        self.last_archive_export_at = 0.0
+        
+        # Stage profiling is always on; cProfile dumps are opt-in (--profile / PIPELINE_CPROFILE=1)
+        from pipeline_profiler import PipelineProfiler
+        cprofile = profile or os.getenv("PIPELINE_CPROFILE", "").lower() in ("1", "true", "yes")
+        self.profiler = PipelineProfiler(PIPELINE_LOG_FILE, cprofile=cprofile)
         logger.info("🚀 WaveScope Pipeline Orchestrator initialized")
 
+    @property
+    def supabase(self):
+        """Supabase client shared by the analysis stages, created on first use"""
+        with self._supabase_lock:
+            if self._supabase is None:
+                from datastore import create_client
+                client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY"))
+                self._supabase = self.profiler.wrap_supabase(client)
+        return self._supabase
+
+    def engine(self, name, factory):
+        """Create a stage engine once and reuse it on later runs/cycles"""
+        with self._engines_lock:
+            if name not in self.engines:
+                self.engines[name] = factory()
+            return self.engines[name]
+
+    def create_youtube_integrator(self):
+        YouTubeSupabaseIntegrator = load_youtube_integrator()
+        integrator = YouTubeSupabaseIntegrator()
+        integrator.youtube = self.profiler.wrap_youtube(integrator.youtube)
+        integrator.supabase = self.profiler.wrap_supabase(integrator.supabase)
+        return integrator
+
     def run_youtube_ingestion(self):
         """Step 1: YouTube Data Ingestion"""
         logger.info("📺 Step 1: Starting YouTube Data Ingestion...")
         
         try:
-            from youtube_supabase_enhanced import YouTubeSupabaseIntegrator
-            
-            integrator = YouTubeSupabaseIntegrator()
+            # The API client is built from a discovery document, so keep one per orchestrator
+            integrator = self.engine("youtube", self.create_youtube_integrator)
             results = integrator.run_enhanced_ingestion(
                 region="US",
                 include_categories=True
@@ -80,11 +190,18 @@ class WaveScopePipelineOrchestrator:
         logger.info("🌊 Step 3: Starting WaveScore Generation...")
         
         try:
-            # Import would go here - for now we'll simulate
+            from wavescore_engine import WaveScoreEngine
+            
             logger.info("🧮 Calculating WaveScores with multi-factor formula...")
-            time.sleep(3)  # Simulate processing
-            logger.info("✅ WaveScore generation complete")
-            return {"wavescores_calculated": 100, "status": "success"}
+            engine = self.engine("wavescore", lambda: WaveScoreEngine(self.supabase))
+            # Continuous cycles only score rows ingested since the previous cycle
+            after = self.watermarks.get("raw_ingestion_data") if self.continuous else None
+            results = engine.run(lookback_hours=self.wavescore_lookback_hours, after=after)
+            if results.get("watermark"):
+                self.watermarks["raw_ingestion_data"] = results["watermark"]
+            logger.info(f"✅ WaveScore generation complete: {results['wavescores_calculated']} scores "
+                        f"from {results['rows_read']} rows in {results['duration_seconds']:.2f}s")
+            return results
             
         except Exception as e:
             logger.error(f"❌ WaveScore generation failed: {e}")
@@ -95,11 +212,13 @@ class WaveScopePipelineOrchestrator:
         logger.info("📜 Step 4: Starting Historical Variant Generation...")
         
         try:
-            # Import would go here - for now we'll simulate
-            logger.info("📈 Generating trend variants and projections...")
-            time.sleep(2)  # Simulate processing
-            logger.info("✅ Historical variant generation complete")
-            return {"variants_generated": 25, "status": "success"}
+            from variant_engine import VariantEngine
+            
+            logger.info("📈 Rolling up new WaveScores and generating trend variants...")
+            results = self.engine("variants", lambda: VariantEngine(self.supabase)).run()
+            logger.info(f"✅ Historical variant generation complete: {results['variants_generated']} variants "
+                        f"for {results['trends_updated']} trends in {results['duration_seconds']:.2f}s")
+            return results
             
         except Exception as e:
             logger.error(f"❌ Variant generation failed: {e}")
@@ -110,65 +229,348 @@ class WaveScopePipelineOrchestrator:
         logger.info("🤖 Step 5: Starting Anomaly Detection & AI Forecasting...")
         
         try:
-            # Import would go here - for now we'll simulate
-            logger.info("🔍 Detecting anomalies and generating forecasts...")
-            time.sleep(4)  # Simulate processing
-            logger.info("✅ Anomaly detection and forecasting complete")
-            return {"anomalies_detected": 5, "forecasts_generated": 10, "status": "success"}
+            from anomaly_engine import StreamingAnomalyDetector
+            from forecast_engine import ForecastEngine
+            
+            logger.info("🔍 Streaming new trend scores through anomaly detectors...")
+            detector = self.engine("anomaly", lambda: StreamingAnomalyDetector(self.supabase))
+            results = detector.run()
+            logger.info(f"✅ Anomaly detection complete: {results['anomalies_detected']} anomalies "
+                        f"from {results['points_processed']} new points in {results['duration_seconds']:.2f}s")
+            
+            # Forecasts refit a week of history, so continuous cycles refresh them less often
+            if self.continuous and time.time() - self.last_forecast_at < self.forecast_interval_minutes * 60:
+                results["forecasts_generated"] = 0
+                results["forecast"] = {"status": "skipped", "reason": "forecast_interval"}
+                return results
+            
+            logger.info(f"🔮 Forecasting all trends {self.forecast_horizon_hours}h ahead...")
+            forecasts = self.engine("forecast", lambda: ForecastEngine(self.supabase)).run(
+                lookback_hours=self.forecast_lookback_hours,
+                horizon_hours=self.forecast_horizon_hours
+            )
+            self.last_forecast_at = time.time()
+            logger.info(f"✅ Forecasting complete: {forecasts['forecasts_generated']} forecasts "
+                        f"in {forecasts['duration_seconds']:.2f}s ({forecasts['trends_skipped']} trends lacked history)")
+            
+            results["forecasts_generated"] = forecasts["forecasts_generated"]
+            results["forecast"] = forecasts
+            return results
             
         except Exception as e:
             logger.error(f"❌ Anomaly detection failed: {e}")
             raise
 
+    def latest_value(self, table, column):
+        response = self.supabase.table(table).select(column).order(column, desc=True).limit(1).execute()
+        return response.data[0][column] if response.data else None
+
+    def stage_input_marks(self, stage):
+        """High-water marks of everything a stage reads; None means it must always run"""
+        if stage == "youtube_ingestion":
+            window = int(time.time() // (self.ingestion_interval_minutes * 60))
+            return {"ingestion_window": window}
+        try:
+            return {f"{table}.{column}": self.latest_value(table, column)
+                    for table, column in STAGE_INPUTS.get(stage, [])} or None
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read input marks for {stage}: {e}")
+            return None
+
+    def checkpointed(self, stage, func):
+        """Wrap a stage so it reuses resumed output, skips unchanged inputs and records checkpoints"""
+        def run_stage():
+            saved = self.checkpoints.completed_output(stage)
+            if saved is not None:
+                logger.info(f"♻️ {stage}: reusing output from the resumed run")
+                return {**saved, "checkpoint": "resumed"}
+            
+            marks = self.stage_input_marks(stage)
+            previous = self.checkpoints.last_success(stage)
+            if self.resume and marks is not None and previous and previous["input_marks"] == marks:
+                logger.info(f"⏭️ {stage}: inputs unchanged since run {previous['run_id']}, skipping")
+                output = {**(previous["output"] or {}), "checkpoint": "unchanged"}
+                self.checkpoints.record(stage, "success", output, marks)
+                return output
+            
+            try:
+                output = func()
+            except Exception as e:
+                self.checkpoints.record(stage, "failed", input_marks=marks, error=str(e))
+                raise
+            self.checkpoints.record(stage, "success", output, marks)
+            return output
+        return run_stage
+
+    def incremental(self, stage, func):
+        """Wrap a stage for continuous cycles; ingestion only runs once per ingestion window"""
+        if stage != "youtube_ingestion":
+            return func
+        
+        def run_stage():
+            window = self.stage_input_marks(stage)
+            if window == self.last_ingestion_window:
+                return {"total_processed": 0, "total_raw_inserted": 0, "total_legacy_inserted": 0,
+                        "status": "skipped", "reason": "ingestion_window"}
+            results = func()
+            self.last_ingestion_window = window
+            return results
+        return run_stage
+
+    def reported(self, stage, func):
+        """Emit a progress event with the rows each stage attempt read and wrote"""
+        from pipeline_events import emit_event
+        
+        def counters():
+            profile = self.profiler.stages.get(stage)
+            return (profile.rows_read, profile.rows_written) if profile else (0, 0)
+        
+        def run_stage():
+            before = counters()
+            started = time.time()
+            status = "failed"
+            try:
+                result = func()
+                status = "success"
+                return result
+            finally:
+                after = counters()
+                emit_event("stage", run_id=self.profiler.run_id, stage=stage, status=status,
+                           rows_read=after[0] - before[0], rows_written=after[1] - before[1],
+                           wall_seconds=round(time.time() - started, 3))
+        return run_stage
+
+    def maintain_partitions(self):
+        """Make sure upcoming time partitions exist and expired ones are dropped
+
+        Runs at most once per PARTITION_MAINTENANCE_HOURS; pg_cron does the same
+        daily where it is installed, and the function is idempotent.
+        """
+        if time.time() - self.last_partition_maintenance_at < self.partition_maintenance_hours * 3600:
+            return None
+        self.last_partition_maintenance_at = time.time()
+        try:
+            rows = self.supabase.rpc("maintain_time_partitions").execute().data or []
+        except Exception as e:
+            # Unpartitioned databases lack the function; rows then go to the tables as before
+            logger.warning(f"⚠️ Partition maintenance skipped: {e}")
+            return None
+        created = sum(row.get("partitions_created") or 0 for row in rows)
+        dropped = sum(row.get("partitions_dropped") or 0 for row in rows)
+        if created or dropped:
+            logger.info(f"🗂️ Partition maintenance: {created} partitions created, {dropped} expired partitions dropped")
+        return rows
+
+    def archive_history(self):
+        """Export newly completed days to the history archive (history_archive.py)
+
+        Runs at most once per ARCHIVE_EXPORT_HOURS (0 disables it) and only where
+        pyarrow is installed; older days are backfilled with `history_archive.py export`.
+        """
+        if not self.archive_export_hours:
+            return None
+        if time.time() - self.last_archive_export_at < self.archive_export_hours * 3600:
+            return None
+        self.last_archive_export_at = time.time()
+        import history_archive
+        if history_archive.pa is None:
+            logger.info("🗄️ History archive disabled: pyarrow is not installed")
+            return None
+        try:
+            return history_archive.HistoryArchiver(self.supabase).run(lookback_days=self.archive_lookback_days)
+        except Exception as e:
+            logger.warning(f"⚠️ History archive export skipped: {e}")
+            return None
+
+    def build_pipeline_dag(self, wrap=None):
+        """Wire the stage methods into a dependency graph"""
+        from pipeline_dag import PipelineDAG, Stage
+        
+        wrap = wrap or self.checkpointed
+        stages = [
+            Stage(name=name, func=self.reported(name, self.profiler.wrap(name, wrap(name, getattr(self, method)))),
+                  depends_on=deps, timeout_seconds=timeout, retries=retries)
+            for name, method, deps, timeout, retries in PIPELINE_STAGES
+        ]
+        return PipelineDAG(stages, max_workers=self.max_parallel_stages)
+
     def run_complete_pipeline(self):
         """Run the complete WaveScope pipeline"""
+        from pipeline_dag import PipelineError
+        from pipeline_events import emit_event
+        from pipeline_state import CheckpointStore
+        
         logger.info("🌊 Starting Complete WaveScope Pipeline")
         logger.info("="*60)
         
+        # A long-lived orchestrator (bot server worker) may run this after continuous cycles
+        self.start_time = time.time()
+        self.continuous = False
+        
+        # Output older than one ingestion interval is stale, so such runs start fresh
+        self.checkpoints = CheckpointStore(max_resumes=int(os.getenv("PIPELINE_MAX_RESUMES", "3")),
+                                           max_resume_age_seconds=self.ingestion_interval_minutes * 60)
+        run = self.checkpoints.begin(resume=self.resume)
+        self.profiler.start_run(run["run_id"])
+        self.archive_history()
+        self.maintain_partitions()
+        
         pipeline_results = {
+            "run_id": run["run_id"],
             "start_time": datetime.now().isoformat(),
             "steps": {}
         }
         
-        try:
-            # Step 1: YouTube Ingestion
-            step1_results = self.run_youtube_ingestion()
-            pipeline_results["steps"]["youtube_ingestion"] = step1_results
-            
-            # Step 2: Normalization
-            step2_results = self.run_normalization()
-            pipeline_results["steps"]["normalization"] = step2_results
-            
-            # Step 3: WaveScore Generation
-            step3_results = self.run_wavescore_generation()
-            pipeline_results["steps"]["wavescore_generation"] = step3_results
-            
-            # Step 4: Variant Generation
-            step4_results = self.run_variant_generation()
-            pipeline_results["steps"]["variant_generation"] = step4_results
-            
-            # Step 5: Anomaly Detection
-            step5_results = self.run_anomaly_detection()
-            pipeline_results["steps"]["anomaly_detection"] = step5_results
-            
-            # Calculate total time
-            total_time = time.time() - self.start_time
-            pipeline_results["end_time"] = datetime.now().isoformat()
-            pipeline_results["total_duration_seconds"] = total_time
-            pipeline_results["status"] = "success"
+        # Independent stages run concurrently; a failure skips only its dependents
+        report = self.build_pipeline_dag().run()
+        pipeline_results["steps"] = report["results"]
+        pipeline_results["stage_timings"] = report["stage_timings"]
+        pipeline_results["critical_path"] = report["critical_path"]
+        pipeline_results["critical_path_seconds"] = report["critical_path_seconds"]
+        pipeline_results["stage_seconds_total"] = report["stage_seconds_total"]
+        
+        # Calculate total time
+        total_time = time.time() - self.start_time
+        pipeline_results["end_time"] = datetime.now().isoformat()
+        pipeline_results["total_duration_seconds"] = total_time
+        pipeline_results["profile"] = self.profiler.write({
+            "mode": "batch",
+            "stage_timings": report["stage_timings"],
+            "critical_path": report["critical_path"],
+            "wall_seconds": report["wall_seconds"]
+        })
+        emit_event("run", run_id=run["run_id"], status="failed" if report["failed_stages"] else "success",
+                   failed_stages=report["failed_stages"], wall_seconds=report["wall_seconds"])
+        
+        if report["failed_stages"]:
+            failed = report["failed_stages"]
+            errors = "; ".join(f"{name}: {report['stage_timings'][name]['error']}" for name in failed)
+            pipeline_results["status"] = "failed"
+            pipeline_results["error"] = errors
+            pipeline_results["failed_stages"] = failed
+            pipeline_results["skipped_stages"] = report["skipped_stages"]
             
-            # Print final summary
+            logger.error(f"❌ Pipeline failed: {errors}")
+            logger.info(f"♻️ Rerun to resume run {run['run_id']} from the failed stage")
+            self.checkpoints.finish("failed")
             self.print_pipeline_summary(pipeline_results)
+            raise PipelineError(errors, pipeline_results)
+        
+        pipeline_results["status"] = "success"
+        self.checkpoints.finish("success")
+        
+        # Print final summary
+        self.print_pipeline_summary(pipeline_results)
+        
+        return pipeline_results
+
+    @staticmethod
+    def cycle_backlog(results):
+        """New rows the cycle had to read across the incremental stages"""
+        return (results.get("wavescore_generation", {}).get("rows_read", 0)
+                + results.get("variant_generation", {}).get("new_scores", 0)
+                + results.get("anomaly_detection", {}).get("points_processed", 0))
+
+    @staticmethod
+    def next_interval(current, base, min_interval, max_interval, backlog):
+        """Shorten the wait while behind, stretch it while idle, otherwise drift back to base"""
+        if backlog >= BACKLOG_HIGH_WATER:
+            current = current / 2
+        elif backlog == 0:
+            current = current * 1.5
+        else:
+            current = (current + base) / 2
+        return max(min_interval, min(max_interval, current))
+
+    def freshness_seconds(self):
+        """Age of the newest ingested row that has been scored"""
+        watermark = self.watermarks.get("raw_ingestion_data")
+        if not watermark:
+            return None
+        scored = datetime.fromisoformat(watermark.replace("Z", "+00:00"))
+        if scored.tzinfo is None:
+            scored = scored.replace(tzinfo=timezone.utc)
+        return max(0.0, (datetime.now(timezone.utc) - scored).total_seconds())
+
+    def request_stop(self, *_):
+        logger.info("🛑 Stop requested; finishing the current cycle...")
+        self.stop_event.set()
+
+    def pause(self):
+        logger.info("⏸️ Pause requested; no new cycles will start")
+        self.unpaused.clear()
+
+    def resume_cycles(self):
+        logger.info("▶️ Resuming continuous cycles")
+        self.unpaused.set()
+
+    def wait_while_paused(self):
+        """Block until resumed; False if a stop arrived first"""
+        while not self.unpaused.wait(1.0):
+            if self.stop_event.is_set():
+                return False
+        return not self.stop_event.is_set()
+
+    def run_continuous(self, interval=300, min_interval=None, max_interval=None, max_cycles=None, jitter=0.0):
+        """Run incremental cycles until stopped, adapting the interval to the backlog
+
+        jitter spreads each wait by up to ±that fraction so several workers do not
+        hit the YouTube API and Supabase in lockstep.
+        """
+        from pipeline_events import emit_event
+        
+        self.continuous = True
+        self.stop_event.clear()
+        min_interval = min_interval or max(30, interval // 4)
+        max_interval = max_interval or interval * 4
+        current = float(interval)
+        cycles = []
+        
+        try:
+            signal.signal(signal.SIGTERM, self.request_stop)
+            signal.signal(signal.SIGINT, self.request_stop)
+        except ValueError:
+            pass  # Not the main thread; the caller stops us via request_stop()
+        
+        logger.info(f"🔁 Starting continuous pipeline (interval {interval}s, range {min_interval}-{max_interval}s)")
+        while not self.stop_event.is_set():
+            if not self.unpaused.is_set() and not self.wait_while_paused():
+                break
+            started = time.time()
+            self.profiler.start_run(f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}-cycle{len(cycles) + 1}")
+            self.archive_history()
+            self.maintain_partitions()
+            report = self.build_pipeline_dag(wrap=self.incremental).run()
+            duration = time.time() - started
             
-            return pipeline_results
+            backlog = self.cycle_backlog(report["results"])
+            current = self.next_interval(current, interval, min_interval, max_interval, backlog)
+            freshness = self.freshness_seconds()
+            cycles.append({
+                "cycle": len(cycles) + 1,
+                "duration_seconds": round(duration, 3),
+                "new_rows": backlog,
+                "failed_stages": report["failed_stages"],
+                "freshness_seconds": round(freshness, 1) if freshness is not None else None,
+                "next_interval_seconds": round(current, 1)
+            })
+            self.profiler.write({"mode": "continuous", "cycle": cycles[-1], "stage_timings": report["stage_timings"]})
+            emit_event("run", run_id=self.profiler.run_id, status="failed" if report["failed_stages"] else "success",
+                       **cycles[-1])
             
-        except Exception as e:
-            pipeline_results["status"] = "failed"
-            pipeline_results["error"] = str(e)
-            pipeline_results["end_time"] = datetime.now().isoformat()
+            if report["failed_stages"]:
+                logger.error(f"❌ Cycle {len(cycles)} failed stages: {', '.join(report['failed_stages'])}")
+            delay = max(0.0, current * (1 + random.uniform(-jitter, jitter)) - duration)
+            freshness_text = f"{freshness:.0f}s" if freshness is not None else "n/a"
+            logger.info(f"🔁 Cycle {len(cycles)}: {backlog} new rows in {duration:.1f}s, "
+                        f"freshness {freshness_text}, next cycle in {delay:.0f}s")
             
-            logger.error(f"❌ Pipeline failed: {e}")
-            raise
+            if max_cycles and len(cycles) >= max_cycles:
+                break
+            self.stop_event.wait(delay)
+        
+        logger.info(f"✅ Continuous pipeline stopped after {len(cycles)} cycles")
+        return {"cycles": cycles, "status": "stopped"}
 
     def print_pipeline_summary(self, results):
         """Print a comprehensive pipeline summary"""
@@ -181,6 +583,8 @@ class WaveScopePipelineOrchestrator:
         print(f"🕐 Start Time: {results.get('start_time', 'N/A')}")
         print(f"🕐 End Time: {results.get('end_time', 'N/A')}")
         print(f"✅ Status: {results.get('status', 'unknown').upper()}")
+        if results.get("run_id"):
+            print(f"🔖 Run ID: {results['run_id']}")
         
         print("\n📊 STEP RESULTS:")
         print("-" * 40)
@@ -193,6 +597,7 @@ class WaveScopePipelineOrchestrator:
             print(f"1️⃣  YouTube Ingestion:")
             print(f"   📺 Videos Processed: {youtube_results.get('total_processed', 0)}")
             print(f"   📊 Raw Records: {youtube_results.get('total_raw_inserted', 0)}")
+            print(f"   💤 Unchanged Snapshots Skipped: {youtube_results.get('total_raw_unchanged', 0)}")
             print(f"   🔄 Legacy Records: {youtube_results.get('total_legacy_inserted', 0)}")
         
         # Step 2: Normalization
@@ -206,22 +611,61 @@ class WaveScopePipelineOrchestrator:
         if wave_results:
             print(f"3️⃣  WaveScore Generation:")
             print(f"   🌊 WaveScores Calculated: {wave_results.get('wavescores_calculated', 0)}")
+            print(f"   📥 Raw Rows Read: {wave_results.get('rows_read', 0)} in {wave_results.get('chunks', 0)} chunks")
+            print(f"   ⏱️  Stage Time: {wave_results.get('duration_seconds', 0):.2f}s")
         
         # Step 4: Variant Generation
         variant_results = steps.get("variant_generation", {})
         if variant_results:
             print(f"4️⃣  Historical Variants:")
             print(f"   📜 Variants Generated: {variant_results.get('variants_generated', 0)}")
+            print(f"   🧭 Trends Updated: {variant_results.get('trends_updated', 0)} "
+                  f"({variant_results.get('indexed_trends', 0)} in similarity index)")
         
         # Step 5: Anomaly Detection
         anomaly_results = steps.get("anomaly_detection", {})
         if anomaly_results:
             print(f"5️⃣  Anomaly Detection & AI:")
             print(f"   🚨 Anomalies Detected: {anomaly_results.get('anomalies_detected', 0)}")
+            print(f"   📡 New Points Processed: {anomaly_results.get('points_processed', 0)} "
+                  f"across {anomaly_results.get('trends_tracked', 0)} tracked trends")
             print(f"   🔮 Forecasts Generated: {anomaly_results.get('forecasts_generated', 0)}")
         
+        # Per-stage wall clock breakdown
+        stage_timings = results.get("stage_timings", {})
+        if stage_timings:
+            print("\n⏱️  STAGE TIMINGS:")
+            print("-" * 40)
+            for name, timing in stage_timings.items():
+                retries = f", {timing['attempts']} attempts" if timing.get('attempts', 0) > 1 else ""
+                checkpoint = steps.get(name, {}).get("checkpoint")
+                reused = f", {checkpoint}" if checkpoint else ""
+                print(f"   {name:<22} {timing['status']:<8} {timing['wall_seconds']:>8.2f}s "
+                      f"(+{timing.get('started_offset_seconds') or 0:.2f}s{retries}{reused})")
+            print(f"   🛤️  Critical Path: {' → '.join(results.get('critical_path', []))} "
+                  f"({results.get('critical_path_seconds', 0):.2f}s of {results.get('stage_seconds_total', 0):.2f}s stage time)")
+        
+        # Per-stage resource usage from the profiler
+        profile = results.get("profile", {})
+        if profile.get("stages"):
+            print("\n🔬 STAGE PROFILE:")
+            print("-" * 40)
+            print(f"   {'stage':<22} {'cpu':>8} {'rows in':>9} {'rows out':>9} {'db trips':>9} {'db KB':>9} {'quota':>6}")
+            for name, stage in profile["stages"].items():
+                db_kb = (stage['db_bytes_sent'] + stage['db_bytes_received']) / 1024
+                print(f"   {name:<22} {stage['cpu_seconds']:>7.2f}s {stage['rows_read']:>9} {stage['rows_written']:>9} "
+                      f"{stage['db_round_trips']:>9} {db_kb:>9.1f} {stage['quota_units']:>6}")
+                if stage.get("profile_file"):
+                    print(f"      📄 cProfile: {stage['profile_file']}")
+            print(f"   📝 Profile log: {self.profiler.report_path}")
+        
         print("\n" + "="*60)
-        print("🎉 WaveScope Pipeline Complete!")
+        if results.get("status") == "failed":
+            print(f"⚠️  Failed stages: {', '.join(results.get('failed_stages', []))}")
+            if results.get("skipped_stages"):
+                print(f"⏭️  Skipped stages: {', '.join(results['skipped_stages'])}")
+        else:
+            print("🎉 WaveScope Pipeline Complete!")
         print("🌐 Check your dashboard: https://wavesight-9oo7.onrender.com")
         print("="*60)
 
@@ -248,14 +692,26 @@ class WaveScopePipelineOrchestrator:
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="WaveScope pipeline orchestrator")
+    parser.add_argument("--test", action="store_true", help="run YouTube ingestion only")
+    parser.add_argument("--fresh", action="store_true", help="ignore checkpoints and run every stage")
+    parser.add_argument("--continuous", action="store_true", help="keep running incremental cycles")
+    parser.add_argument("--interval", type=int, default=int(os.getenv("PIPELINE_INTERVAL_SECONDS", "300")),
+                        help="base seconds between continuous cycles")
+    parser.add_argument("--jitter", type=float, default=float(os.getenv("PIPELINE_INTERVAL_JITTER", "0.1")),
+                        help="spread each continuous wait by up to this fraction")
+    parser.add_argument("--profile", action="store_true", help="dump a cProfile file for every stage")
+    args = parser.parse_args()
     
     try:
-        orchestrator = WaveScopePipelineOrchestrator()
+        orchestrator = WaveScopePipelineOrchestrator(resume=not args.fresh, profile=args.profile)
         
         # Check command line arguments
-        if len(sys.argv) > 1 and sys.argv[1] == "--test":
+        if args.test:
             # Run quick test
             orchestrator.run_quick_test()
+        elif args.continuous:
+            orchestrator.run_continuous(interval=args.interval, jitter=args.jitter)
         else:
             # Run complete pipeline
             orchestrator.run_complete_pipeline()
@@ -271,6 +727,8 @@ if __name__ == "__main__":
     print("Usage:")
     print("  python run-wavescope-pipeline.py           # Run complete pipeline")
     print("  python run-wavescope-pipeline.py --test    # Run quick test")
+    print("  python run-wavescope-pipeline.py --fresh   # Ignore checkpoints and run every stage")
+    print("  python run-wavescope-pipeline.py --continuous [--interval 300]  # Incremental cycles")
     print()
     
     exit(main())
\ No newline at end of file
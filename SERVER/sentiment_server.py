@@ -1,13 +1,19 @@
-import praw
-import openai
-from supabase import create_client, Client
 from datetime import datetime
 import os
-from flask import Flask, request, jsonify
+import json
+import uuid
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import time
 import random
 from wave_score import calculate_wave_score
+from write_behind import WriteBehindBuffer
+from write_spool import get_spool, write_or_spool
+from trend_stats import fetch_trend_stats
+from trend_queries import search_titles, filter_by_metric, recent_by_category
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 app = Flask(__name__)
@@ -19,50 +25,155 @@ SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+COMPASS_JOB_WORKERS = int(os.getenv("COMPASS_JOB_WORKERS", "4"))
+COMPASS_JOB_TTL_SECONDS = int(os.getenv("COMPASS_JOB_TTL_SECONDS", "3600"))
+# Shared directory for job snapshots, so any worker process can answer polls
+COMPASS_JOB_DIR = os.getenv("COMPASS_JOB_DIR")
+COMPASS_MAX_TOPICS = 8
 
 print("🔧 Initializing Sentiment Analysis Server...")
 print(f"📊 Supabase URL: {'✅ Configured' if SUPABASE_URL else '❌ Missing'}")
 print(f"📱 Reddit Client ID: {'✅ Configured' if REDDIT_CLIENT_ID else '❌ Missing'}")
 print(f"🤖 OpenAI API Key: {'✅ Configured' if OPENAI_API_KEY else '❌ Missing'}")
 
-# Initialize clients
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
-
-# Initialize Reddit with better error handling
-reddit = None
-reddit_status = "Not configured"
+class LazyClient:
+    """Thread-safe provider that builds an external client on first use
+
+    A failed connect is retried on a later call after a backoff (doubling up to
+    max_retry_seconds), so a blip at cold start does not stick until restart.
+    """
+
+    def __init__(self, name, factory, configured=True, retry_seconds=15, max_retry_seconds=300):
+        self.name = name
+        self.factory = factory
+        self.configured = configured
+        self.status = "Not connected yet" if configured else "Credentials missing"
+        self.connected_at = None
+        self.connect_seconds = None
+        self._client = None
+        self._initialized = False
+        self._lock = threading.Lock()
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.failures = 0
+        self._retry_at = 0.0
+
+    def get(self, force=False):
+        """Return the client, connecting on first use or once a failed connect's backoff
+        has passed (immediately with force); None if unavailable"""
+        if self._initialized:
+            return self._client
+        if not force and time.time() < self._retry_at:
+            return None
+        with self._lock:
+            if not self._initialized and (force or time.time() >= self._retry_at):
+                self._connect()
+        return self._client
+
+    def _connect(self):
+        started = time.time()
+        try:
+            self._client = self.factory() if self.configured else None
+            if self._client is not None:
+                self.status = "Connected and working"
+                self.connected_at = datetime.now().isoformat()
+            self._initialized = True
+            self.failures = 0
+        except Exception as e:
+            self.failures += 1
+            delay = min(self.retry_seconds * (2 ** (self.failures - 1)), self.max_retry_seconds)
+            self._retry_at = time.time() + delay
+            print(f"❌ {self.name} connection failed: {e} (retrying in {delay:.0f}s)")
+            self._client = None
+            self.status = f"Failed: {str(e)[:50]}..."
+        self.connect_seconds = round(time.time() - started, 3)
+
+    @property
+    def connected(self):
+        return self._client is not None
+
+    def reset(self):
+        """Drop the client so the next call reconnects; meant for a freshly forked worker"""
+        # The inherited lock may have been held by a thread that does not exist after fork
+        self._lock = threading.Lock()
+        self._client = None
+        self._initialized = False
+        self.failures = 0
+        self._retry_at = 0.0
+        self.connected_at = None
+        self.connect_seconds = None
+        self.status = "Not connected yet" if self.configured else "Credentials missing"
+
+    def state(self):
+        return {
+            "configured": self.configured,
+            "initialized": self._initialized,
+            "connected": self._client is not None,
+            "failures": self.failures,
+            "status": self.status,
+            "connected_at": self.connected_at,
+            "connect_seconds": self.connect_seconds,
+            "retry_in_seconds": round(max(self._retry_at - time.time(), 0.0), 1) if not self._initialized else None
+        }
 
-if REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET:
-    try:
-        reddit = praw.Reddit(
-            client_id=REDDIT_CLIENT_ID,
-            client_secret=REDDIT_CLIENT_SECRET,
-            user_agent="WaveSightSentimentBot/1.0 by /u/wavesight_user"
-        )
-        # Test Reddit connection by fetching a simple subreddit
-        test_subreddit = reddit.subreddit("test").display_name
-        reddit_status = "Connected and working"
-        print("✅ Reddit API connection successful")
-        print(f"🔗 Successfully accessed r/{test_subreddit}")
-    except Exception as e:
-        print(f"❌ Reddit API connection failed: {e}")
-        print("💡 Reddit will use mock data for demonstration")
-        reddit = None
-        reddit_status = f"Failed: {str(e)[:50]}..."
-else:
+# SDK imports live in the factories: supabase and praw are slow to import
+def _create_supabase_client():
+    from datastore import create_client
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+def _create_reddit_client():
+    import praw
+    client = praw.Reddit(
+        client_id=REDDIT_CLIENT_ID,
+        client_secret=REDDIT_CLIENT_SECRET,
+        user_agent="WaveSightSentimentBot/1.0 by /u/wavesight_user"
+    )
+    # Test Reddit connection by fetching a simple subreddit
+    test_subreddit = client.subreddit("test").display_name
+    print("✅ Reddit API connection successful")
+    print(f"🔗 Successfully accessed r/{test_subreddit}")
+    return client
+
+# Clients connect on first use, so importing this module never touches the network
+supabase_client = LazyClient("Supabase", _create_supabase_client,
+                             configured=bool(SUPABASE_URL and SUPABASE_KEY))
+reddit_client = LazyClient("Reddit API", _create_reddit_client,
+                           configured=bool(REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET))
+# VADER loads its lexicon from disk when constructed
+sentiment_analyzer = LazyClient("VADER analyzer", SentimentIntensityAnalyzer)
+
+if not reddit_client.configured:
     print("❌ Reddit credentials not configured")
     print("💡 Reddit will use mock data for demonstration")
-    reddit_status = "Credentials missing"
 
-if OPENAI_API_KEY:
-    openai.api_key = OPENAI_API_KEY
+def get_supabase():
+    return supabase_client.get()
+
+def get_reddit():
+    return reddit_client.get()
+
+def spool_failed_writes(table, op, on_conflict, rows, error):
+    """Rows the write-behind buffer gave up on go to the durable spool"""
+    get_spool().append(table, rows, op, on_conflict)
+
+def replay_spooled_writes(table, op, on_conflict, rows):
+    """A flush that went through means Supabase is back; replay rows spooled while it was not"""
+    get_spool().replay_if_pending(get_supabase())
 
-# Initialize sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
+# Request handlers queue their rows here instead of waiting on a Supabase round trip
+write_buffer = WriteBehindBuffer(get_supabase, on_failure=spool_failed_writes, on_success=replay_spooled_writes)
+
+def queue_write(table, row, op='insert', on_conflict=None):
+    """Hand a row to the write-behind buffer; False when Supabase is not configured"""
+    if not supabase_client.configured:
+        return False
+    write_buffer.enqueue(table, row, op=op, on_conflict=on_conflict)
+    return True
 
 def analyze_sentiment_from_comments(comments):
     """Analyze sentiment from a list of comments using VADER"""
     sentiment_counts = {"pos": 0, "neg": 0, "neu": 0}
+    analyzer = sentiment_analyzer.get()
     for comment in comments:
         score = analyzer.polarity_scores(comment)
         if score["compound"] >= 0.05:
@@ -146,12 +257,8 @@ def analyze_and_store_trend(topic, video_id=None):
         "comments_count": metrics["comments"]
     }
     
-    if supabase:
-        try:
-            response = supabase.table("sentiment_forecasts").insert(result_data).execute()
-            print("📡 Stored result in Supabase:", response.data[0]["id"] if response.data else "Success")
-        except Exception as e:
-            print(f"❌ Error storing in Supabase: {e}")
+    if queue_write("sentiment_forecasts", result_data):
+        print("📡 Queued result for Supabase")
     
     return result_data
 
@@ -225,6 +332,7 @@ def classify_sentiment(comment: str) -> str:
 def analyze_reddit_cultural_trends(topic, limit_posts=50, limit_comments=20):
     """Analyze Reddit data to create cultural trend objects with compass coordinates"""
 
+    reddit = get_reddit()
     if not reddit:
         print("❌ Reddit not configured - creating enhanced mock cultural trend data")
         return create_enhanced_cultural_trend_data(topic)
@@ -362,12 +470,8 @@ def create_cultural_trend_object(topic, posts_data, sentiment_scores, engagement
     print(f"   🎯 Sentiment: {avg_sentiment:.3f}, Velocity: {velocity:.3f}")
     
     # Save to Supabase
-    if supabase:
-        try:
-            result = supabase.table("cultural_trends").upsert(cultural_trend, on_conflict='topic,analysis_date').execute()
-            print("✅ Cultural trend saved to Supabase")
-        except Exception as e:
-            print(f"❌ Failed to save cultural trend: {e}")
+    if queue_write("cultural_trends", cultural_trend, op='upsert', on_conflict='topic,analysis_date'):
+        print("✅ Cultural trend queued for Supabase")
     
     return cultural_trend
 
@@ -516,6 +620,7 @@ def analyze_reddit_sentiment(topic, limit_posts=50, limit_comments=20):
     """Main function to analyze Reddit sentiment - the missing critical function"""
     print(f"📊 Analyzing Reddit sentiment for: '{topic}' (posts: {limit_posts}, comments: {limit_comments})")
     
+    reddit = get_reddit()
     if not reddit:
         print("❌ Reddit not configured - using mock data")
         return create_mock_sentiment_data(topic)
@@ -637,12 +742,8 @@ def analyze_reddit_sentiment(topic, limit_posts=50, limit_comments=20):
         print(f"   🎯 Confidence: {confidence}%")
         
         # Store in Supabase
-        if supabase:
-            try:
-                result = supabase.table("sentiment_forecasts").insert(sentiment_data).execute()
-                print("✅ Real Reddit data saved to Supabase")
-            except Exception as e:
-                print(f"❌ Failed to save Reddit data to Supabase: {e}")
+        if queue_write("sentiment_forecasts", sentiment_data):
+            print("✅ Real Reddit data queued for Supabase")
         
         return sentiment_data
         
@@ -691,15 +792,224 @@ def create_mock_sentiment_data(topic):
 
     print(f"📊 Mock Results — Positive: {yes}, Negative: {no}, Unclear: {unclear}, Confidence: {confidence}%")
 
-    if supabase:
-        try:
-            result = supabase.table("sentiment_forecasts").insert(sentiment_data).execute()
-            print("✅ Mock data saved to Supabase.")
-        except Exception as e:
-            print(f"❌ Failed to save mock data to Supabase: {e}")
+    if queue_write("sentiment_forecasts", sentiment_data):
+        print("✅ Mock data queued for Supabase.")
 
     return sentiment_data
 
+def store_cultural_compass_trends(cultural_trends):
+    """Persist a batch of cultural trend objects for the Cultural Compass"""
+    supabase = get_supabase()
+    if not supabase or not cultural_trends:
+        return
+    if write_or_spool(supabase, "cultural_compass_data", cultural_trends, op="upsert", on_conflict='topic') is None:
+        print(f"📦 Spooled {len(cultural_trends)} cultural trends for replay")
+    else:
+        print(f"💾 Stored {len(cultural_trends)} cultural trends in database")
+
+class CompassJob:
+    """A batch of Cultural Compass topics analyzed in the background"""
+
+    def __init__(self, topics, snapshot_path=None):
+        self.job_id = uuid.uuid4().hex
+        self.topics = topics
+        self.status = "queued"
+        self.results = []
+        self.errors = {}
+        self.created_at = time.time()
+        self.finished_at = None
+        self.snapshot_path = snapshot_path
+        self.condition = threading.Condition()
+
+    @property
+    def completed_topics(self):
+        return len(self.results) + len(self.errors)
+
+    def record_result(self, topic, cultural_trend=None, error=None):
+        """Record the outcome for one topic; returns True if it finished the job"""
+        with self.condition:
+            if error is not None:
+                self.errors[topic] = error
+            elif cultural_trend:
+                self.results.append(cultural_trend)
+            else:
+                self.errors[topic] = "No cultural trend data produced"
+
+            if self.status == "queued":
+                self.status = "running"
+            finished = self.completed_topics >= len(self.topics)
+            if finished:
+                self.status = "completed"
+                self.finished_at = time.time()
+            self.condition.notify_all()
+        self.write_snapshot()
+        return finished
+
+    def wait(self, timeout=None):
+        """Block until every topic has finished or the timeout expires"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.status == "completed", timeout=timeout)
+
+    def wait_for_progress(self, seen, timeout=None):
+        """Block until more than `seen` topics have finished"""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.completed_topics > seen or self.status == "completed",
+                timeout=timeout
+            )
+
+    def write_snapshot(self):
+        """Atomically publish the job state for other worker processes"""
+        if not self.snapshot_path:
+            return
+        try:
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"⚠️ Could not write compass job snapshot: {e}")
+
+    def to_dict(self, since=0):
+        with self.condition:
+            return {
+                'job_id': self.job_id,
+                'status': self.status,
+                'topics': self.topics,
+                'total_topics': len(self.topics),
+                'completed_topics': self.completed_topics,
+                'data': self.results[since:],
+                'errors': dict(self.errors),
+                'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+                'finished_at': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None
+            }
+
+class StoredCompassJob:
+    """Read-only view of a job owned by another worker process"""
+
+    def __init__(self, snapshot_path, poll_interval=0.5):
+        self.snapshot_path = snapshot_path
+        self.poll_interval = poll_interval
+        self.snapshot = self._load()
+
+    def _load(self):
+        with open(self.snapshot_path) as f:
+            return json.load(f)
+
+    def wait_for_progress(self, seen, timeout=None):
+        deadline = time.time() + timeout if timeout is not None else None
+        while self.snapshot['completed_topics'] <= seen and self.snapshot['status'] != "completed":
+            if deadline is not None and time.time() >= deadline:
+                return
+            time.sleep(self.poll_interval)
+            try:
+                self.snapshot = self._load()
+            except (OSError, ValueError):
+                continue
+
+    def to_dict(self, since=0):
+        return {**self.snapshot, 'data': self.snapshot['data'][since:]}
+
+class CompassJobManager:
+    """Runs Cultural Compass topic analysis on a bounded thread pool"""
+
+    def __init__(self, max_workers=COMPASS_JOB_WORKERS, ttl_seconds=COMPASS_JOB_TTL_SECONDS,
+                 job_dir=COMPASS_JOB_DIR):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compass")
+        self.ttl_seconds = ttl_seconds
+        self.job_dir = job_dir
+        self.jobs = {}
+        self.lock = threading.Lock()
+        if job_dir:
+            os.makedirs(job_dir, exist_ok=True)
+
+    def _snapshot_path(self, job_id):
+        if not self.job_dir:
+            return None
+        return os.path.join(self.job_dir, f"compass-{job_id}.json")
+
+    def submit(self, topics):
+        """Queue every topic of a new job and return it immediately"""
+        job = CompassJob(topics)
+        job.snapshot_path = self._snapshot_path(job.job_id)
+        job.write_snapshot()
+        with self.lock:
+            self._prune_expired()
+            self.jobs[job.job_id] = job
+
+        for topic in topics:
+            self.executor.submit(self._run_topic, job, topic)
+
+        print(f"🧭 Queued Cultural Compass job {job.job_id} with {len(topics)} topics")
+        return job
+
+    def get(self, job_id):
+        """Return a local job, or a snapshot view of one submitted to another worker"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job or not self.job_dir or not job_id.isalnum():
+            return job
+        try:
+            return StoredCompassJob(self._snapshot_path(job_id))
+        except (OSError, ValueError):
+            return None
+
+    def _run_topic(self, job, topic):
+        try:
+            print(f"🔍 Creating cultural trend object for: {topic}")
+            cultural_trend = analyze_reddit_cultural_trends(topic, limit_posts=30, limit_comments=25)
+            finished = job.record_result(topic, cultural_trend=cultural_trend)
+            if cultural_trend:
+                print(f"✅ Cultural trend created for {topic}")
+        except Exception as topic_error:
+            print(f"⚠️ Error analyzing {topic}: {topic_error}")
+            finished = job.record_result(topic, error=str(topic_error))
+
+        if finished:
+            print(f"✅ Cultural Compass job {job.job_id} complete: {len(job.results)} trends processed")
+            store_cultural_compass_trends(job.results)
+
+    def _prune_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            snapshot_path = self.jobs.pop(job_id).snapshot_path
+            if snapshot_path and os.path.exists(snapshot_path):
+                os.remove(snapshot_path)
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+compass_jobs = CompassJobManager()
+
+def reset_process_state():
+    """Rebuild per-process clients and pools after a fork
+
+    Sockets, locks and executor threads inherited from a parent process are
+    not safe to share, so each worker starts with fresh ones.
+    """
+    global compass_jobs, write_buffer
+    for client in (supabase_client, reddit_client, sentiment_analyzer):
+        client.reset()
+    compass_jobs = CompassJobManager()
+    write_buffer = WriteBehindBuffer(get_supabase, on_failure=spool_failed_writes, on_success=replay_spooled_writes)
+
+def shutdown_process_state():
+    """Drain queued writes before the process exits"""
+    write_buffer.close()
+
+atexit.register(shutdown_process_state)
+
+def parse_compass_topics(data):
+    """Extract the de-duplicated, capped topic list from a compass request body"""
+    topics = []
+    for topic in (data or {}).get('topics', []):
+        topic = str(topic).strip()
+        if topic and topic not in topics:
+            topics.append(topic)
+    return topics[:COMPASS_MAX_TOPICS]
+
 @app.route('/api/analyze-sentiment', methods=['POST'])
 def analyze_sentiment_endpoint():
     try:
@@ -723,8 +1033,8 @@ def analyze_sentiment_endpoint():
                 'success': True,
                 'data': result,
                 'total_comments': result.get('total_responses', 0),
-                'reddit_connected': reddit is not None,
-                'supabase_connected': supabase is not None,
+                'reddit_connected': reddit_client.get() is not None,
+                'supabase_connected': supabase_client.get() is not None,
                 'message': f'Successfully analyzed sentiment for "{topic}" from Reddit data'
             })
         else:
@@ -738,8 +1048,8 @@ def analyze_sentiment_endpoint():
         return jsonify({
             'success': False,
             'message': str(e),
-            'reddit_connected': reddit is not None,
-            'supabase_connected': supabase is not None
+            'reddit_connected': reddit_client.get() is not None,
+            'supabase_connected': supabase_client.get() is not None
         }), 500
 
 @app.route('/api/wave-score', methods=['POST'])
@@ -778,8 +1088,7 @@ def calculate_wave_score_endpoint():
 def cultural_compass_analysis():
     """Analyze multiple topics for Cultural Compass mapping using enhanced Reddit analysis"""
     try:
-        data = request.get_json()
-        topics = data.get('topics', [])
+        topics = parse_compass_topics(request.get_json())
         
         if not topics:
             return jsonify({
@@ -789,37 +1098,16 @@ def cultural_compass_analysis():
         
         print(f"🧭 Enhanced Cultural Compass analysis requested for {len(topics)} topics")
         
-        cultural_trends = []
-        for topic in topics[:8]:  # Limit to 8 topics for detailed analysis
-            try:
-                print(f"🔍 Creating cultural trend object for: {topic}")
-                
-                # Use enhanced Reddit cultural analysis
-                cultural_trend = analyze_reddit_cultural_trends(topic, limit_posts=30, limit_comments=25)
-                
-                if cultural_trend:
-                    cultural_trends.append(cultural_trend)
-                    print(f"✅ Cultural trend created for {topic}")
-                    
-            except Exception as topic_error:
-                print(f"⚠️ Error analyzing {topic}: {topic_error}")
-                continue
-        
-        print(f"✅ Enhanced Cultural Compass analysis complete: {len(cultural_trends)} trends processed")
-        
-        # Store all trends in database for persistence
-        if supabase and cultural_trends:
-            try:
-                batch_result = supabase.table("cultural_compass_data").upsert(cultural_trends, on_conflict='topic').execute()
-                print(f"💾 Stored {len(cultural_trends)} cultural trends in database")
-            except Exception as db_error:
-                print(f"⚠️ Database storage error: {db_error}")
+        # Topics run concurrently on the shared job pool; this endpoint just waits for all of them
+        job = compass_jobs.submit(topics)
+        job.wait()
+        cultural_trends = job.to_dict()['data']
         
         return jsonify({
             'success': True,
             'data': cultural_trends,
             'total_analyzed': len(cultural_trends),
-            'reddit_connected': reddit is not None,
+            'reddit_connected': reddit_client.get() is not None,
             'analysis_depth': 'Enhanced Reddit Cultural Analysis',
             'message': f'Successfully created {len(cultural_trends)} cultural trend objects for Cultural Compass'
         })
@@ -829,9 +1117,70 @@ def cultural_compass_analysis():
         return jsonify({
             'success': False,
             'message': str(e),
-            'reddit_connected': reddit is not None
+            'reddit_connected': reddit_client.get() is not None
         }), 500
 
+@app.route('/api/cultural-compass/jobs', methods=['POST'])
+def submit_cultural_compass_job():
+    """Queue a Cultural Compass analysis and return its job id right away"""
+    topics = parse_compass_topics(request.get_json(silent=True))
+
+    if not topics:
+        return jsonify({
+            'success': False,
+            'message': 'No topics provided for analysis'
+        }), 400
+
+    job = compass_jobs.submit(topics)
+    return jsonify({
+        'success': True,
+        'job_id': job.job_id,
+        'status': job.status,
+        'total_topics': len(topics),
+        'status_url': f'/api/cultural-compass/jobs/{job.job_id}',
+        'stream_url': f'/api/cultural-compass/jobs/{job.job_id}/stream'
+    }), 202
+
+@app.route('/api/cultural-compass/jobs/<job_id>', methods=['GET'])
+def get_cultural_compass_job(job_id):
+    """Poll a Cultural Compass job; `since` skips results the client already has"""
+    job = compass_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Unknown job id'}), 404
+
+    since = request.args.get('since', default=0, type=int)
+    return jsonify({'success': True, **job.to_dict(since=max(since, 0))})
+
+@app.route('/api/cultural-compass/jobs/<job_id>/stream', methods=['GET'])
+def stream_cultural_compass_job(job_id):
+    """Stream each cultural trend as a server-sent event as soon as it finishes"""
+    job = compass_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Unknown job id'}), 404
+
+    def generate():
+        # Failed topics count towards progress but add no results, so the
+        # wait tracks finished topics and the result offset is kept apart
+        seen_completed = 0
+        sent = 0
+        while True:
+            job.wait_for_progress(seen_completed, timeout=15)
+            snapshot = job.to_dict(since=sent)
+            for cultural_trend in snapshot['data']:
+                yield f"event: trend\ndata: {json.dumps(cultural_trend)}\n\n"
+            sent += len(snapshot['data'])
+            if snapshot['status'] == "completed":
+                summary = {key: snapshot[key] for key in ('job_id', 'status', 'total_topics', 'completed_topics', 'errors')}
+                yield f"event: done\ndata: {json.dumps(summary)}\n\n"
+                return
+            if snapshot['completed_topics'] == seen_completed:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            seen_completed = snapshot['completed_topics']
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 def calculate_cultural_coordinates(topic, sentiment_data):
     """Calculate cultural coordinates for compass placement"""
     confidence = sentiment_data.get('confidence', 50)
@@ -1072,22 +1421,145 @@ def calculate_analysis_confidence(total_posts, sentiment_count, subreddit_spread
     overall_confidence = (post_confidence + sentiment_confidence + spread_confidence) / 3
     return round(overall_confidence, 3)
 
+def bounded_number(source, name, default, cast=float, minimum=None, maximum=None):
+    """Read a numeric parameter, raising ValueError with a client-facing message when it is out of range"""
+    value = source.get(name, default)
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    try:
+        number = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+    if number != number or number in (float('inf'), float('-inf')):
+        raise ValueError(f"{name} must be a finite number")
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise ValueError(f"{name} must be between {minimum} and {maximum}")
+    return number
+
+@app.route('/api/trend-stats', methods=['POST'])
+def trend_stats_endpoint():
+    """Avg/max/volatility/slope for every requested trend in one database call"""
+    data = request.get_json(silent=True) or {}
+    trend_ids = data.get('trend_ids') or []
+    if not isinstance(trend_ids, list) or not trend_ids:
+        return jsonify({'success': False, 'message': 'trend_ids must be a non-empty list'}), 400
+    if not all(isinstance(trend_id, str) for trend_id in trend_ids):
+        return jsonify({'success': False, 'message': 'trend_ids must be strings'}), 400
+    try:
+        hours_back = bounded_number(data, 'hours_back', 24, cast=int, minimum=1, maximum=24 * 90)
+        flat_slope = bounded_number(data, 'flat_slope', 0.1, minimum=0, maximum=1000)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    supabase = get_supabase()
+    if supabase is None:
+        return jsonify({'success': False, 'message': 'Supabase is not connected'}), 503
+
+    try:
+        stats = fetch_trend_stats(supabase, trend_ids, hours_back=hours_back, flat_slope=flat_slope)
+        return jsonify({'success': True, 'data': stats, 'missing': [t for t in trend_ids if t not in stats]})
+    except Exception as e:
+        print(f"❌ Trend stats API Error: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+def run_trend_query(label, query):
+    """Shared request handling for the indexed raw_ingestion_data lookups"""
+    supabase = get_supabase()
+    if supabase is None:
+        return jsonify({'success': False, 'message': 'Supabase is not connected'}), 503
+    try:
+        rows = query(supabase)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        print(f"❌ {label} API Error: {e}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+    return jsonify({'success': True, 'data': rows, 'count': len(rows)})
+
+@app.route('/api/trends/search', methods=['GET'])
+def search_trends_endpoint():
+    """Title substring search over recent ingested content (trigram index)"""
+    args = request.args
+    return run_trend_query('Trend search', lambda supabase: search_titles(
+        supabase, args.get('q', ''),
+        hours_back=bounded_number(args, 'hours_back', 168, minimum=1, maximum=24 * 90),
+        category=args.get('category') or None,
+        limit=bounded_number(args, 'limit', 50, cast=int, minimum=1, maximum=500)
+    ))
+
+@app.route('/api/trends/top', methods=['GET'])
+def top_trends_endpoint():
+    """Content whose metric clears a threshold, highest first (JSONB expression indexes)"""
+    args = request.args
+    return run_trend_query('Top trends', lambda supabase: filter_by_metric(
+        supabase, args.get('metric', 'engagement_score'),
+        bounded_number(args, 'min', 0),
+        hours_back=bounded_number(args, 'hours_back', 24, minimum=1, maximum=24 * 90),
+        category=args.get('category') or None,
+        limit=bounded_number(args, 'limit', 100, cast=int, minimum=1, maximum=500)
+    ))
+
+@app.route('/api/trends/category/<category>', methods=['GET'])
+def category_trends_endpoint(category):
+    """Newest content in one category (covering category/timestamp index)"""
+    args = request.args
+    return run_trend_query('Category trends', lambda supabase: recent_by_category(
+        supabase, category,
+        hours_back=bounded_number(args, 'hours_back', 24, minimum=1, maximum=24 * 90),
+        limit=bounded_number(args, 'limit', 100, cast=int, minimum=1, maximum=500)
+    ))
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
+    """Liveness check; reports client state without forcing a connection"""
+    reddit_state = reddit_client.state()
+    supabase_state = supabase_client.state()
     return jsonify({
         "status": "healthy",
-        "reddit_configured": bool(REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET),
-        "reddit_status": reddit_status,
-        "reddit_working": reddit is not None,
+        "reddit_configured": reddit_state["configured"],
+        "reddit_status": reddit_state["status"],
+        "reddit_working": reddit_state["connected"],
         "openai_configured": bool(OPENAI_API_KEY),
-        "supabase_configured": bool(SUPABASE_URL and SUPABASE_KEY),
+        "supabase_configured": supabase_state["configured"],
+        "write_behind": write_buffer.stats(),
+        "spool": get_spool().stats(),
         "services": {
-            "reddit": "✅ Connected" if reddit else "❌ Not connected",
+            "reddit": "✅ Connected" if reddit_state["connected"] else "❌ Not connected",
             "openai": "✅ Configured" if OPENAI_API_KEY else "⚠️ Using fallback",
-            "supabase": "✅ Connected" if supabase else "❌ Not connected"
+            "supabase": "✅ Connected" if supabase_state["connected"] else "❌ Not connected"
         }
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check; connects configured clients that are not connected
+
+    A client still in its post-failure backoff is reported from its cached state,
+    so a probe every few seconds does not hammer an unreachable dependency.
+    """
+    clients = {
+        "reddit": reddit_client,
+        "supabase": supabase_client,
+        "sentiment_analyzer": sentiment_analyzer
+    }
+    states = {}
+    for name, client in clients.items():
+        client.get()
+        states[name] = client.state()
+
+    ready = all(state["connected"] for state in states.values() if state["configured"])
+    return jsonify({
+        "ready": ready,
+        "clients": states,
+        "openai_configured": bool(OPENAI_API_KEY)
+    }), 200 if ready else 503
+
+def create_sentiment_app():
+    """Return the sentiment analysis app for mounting inside another WSGI service"""
+    return app
+
 if __name__ == "__main__":
     print("🚀 Starting sentiment analysis server...")
     print(f"📊 Reddit API: {'Configured' if REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET else 'Not configured'}")
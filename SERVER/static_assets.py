@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Static Asset Pipeline for the WaveSight dashboard
+Content-hash ETags, pre-compressed variants and long-lived caching for fingerprinted URLs
+"""
+
+import os
+import re
+import sys
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from flask import Response, request, send_file
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_EXTENSIONS = {
+    '.html', '.css', '.js', '.json', '.map', '.txt', '.svg', '.ico',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.woff', '.woff2'
+}
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.json', '.map', '.txt', '.svg'}
+SKIP_DIRECTORIES = {'node_modules', '__pycache__', 'attached_assets', 'DOCS', 'CONFIG'}
+MIN_COMPRESS_BYTES = 1024
+
+# Variants in order of preference, with the suffix they are stored under
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Subresource references in served pages: <script src>, <link href>, <img src>, <source src>.
+# Plain <a href> navigation is left alone so page URLs stay stable.
+ASSET_REFERENCE = re.compile(
+    r'(<(?:script|link|img|source)\b[^>]*?\s(?:src|href)=)(["\'])([^"\'#?]+)\2',
+    re.IGNORECASE
+)
+
+
+@dataclass
+class RenderedPage:
+    """An HTML asset with its subresource URLs rewritten to fingerprinted ones"""
+    content_hash: str
+    references: Dict[str, str]
+    body: bytes
+    etag: str
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+
+@dataclass
+class StaticAsset:
+    """A servable file with its content hash and any pre-compressed variants"""
+    path: str
+    content_hash: str
+    size: int
+    mtime: float
+    mimetype: str
+    variants: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def fingerprint(self) -> str:
+        return self.content_hash[:12]
+
+
+def hash_file(path: str, chunk_size: int = 1 << 16) -> str:
+    """Stream a file through SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StaticAssetIndex:
+    """Precomputed content hashes for every dashboard asset under a root directory"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.assets: Dict[str, StaticAsset] = {}
+        self.pages: Dict[str, RenderedPage] = {}
+        self.lock = threading.Lock()
+
+    def build(self):
+        """Hash every static asset once so requests only pay for an os.stat"""
+        for relative_path in self._walk():
+            self._load(relative_path)
+        logger.info(f"🗂️ Indexed {len(self.assets)} static assets under {self.root}")
+        return self
+
+    def lookup(self, filename: str) -> Optional[StaticAsset]:
+        """Return the indexed asset for a request path, re-hashing it if it changed on disk"""
+        relative_path = os.path.normpath(filename).replace(os.sep, '/')
+        if relative_path.startswith('..') or os.path.isabs(relative_path):
+            return None
+        if os.path.splitext(relative_path)[1].lower() not in STATIC_EXTENSIONS:
+            return None
+
+        asset = self.assets.get(relative_path)
+        try:
+            stat = os.stat(os.path.join(self.root, relative_path))
+        except OSError:
+            return None
+
+        if asset is None or asset.mtime != stat.st_mtime or asset.size != stat.st_size:
+            asset = self._load(relative_path)
+        return asset
+
+    def asset_url(self, filename: str) -> str:
+        """Fingerprinted URL for an asset; clients may cache it forever"""
+        asset = self.lookup(filename)
+        if not asset:
+            return f"/{filename}"
+        return f"/{filename}?v={asset.fingerprint}"
+
+    def render_page(self, filename: str) -> Optional[RenderedPage]:
+        """HTML asset with local script/style/image URLs fingerprinted, cached until it or they change"""
+        asset = self.lookup(filename)
+        if asset is None:
+            return None
+        relative_path = os.path.normpath(filename).replace(os.sep, '/')
+
+        page = self.pages.get(relative_path)
+        if page is not None and page.content_hash == asset.content_hash and all(
+                self._fingerprint(reference) == fingerprint
+                for reference, fingerprint in page.references.items()):
+            return page
+
+        with open(asset.path, 'rb') as f:
+            html = f.read().decode('utf-8', errors='surrogateescape')
+        references: Dict[str, str] = {}
+        base_dir = os.path.dirname(relative_path)
+
+        def fingerprint_reference(match):
+            url = match.group(3)
+            if '//' in url or ':' in url or '${' in url or '{{' in url:
+                return match.group(0)
+            reference = os.path.normpath(
+                url.lstrip('/') if url.startswith('/') else os.path.join(base_dir, url)
+            ).replace(os.sep, '/')
+            fingerprint = self._fingerprint(reference)
+            if fingerprint is None:
+                return match.group(0)
+            references[reference] = fingerprint
+            quote = match.group(2)
+            return f"{match.group(1)}{quote}{url}?v={fingerprint}{quote}"
+
+        body = ASSET_REFERENCE.sub(fingerprint_reference, html).encode('utf-8', errors='surrogateescape')
+        page = RenderedPage(
+            content_hash=asset.content_hash,
+            references=references,
+            body=body,
+            etag=hashlib.sha256(body).hexdigest()
+        )
+        with self.lock:
+            self.pages[relative_path] = page
+        return page
+
+    def _fingerprint(self, relative_path: str) -> Optional[str]:
+        asset = self.lookup(relative_path)
+        return asset.fingerprint if asset else None
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRECTORIES]
+            for name in filenames:
+                if os.path.splitext(name)[1].lower() in STATIC_EXTENSIONS:
+                    full_path = os.path.join(dirpath, name)
+                    yield os.path.relpath(full_path, self.root).replace(os.sep, '/')
+
+    def _load(self, relative_path: str) -> Optional[StaticAsset]:
+        full_path = os.path.join(self.root, relative_path)
+        try:
+            stat = os.stat(full_path)
+            content_hash = hash_file(full_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not index {relative_path}: {e}")
+            return None
+
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            variant_path = full_path + suffix
+            try:
+                # Ignore stale variants left behind by an older build of the file
+                if os.stat(variant_path).st_mtime >= stat.st_mtime:
+                    variants[encoding] = variant_path
+            except OSError:
+                continue
+
+        asset = StaticAsset(
+            path=full_path,
+            content_hash=content_hash,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            mimetype=mimetypes.guess_type(full_path)[0] or 'application/octet-stream',
+            variants=variants
+        )
+        with self.lock:
+            self.assets[relative_path] = asset
+        return asset
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Content codings an Accept-Encoding header allows"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def negotiate_encoding(asset: StaticAsset, accept_encoding: str) -> Optional[str]:
+    """Pick the best pre-compressed variant the client accepts"""
+    if not asset.variants:
+        return None
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, _ in ENCODINGS:
+        if encoding in asset.variants and encoding in accepted:
+            return encoding
+    return None
+
+
+def _compressors() -> List[Tuple[str, object]]:
+    compressors = []
+    if brotli is not None:
+        compressors.append(('br', lambda data: brotli.compress(data, quality=11)))
+    compressors.append(('gzip', lambda data: gzip.compress(data, compresslevel=9, mtime=0)))
+    return compressors
+
+
+def serve_page(index: StaticAssetIndex, filename: str):
+    """Serve an HTML page whose asset URLs carry fingerprints, so those assets cache immutably"""
+    page = index.render_page(filename)
+    if page is None:
+        return None
+
+    body, encoding = page.body, None
+    if len(page.body) >= MIN_COMPRESS_BYTES:
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for candidate, compress in _compressors():
+            if candidate not in accepted:
+                continue
+            if candidate not in page.encoded:
+                page.encoded[candidate] = compress(page.body)
+            body, encoding = page.encoded[candidate], candidate
+            break
+
+    response = Response(body, mimetype='text/html')
+    response.set_etag(f"{page.etag}-{encoding}" if encoding else page.etag)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    # The page URL itself is not fingerprinted, so it must always revalidate
+    response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response.make_conditional(request)
+
+
+def serve_asset(index: StaticAssetIndex, filename: str):
+    """Serve an indexed asset with a strong ETag, 304 handling and the best encoding"""
+    asset = index.lookup(filename)
+    if asset is None:
+        return None
+    if asset.mimetype == 'text/html':
+        return serve_page(index, filename)
+
+    encoding = negotiate_encoding(asset, request.headers.get('Accept-Encoding', ''))
+    path = asset.variants[encoding] if encoding else asset.path
+    # Each representation gets its own strong validator
+    etag = f"{asset.content_hash}-{encoding}" if encoding else asset.content_hash
+
+    response = send_file(path, mimetype=asset.mimetype, etag=etag,
+                         conditional=True, last_modified=asset.mtime, max_age=None)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+
+    if request.args.get('v') == asset.fingerprint:
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
+
+
+def precompress_assets(root: str) -> Dict[str, int]:
+    """Write .gz (and .br when brotli is installed) next to every compressible asset"""
+    index = StaticAssetIndex(root)
+    written = {'gzip': 0, 'br': 0}
+
+    for relative_path in index._walk():
+        if os.path.splitext(relative_path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        full_path = os.path.join(index.root, relative_path)
+        source_mtime = os.stat(full_path).st_mtime
+        if os.path.getsize(full_path) < MIN_COMPRESS_BYTES:
+            continue
+
+        with open(full_path, 'rb') as f:
+            content = f.read()
+
+        targets = [('gzip', '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            targets.append(('br', '.br', lambda data: brotli.compress(data, quality=11)))
+
+        for encoding, suffix, compress in targets:
+            variant_path = full_path + suffix
+            if os.path.exists(variant_path) and os.stat(variant_path).st_mtime >= source_mtime:
+                continue
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                continue
+            with open(variant_path, 'wb') as f:
+                f.write(compressed)
+            written[encoding] += 1
+
+    logger.info(f"🗜️ Pre-compressed assets: {written['gzip']} gzip, {written['br']} brotli"
+                + ("" if brotli else " (install brotli for .br variants)"))
+    return written
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    precompress_assets(target)
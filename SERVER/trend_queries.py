@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Indexed Read Helpers for raw_ingestion_data
+Each helper is shaped to hit one index from the enhanced schema: trigram title
+search, JSONB metric expression indexes and the covering (category, timestamp) index.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# Metric name -> PostgREST json path; each path has a matching expression index
+METRIC_PATHS = {
+    'engagement_score': 'normalized_metrics->engagement_score',
+    'viral_velocity': 'normalized_metrics->viral_velocity',
+    'reach_estimate': 'normalized_metrics->reach_estimate',
+    'view_count': 'raw_metrics->view_count',
+}
+
+# Columns held in idx_raw_ingestion_category_ts, so category listings are index-only scans
+CATEGORY_COLUMNS = "category,timestamp,content_id,platform_source,title"
+SEARCH_COLUMNS = "content_id,platform_source,title,category,timestamp"
+
+# Trigrams need three characters; shorter terms would scan every title
+MIN_SEARCH_LENGTH = 3
+
+
+def _since(hours_back: Optional[float]) -> Optional[str]:
+    if hours_back is None:
+        return None
+    return (datetime.now(timezone.utc) - timedelta(hours=hours_back)).isoformat()
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_titles(supabase, term: str, hours_back: Optional[float] = 168, category: Optional[str] = None,
+                  limit: int = 50, columns: str = SEARCH_COLUMNS) -> List[Dict]:
+    """Case-insensitive substring search on titles (trigram index)"""
+    term = (term or '').strip()
+    if len(term) < MIN_SEARCH_LENGTH:
+        raise ValueError(f"search term must be at least {MIN_SEARCH_LENGTH} characters")
+    query = supabase.table("raw_ingestion_data").select(columns).ilike("title", f"%{escape_like(term)}%")
+    since = _since(hours_back)
+    if since:
+        query = query.gte("timestamp", since)
+    if category:
+        query = query.eq("category", category)
+    return query.order("timestamp", desc=True).limit(limit).execute().data or []
+
+
+def filter_by_metric(supabase, metric: str, minimum: float, hours_back: Optional[float] = 24,
+                     category: Optional[str] = None, limit: int = 100, columns: str = "*") -> List[Dict]:
+    """Rows whose metric is at least `minimum`, highest first (JSONB expression index)"""
+    if metric not in METRIC_PATHS:
+        raise ValueError(f"unknown metric '{metric}'; expected one of {', '.join(METRIC_PATHS)}")
+    path = METRIC_PATHS[metric]
+    query = supabase.table("raw_ingestion_data").select(columns).gte(path, minimum)
+    since = _since(hours_back)
+    if since:
+        query = query.gte("timestamp", since)
+    if category:
+        query = query.eq("category", category)
+    return query.order(path, desc=True).limit(limit).execute().data or []
+
+
+def recent_by_category(supabase, category: str, hours_back: float = 24, limit: int = 100,
+                       columns: str = CATEGORY_COLUMNS) -> List[Dict]:
+    """Newest rows in a category (covering index; keep `columns` within CATEGORY_COLUMNS)"""
+    return supabase.table("raw_ingestion_data")\
+        .select(columns)\
+        .eq("category", category)\
+        .gte("timestamp", _since(hours_back))\
+        .order("timestamp", desc=True)\
+        .limit(limit)\
+        .execute().data or []
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Trend Statistics for WaveScope
+Average, peak, volatility and regression slope per trend from the
+calculate_trend_stats() SQL function, fetched for many trends per call.
+"""
+
+import json
+import logging
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Trend ids per RPC call; keeps the request body well under PostgREST limits
+TREND_STATS_BATCH_SIZE = 500
+NUMERIC_FIELDS = ('avg_score', 'max_score', 'latest_score', 'volatility', 'slope_per_hour')
+
+
+def fetch_trend_stats(supabase, trend_ids: Iterable[str], hours_back: int = 24,
+                      flat_slope: float = 0.1, batch_size: int = TREND_STATS_BATCH_SIZE) -> Dict[str, Dict]:
+    """Stats keyed by trend_id; trends with no points in the window are left out"""
+    unique_ids: List[str] = list(dict.fromkeys(trend_id for trend_id in trend_ids if trend_id))
+    stats = {}
+    for start in range(0, len(unique_ids), batch_size):
+        response = supabase.rpc("calculate_trend_stats", {
+            "trend_ids": unique_ids[start:start + batch_size],
+            "hours_back": hours_back,
+            "flat_slope": flat_slope
+        }).execute()
+        for row in response.data or []:
+            # DECIMAL columns arrive as strings or numbers depending on the client
+            for field in NUMERIC_FIELDS:
+                if row.get(field) is not None:
+                    row[field] = float(row[field])
+            stats[row['trend_id']] = row
+    return stats
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    from dotenv import load_dotenv
+    from datastore import create_client
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    load_dotenv()
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY"))
+    print(json.dumps(fetch_trend_stats(client, sys.argv[1:]), indent=2))
@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""
+Historical Variant Engine - Python port of the JS HistoricalVariantGenerator
+Variants are built from hourly/daily/weekly rollups whose buckets are rebuilt as each
+batch of new wavescores lands in them, and similar trends come from an LSH index over trend shapes.
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from forecast_engine import fit_linear
+from pipeline_state import STATE_DIR, read_json, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# Rollup resolutions, the bucket each one floors to and how far back variants read it
+RESOLUTIONS = {
+    'hour': {'freq': 'h', 'window': timedelta(days=8)},
+    'day': {'freq': 'D', 'window': timedelta(days=31)},
+    'week': {'freq': 'W', 'window': timedelta(weeks=12)},
+}
+
+SNAPSHOT_INTERVALS = {'1h': 1, '6h': 6, '24h': 24, '7d': 168}
+# Aggregated timeframes and the coarsest rollup that still resolves them
+AGGREGATION_TIMEFRAMES = {'1h': 'hour', '6h': 'hour', '24h': 'hour', '7d': 'day', '30d': 'day', '12w': 'week'}
+PROJECTION_HORIZONS = {'6h': 6, '24h': 24, '7d': 168}
+
+SIGNATURE_HOURS = 24      # Shape signatures cover the last day of hourly means
+MIN_SIGNATURE_POINTS = 6
+MIN_PROJECTION_POINTS = 10
+SIMILAR_TRENDS = 5
+
+
+def bucket_starts(times: pd.Series, resolution: str) -> pd.Series:
+    """Start of the rollup bucket each timestamp falls in"""
+    if resolution == 'week':
+        # Weeks start on Monday 00:00 UTC
+        days = times.dt.floor('D')
+        return days - pd.to_timedelta(days.dt.dayofweek, unit='D')
+    return times.dt.floor(RESOLUTIONS[resolution]['freq'])
+
+
+def rollup_scores(scores: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """Aggregate raw wavescores into per-bucket sums"""
+    frame = scores.assign(bucket_start=bucket_starts(scores['calculated_at'], resolution),
+                          score_sq=scores['wave_score'] ** 2)\
+        .sort_values('calculated_at')
+    grouped = frame.groupby(['trend_id', 'bucket_start'], sort=False)
+    rollup = grouped.agg(
+        point_count=('wave_score', 'size'),
+        score_sum=('wave_score', 'sum'),
+        score_sum_sq=('score_sq', 'sum'),
+        score_min=('wave_score', 'min'),
+        score_max=('wave_score', 'max'),
+        last_score=('wave_score', 'last'),
+        last_calculated_at=('calculated_at', 'last'),
+    ).reset_index()
+    rollup['resolution'] = resolution
+    return rollup
+
+
+def combine_rollups(rollups: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """Re-bucket finer rollups into a coarser resolution"""
+    frame = rollups.assign(bucket_start=bucket_starts(rollups['bucket_start'], resolution))\
+        .sort_values('last_calculated_at')
+    grouped = frame.groupby(['trend_id', 'bucket_start'], sort=False)
+    rollup = grouped.agg(
+        point_count=('point_count', 'sum'),
+        score_sum=('score_sum', 'sum'),
+        score_sum_sq=('score_sum_sq', 'sum'),
+        score_min=('score_min', 'min'),
+        score_max=('score_max', 'max'),
+        last_score=('last_score', 'last'),
+        last_calculated_at=('last_calculated_at', 'last'),
+    ).reset_index()
+    rollup['resolution'] = resolution
+    return rollup
+
+
+def rollup_records(rollups: pd.DataFrame) -> List[Dict]:
+    updated_at = datetime.now(timezone.utc).isoformat()
+    return [{
+        'trend_id': row.trend_id,
+        'resolution': row.resolution,
+        'bucket_start': row.bucket_start.isoformat(),
+        'point_count': int(row.point_count),
+        'score_sum': round(float(row.score_sum), 4),
+        'score_sum_sq': round(float(row.score_sum_sq), 4),
+        'score_min': round(float(row.score_min), 2),
+        'score_max': round(float(row.score_max), 2),
+        'last_score': round(float(row.last_score), 2),
+        'last_calculated_at': row.last_calculated_at.isoformat(),
+        'updated_at': updated_at
+    } for row in rollups.itertuples(index=False)]
+
+
+def shape_signatures(matrix: np.ndarray) -> np.ndarray:
+    """Z-normalized, unit-length shape of the trailing hours; rows without shape become zeros"""
+    window = matrix[:, -SIGNATURE_HOURS:]
+    observed = (~np.isnan(window)).sum(axis=1)
+    filled = np.nan_to_num(pd.DataFrame(window).ffill(axis=1).bfill(axis=1).to_numpy())
+    centered = filled - filled.mean(axis=1, keepdims=True)
+    norm = np.linalg.norm(centered, axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        signatures = np.where(norm > 1e-9, centered / norm, 0.0)
+    signatures[observed < MIN_SIGNATURE_POINTS] = 0.0
+    return np.nan_to_num(signatures)
+
+
+class ShapeIndex:
+    """Random-hyperplane LSH over unit vectors; queries only rerank colliding buckets"""
+
+    def __init__(self, dim: int = SIGNATURE_HOURS, tables: int = 8, bits: int = 10, seed: int = 42):
+        self.dim = dim
+        self.planes = np.random.default_rng(seed).standard_normal((tables, dim, bits))
+        self.powers = 1 << np.arange(bits)
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.vectors = np.zeros((0, dim))
+        self.payload: List[Dict] = []
+        self.buckets: List[Dict[int, set]] = [dict() for _ in range(tables)]
+
+    def _keys(self, vectors: np.ndarray) -> np.ndarray:
+        """Bucket key per table for each vector, shape (n, tables)"""
+        projections = np.einsum('nd,tdb->ntb', vectors, self.planes) > 0
+        return projections.astype(np.int64) @ self.powers
+
+    def add_many(self, ids: List[str], vectors: np.ndarray, payload: List[Dict]):
+        # Re-added trends leave the buckets their previous shape hashed to
+        stale_rows = [self.positions[i] for i in ids if i in self.positions]
+        if stale_rows:
+            for row, row_keys in zip(stale_rows, self._keys(self.vectors[stale_rows])):
+                for table, key in enumerate(row_keys):
+                    self.buckets[table].get(int(key), set()).discard(row)
+
+        new_rows = []
+        for trend_id, info in zip(ids, payload):
+            row = self.positions.get(trend_id)
+            if row is None:
+                row = len(self.ids)
+                self.positions[trend_id] = row
+                self.ids.append(trend_id)
+                self.payload.append(info)
+                new_rows.append(row)
+            else:
+                self.payload[row] = info
+        if new_rows:
+            self.vectors = np.vstack([self.vectors, np.zeros((len(new_rows), self.dim))])
+
+        rows = [self.positions[i] for i in ids]
+        self.vectors[rows] = vectors
+        for row, row_keys in zip(rows, self._keys(vectors)):
+            for table, key in enumerate(row_keys):
+                self.buckets[table].setdefault(int(key), set()).add(row)
+
+    def query(self, vector: np.ndarray, k: int = SIMILAR_TRENDS, exclude: Optional[str] = None):
+        candidates = set()
+        for table, key in enumerate(self._keys(vector[None, :])[0]):
+            candidates |= self.buckets[table].get(int(key), set())
+        candidates.discard(self.positions.get(exclude))
+        if not candidates:
+            return []
+        rows = np.fromiter(candidates, dtype=int)
+        similarity = self.vectors[rows] @ vector
+        best = np.argsort(-similarity)[:k]
+        return [(self.ids[rows[i]], float(similarity[i]), self.payload[rows[i]]) for i in best]
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, vectors=self.vectors, ids=np.array(self.ids, dtype=object),
+                            payload=np.array([json.dumps(p) for p in self.payload], dtype=object))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ShapeIndex':
+        index = cls()
+        if os.path.exists(path):
+            stored = np.load(path, allow_pickle=True)
+            index.add_many(list(stored['ids']), stored['vectors'], [json.loads(p) for p in stored['payload']])
+        return index
+
+
+class VariantEngine:
+    """Maintains wavescore rollups and regenerates trend_variants for trends with new scores"""
+
+    def __init__(self, supabase, state_dir: Optional[str] = None, chunk_size: int = 1000,
+                 write_batch_size: int = 500, id_batch_size: int = 100):
+        self.supabase = supabase
+        state_dir = state_dir or STATE_DIR
+        self.state_path = os.path.join(state_dir, "variant_state.json")
+        self.index_path = os.path.join(state_dir, "shape_index.npz")
+        self.chunk_size = chunk_size
+        self.write_batch_size = write_batch_size
+        self.id_batch_size = id_batch_size
+        self.watermark = self._load_watermark()
+        self.index = ShapeIndex.load(self.index_path)
+
+    def _load_watermark(self) -> Optional[str]:
+        return read_json(self.state_path, {}).get('watermark')
+
+    def _save_watermark(self, watermark: str):
+        write_json_atomic(self.state_path, {'watermark': watermark})
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def load_new_scores(self, now: datetime) -> pd.DataFrame:
+        """wavescores written since the last run (or the hourly window on first run)"""
+        since = self.watermark or (now - RESOLUTIONS['hour']['window']).isoformat()
+        frames = []
+        offset = 0
+        while True:
+            response = self.supabase.table("wavescores")\
+                .select("trend_id,wave_score,calculated_at")\
+                .gt("calculated_at", since)\
+                .order("calculated_at")\
+                .order("id")\
+                .range(offset, offset + self.chunk_size - 1)\
+                .execute()
+            rows = response.data or []
+            if rows:
+                frames.append(pd.DataFrame.from_records(rows))
+            if len(rows) < self.chunk_size:
+                break
+            offset += self.chunk_size
+
+        if not frames:
+            return pd.DataFrame(columns=['trend_id', 'wave_score', 'calculated_at'])
+        scores = pd.concat(frames, ignore_index=True)
+        scores['wave_score'] = pd.to_numeric(scores['wave_score'], errors='coerce')
+        scores['calculated_at'] = pd.to_datetime(scores['calculated_at'], utc=True, errors='coerce', format='ISO8601')
+        return scores.dropna(subset=['wave_score', 'calculated_at'])
+
+    def load_trend_scores(self, trend_ids: List[str], since: datetime, until: datetime) -> pd.DataFrame:
+        """Every wavescore of the given trends in [since, until], fetched in id batches"""
+        frames = []
+        for start in range(0, len(trend_ids), self.id_batch_size):
+            batch = trend_ids[start:start + self.id_batch_size]
+            offset = 0
+            while True:
+                response = self.supabase.table("wavescores")\
+                    .select("trend_id,wave_score,calculated_at")\
+                    .in_("trend_id", batch)\
+                    .gte("calculated_at", since.isoformat())\
+                    .lte("calculated_at", until.isoformat())\
+                    .order("calculated_at")\
+                    .order("id")\
+                    .range(offset, offset + self.chunk_size - 1)\
+                    .execute()
+                rows = response.data or []
+                if rows:
+                    frames.append(pd.DataFrame.from_records(rows))
+                if len(rows) < self.chunk_size:
+                    break
+                offset += self.chunk_size
+
+        if not frames:
+            return pd.DataFrame(columns=['trend_id', 'wave_score', 'calculated_at'])
+        scores = pd.concat(frames, ignore_index=True)
+        scores['wave_score'] = pd.to_numeric(scores['wave_score'], errors='coerce')
+        scores['calculated_at'] = pd.to_datetime(scores['calculated_at'], utc=True, errors='coerce', format='ISO8601')
+        return scores.dropna(subset=['wave_score', 'calculated_at'])
+
+    def load_rollups(self, trend_ids: List[str], resolution: str, since: datetime) -> pd.DataFrame:
+        """Stored rollups for the given trends, fetched in id batches"""
+        frames = []
+        for start in range(0, len(trend_ids), self.id_batch_size):
+            batch = trend_ids[start:start + self.id_batch_size]
+            offset = 0
+            while True:
+                response = self.supabase.table("trend_rollups")\
+                    .select("*")\
+                    .eq("resolution", resolution)\
+                    .in_("trend_id", batch)\
+                    .gte("bucket_start", since.isoformat())\
+                    .order("bucket_start")\
+                    .order("trend_id")\
+                    .range(offset, offset + self.chunk_size - 1)\
+                    .execute()
+                rows = response.data or []
+                if rows:
+                    frames.append(pd.DataFrame.from_records(rows))
+                if len(rows) < self.chunk_size:
+                    break
+                offset += self.chunk_size
+
+        if not frames:
+            return pd.DataFrame()
+        rollups = pd.concat(frames, ignore_index=True)
+        for column in ['bucket_start', 'last_calculated_at']:
+            rollups[column] = pd.to_datetime(rollups[column], utc=True, format='ISO8601')
+        for column in ['point_count', 'score_sum', 'score_sum_sq', 'score_min', 'score_max', 'last_score']:
+            rollups[column] = pd.to_numeric(rollups[column], errors='coerce')
+        return rollups
+
+    # ------------------------------------------------------------------
+    # Rollups
+    # ------------------------------------------------------------------
+
+    def update_rollups(self, scores: pd.DataFrame, now: datetime) -> Dict[str, pd.DataFrame]:
+        """Rebuild the buckets new scores fall in; returns the full windowed rollups per resolution
+
+        Touched hour and day buckets are recomputed from every wavescore in them and
+        weeks from their days, so rerunning a batch after a failed run rewrites the
+        same sums instead of adding the scores twice.
+        """
+        trend_ids = scores['trend_id'].unique().tolist()
+        first_day = scores['calculated_at'].min().floor('D')
+        first_week = bucket_starts(pd.Series([first_day]), 'week').iloc[0]
+        raw = self.load_trend_scores(trend_ids, first_day, scores['calculated_at'].max())
+
+        windows = {}
+        for resolution, spec in RESOLUTIONS.items():
+            if resolution == 'week':
+                days = windows['day']
+                rebuilt = combine_rollups(days[days['bucket_start'] >= first_week], resolution)
+            else:
+                rebuilt = rollup_scores(raw, resolution)
+            since = min(now - spec['window'], rebuilt['bucket_start'].min())
+            if resolution == 'day':
+                # Weeks are rebuilt from every day they contain
+                since = min(since, first_week)
+            stored = self.load_rollups(trend_ids, resolution, since)
+
+            records = rollup_records(rebuilt)
+            for start in range(0, len(records), self.write_batch_size):
+                self.supabase.table("trend_rollups")\
+                    .upsert(records[start:start + self.write_batch_size], on_conflict="trend_id,resolution,bucket_start")\
+                    .execute()
+
+            # Untouched stored buckets plus the rebuilt ones
+            if not stored.empty:
+                keys = ['trend_id', 'bucket_start']
+                untouched = stored.merge(rebuilt[keys], on=keys, how='left', indicator=True)
+                stored = untouched[untouched['_merge'] == 'left_only'][rebuilt.columns]
+                windows[resolution] = pd.concat([stored, rebuilt], ignore_index=True)
+            else:
+                windows[resolution] = rebuilt
+
+        for resolution, spec in RESOLUTIONS.items():
+            window = windows[resolution]
+            window = window[window['bucket_start'] >= now - spec['window']].copy()
+            window['mean_score'] = window['score_sum'] / window['point_count']
+            windows[resolution] = window
+        return windows
+
+    # ------------------------------------------------------------------
+    # Variants
+    # ------------------------------------------------------------------
+
+    def snapshot_variants(self, hourly: pd.DataFrame, now: datetime) -> List[Dict]:
+        variants = []
+        for interval, hours in SNAPSHOT_INTERVALS.items():
+            target = now - timedelta(hours=hours)
+            distance = (hourly['bucket_start'] - target).abs()
+            closest = hourly.loc[distance.groupby(hourly['trend_id']).idxmin()]
+            for row in closest.itertuples(index=False):
+                timestamp = row.bucket_start.isoformat()
+                variants.append({
+                    'trend_id': row.trend_id,
+                    'variant_type': 'snapshot',
+                    'variant_name': f'snapshot_{interval}_ago',
+                    'time_range_start': timestamp,
+                    'time_range_end': timestamp,
+                    'data_snapshot': {
+                        'timestamp': timestamp,
+                        'wave_score': round(float(row.mean_score), 2),
+                        'last_score': round(float(row.last_score), 2),
+                        'data_points': int(row.point_count)
+                    },
+                    'metadata': {'interval': interval, 'snapshot_reason': 'historical_point', 'source': 'hourly_rollup'}
+                })
+        return variants
+
+    def aggregated_variants(self, windows: Dict[str, pd.DataFrame], now: datetime) -> List[Dict]:
+        variants = []
+        for timeframe, resolution in AGGREGATION_TIMEFRAMES.items():
+            span = timedelta(hours=int(timeframe[:-1]) * {'h': 1, 'd': 24, 'w': 168}[timeframe[-1]])
+            period = windows[resolution]
+            period = period[period['bucket_start'] >= now - span]
+            if period.empty:
+                continue
+
+            x = (period['bucket_start'] - (now - span)).dt.total_seconds() / 3600
+            period = period.assign(x=x, xx=x * x, xy=x * period['mean_score'])
+            stats = period.groupby('trend_id').agg(
+                points=('point_count', 'sum'), total=('score_sum', 'sum'), total_sq=('score_sum_sq', 'sum'),
+                score_min=('score_min', 'min'), score_max=('score_max', 'max'),
+                buckets=('mean_score', 'size'), sx=('x', 'sum'), sxx=('xx', 'sum'),
+                sy=('mean_score', 'sum'), sxy=('xy', 'sum'),
+                start=('bucket_start', 'min'), end=('bucket_start', 'max')
+            )
+            avg = stats['total'] / stats['points']
+            std = np.sqrt(np.maximum(stats['total_sq'] / stats['points'] - avg ** 2, 0))
+            denominator = stats['buckets'] * stats['sxx'] - stats['sx'] ** 2
+            slope = np.where(denominator > 0, (stats['buckets'] * stats['sxy'] - stats['sx'] * stats['sy']) / denominator.where(denominator > 0, 1), 0.0)
+
+            for (trend_id, row), mean, spread, trend_slope in zip(stats.iterrows(), avg, std, slope):
+                direction = 'rising' if trend_slope > 0.1 else 'falling' if trend_slope < -0.1 else 'stable'
+                variants.append({
+                    'trend_id': trend_id,
+                    'variant_type': 'aggregated',
+                    'variant_name': f'aggregated_{timeframe}',
+                    'time_range_start': row['start'].isoformat(),
+                    'time_range_end': row['end'].isoformat(),
+                    'aggregated_metrics': {
+                        'wave_score': {
+                            'avg': round(float(mean), 2), 'max': round(float(row['score_max']), 2),
+                            'min': round(float(row['score_min']), 2), 'std_dev': round(float(spread), 2),
+                            'trend': round(float(trend_slope), 4)
+                        },
+                        'data_points': int(row['points']),
+                        'buckets': int(row['buckets'])
+                    },
+                    'trend_analysis': {
+                        'direction': direction,
+                        'velocity': round(float(trend_slope), 4),
+                        'volatility': round(float(spread), 2)
+                    },
+                    'metadata': {'timeframe': timeframe, 'rollup_resolution': resolution,
+                                 'data_points_count': int(row['points'])}
+                })
+        return variants
+
+    def hourly_matrix(self, hourly: pd.DataFrame, now: datetime):
+        """Trends x hours matrix of bucket means over the hourly window, oldest column first"""
+        start = (now - RESOLUTIONS['hour']['window']).replace(minute=0, second=0, microsecond=0)
+        hours = ((hourly['bucket_start'] - start).dt.total_seconds() // 3600).astype(int).to_numpy()
+        codes, trend_ids = pd.factorize(hourly['trend_id'])
+        width = int((now - start).total_seconds() // 3600) + 1
+        matrix = np.full((len(trend_ids), width), np.nan)
+        keep = (hours >= 0) & (hours < width)
+        matrix[codes[keep], hours[keep]] = hourly['mean_score'].to_numpy(dtype=float)[keep]
+        return matrix, np.asarray(trend_ids)
+
+    def projected_variants(self, matrix: np.ndarray, trend_ids: np.ndarray, now: datetime) -> List[Dict]:
+        enough = (~np.isnan(matrix)).sum(axis=1) >= MIN_PROJECTION_POINTS
+        if not enough.any():
+            return []
+        linear = fit_linear(matrix[enough])
+        last_hour = matrix.shape[1] - 1
+        variants = []
+        for name, hours in PROJECTION_HORIZONS.items():
+            future_x = last_hour + hours
+            predicted = linear['intercept'] + linear['slope'] * future_x
+            with np.errstate(divide='ignore', invalid='ignore'):
+                leverage = np.where(linear['sxx'] > 0, (future_x - linear['x_mean']) ** 2 / linear['sxx'], 0.0)
+            margin = 1.96 * linear['sigma'] * np.sqrt(1 + 1 / linear['n'] + leverage)
+            for i, trend_id in enumerate(trend_ids[enough]):
+                value = float(predicted[i])
+                warnings = []
+                if value > 95 or value < 5:
+                    warnings.append('extreme_projection')
+                if linear['r_squared'][i] < 0.3:
+                    warnings.append('low_confidence')
+                variants.append({
+                    'trend_id': trend_id,
+                    'variant_type': 'projected',
+                    'variant_name': f'projection_{name}_ahead',
+                    'time_range_start': now.isoformat(),
+                    'time_range_end': (now + timedelta(hours=hours)).isoformat(),
+                    'projected_metrics': {
+                        'projected_wave_score': round(min(100.0, max(0.0, value)), 2),
+                        'confidence_lower': round(max(0.0, value - float(margin[i])), 2),
+                        'confidence_upper': round(min(100.0, value + float(margin[i])), 2),
+                        'confidence_level': 0.95,
+                        'projection_hours': hours
+                    },
+                    'forecast_metadata': {
+                        'projection_method': 'linear_regression',
+                        'horizon': name,
+                        'slope_per_hour': round(float(linear['slope'][i]), 4),
+                        'r_squared': round(float(linear['r_squared'][i]), 3),
+                        'based_on_points': int(linear['n'][i])
+                    },
+                    'metadata': {'algorithm': 'linear_regression', 'source': 'hourly_rollup', 'warning_flags': warnings}
+                })
+        return variants
+
+    def comparative_variants(self, signatures: np.ndarray, trend_ids: np.ndarray,
+                             recent_avg: Dict[str, float], now: datetime) -> List[Dict]:
+        has_shape = np.abs(signatures).sum(axis=1) > 0
+        ids = trend_ids[has_shape].tolist()
+        if not ids:
+            return []
+        self.index.add_many(ids, signatures[has_shape],
+                            [{'avg_wave_score': round(recent_avg.get(i, 0.0), 2)} for i in ids])
+
+        variants = []
+        for trend_id, signature in zip(ids, signatures[has_shape]):
+            neighbours = self.index.query(signature, exclude=trend_id)
+            if not neighbours:
+                continue
+            current = recent_avg.get(trend_id, 0.0)
+            neighbour_scores = [info['avg_wave_score'] for _, _, info in neighbours]
+            percentile = sum(score < current for score in neighbour_scores) / len(neighbour_scores) * 100
+            variants.append({
+                'trend_id': trend_id,
+                'variant_type': 'comparative',
+                'variant_name': 'performance_comparison',
+                'time_range_start': (now - timedelta(hours=SIGNATURE_HOURS)).isoformat(),
+                'time_range_end': now.isoformat(),
+                'comparison_data': {
+                    'current_trend': {'avg_wave_score': round(current, 2)},
+                    'similar_trends': [
+                        {'trend_id': other, 'shape_similarity': round(similarity, 3), **info}
+                        for other, similarity, info in neighbours
+                    ],
+                    'performance_percentiles': {'wave_score': round(percentile, 1)},
+                    'ranking': {'by_wave_score': 1 + sum(score > current for score in neighbour_scores)}
+                },
+                'metadata': {
+                    'compared_trends': [other for other, _, _ in neighbours],
+                    'comparison_metrics': ['wave_score_shape', 'avg_wave_score'],
+                    'similarity_method': 'lsh_cosine',
+                    'sample_size': len(neighbours)
+                }
+            })
+        return variants
+
+    def write_variants(self, variants: List[Dict]) -> int:
+        for start in range(0, len(variants), self.write_batch_size):
+            self.supabase.table("trend_variants")\
+                .upsert(variants[start:start + self.write_batch_size], on_conflict="trend_id,variant_type,variant_name")\
+                .execute()
+        return len(variants)
+
+    def run(self) -> Dict:
+        """Fold new wavescores into rollups and refresh variants for the trends they touch"""
+        started = time.time()
+        now = datetime.now(timezone.utc)
+        scores = self.load_new_scores(now)
+        if scores.empty:
+            return {"variants_generated": 0, "new_scores": 0, "trends_updated": 0,
+                    "indexed_trends": len(self.index.ids),
+                    "duration_seconds": round(time.time() - started, 3), "status": "success"}
+
+        windows = self.update_rollups(scores, now)
+        hourly = windows['hour']
+        matrix, trend_ids = self.hourly_matrix(hourly, now)
+        day = hourly[hourly['bucket_start'] >= now - timedelta(hours=SIGNATURE_HOURS)]
+        day_stats = day.groupby('trend_id')[['score_sum', 'point_count']].sum()
+        recent_avg = (day_stats['score_sum'] / day_stats['point_count']).to_dict()
+
+        variants = []
+        variants += self.snapshot_variants(hourly, now)
+        variants += self.aggregated_variants(windows, now)
+        variants += self.projected_variants(matrix, trend_ids, now)
+        variants += self.comparative_variants(shape_signatures(matrix), trend_ids, recent_avg, now)
+        written = self.write_variants(variants)
+
+        self.index.save(self.index_path)
+        self._save_watermark(scores['calculated_at'].max().isoformat())
+
+        by_type = {}
+        for variant in variants:
+            by_type[variant['variant_type']] = by_type.get(variant['variant_type'], 0) + 1
+        return {
+            "variants_generated": written,
+            "variants_by_type": by_type,
+            "new_scores": len(scores),
+            "trends_updated": len(trend_ids),
+            "rollup_buckets": {resolution: len(window) for resolution, window in windows.items()},
+            "indexed_trends": len(self.index.ids),
+            "duration_seconds": round(time.time() - started, 3),
+            "status": "success"
+        }
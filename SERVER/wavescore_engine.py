@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+WaveScore Engine - batch port of the JS WaveScoreGenerator
+WaveScore = α·NormEngagement + β·GrowthRate + γ·SentimentMomentum + δ·AudienceDiversity + ViralBoost
+Every component is computed column-wise over a chunk of raw_ingestion_data rows.
+"""
+
+import json
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+except ImportError:  # Keyword sentiment (the JS fallback) is used instead
+    SentimentIntensityAnalyzer = None
+
+logger = logging.getLogger(__name__)
+
+# WaveScore formula coefficients
+COEFFICIENTS = {
+    'alpha': 0.35,  # Normalized Engagement Weight
+    'beta': 0.25,   # Growth Rate Weight
+    'gamma': 0.25,  # Sentiment Momentum Weight
+    'delta': 0.15   # Audience Diversity Weight
+}
+
+# Platform-specific adjustment factors
+PLATFORM_ADJUSTMENTS = {
+    'youtube': {'engagement_boost': 1.2, 'viral_threshold': 1000000, 'sentiment_weight': 1.0, 'diversity_factor': 1.1},
+    'reddit': {'engagement_boost': 0.9, 'viral_threshold': 50000, 'sentiment_weight': 1.3, 'diversity_factor': 0.8},
+    'tiktok': {'engagement_boost': 1.5, 'viral_threshold': 5000000, 'sentiment_weight': 0.8, 'diversity_factor': 1.2}
+}
+
+# Engagement weights the normalization engine applies before binning
+NORMALIZATION_ENGAGEMENT_WEIGHTS = {'youtube': 1.2, 'reddit': 0.8, 'tiktok': 1.5}
+
+CATEGORY_DIVERSITY_FACTORS = {
+    'AI Tools': 0.7,
+    'Technology': 0.8,
+    'Gaming': 0.9,
+    'Entertainment': 1.2,
+    'Music': 1.1,
+    'News & Politics': 0.8,
+    'Education': 0.9,
+    'Sports': 1.0,
+    'Science & Technology': 0.7,
+    'Crypto': 0.6
+}
+PLATFORM_DIVERSITY_FACTORS = {'youtube': 1.1, 'reddit': 0.9, 'tiktok': 1.2}
+PLATFORM_CONFIDENCE_FACTORS = {'youtube': 1.0, 'reddit': 0.9, 'tiktok': 0.8}
+
+POSITIVE_WORDS = ['amazing', 'awesome', 'incredible', 'fantastic', 'great', 'excellent',
+                  'love', 'perfect', 'brilliant', 'outstanding', 'wonderful', 'best']
+NEGATIVE_WORDS = ['terrible', 'awful', 'horrible', 'worst', 'hate', 'bad',
+                  'disappointing', 'failed', 'broken', 'useless', 'garbage']
+
+# Raw rows are read as flat scalar columns instead of nested JSON documents
+RAW_SELECT = ",".join([
+    "content_id", "platform_source", "category", "title", "timestamp", "published_at",
+    "view_count:raw_metrics->>view_count",
+    "like_count:raw_metrics->>like_count",
+    "comment_count:raw_metrics->>comment_count",
+    "share_count:raw_metrics->>share_count",
+    "score:raw_metrics->>score",
+    "comments:raw_metrics->>comments",
+    "upvote_ratio:raw_metrics->>upvote_ratio",
+    "engagement_score:normalized_metrics->>engagement_score",
+    "description:metadata->>description",
+    "duration:metadata->>duration",
+    "cross_platform_presence:metadata->>cross_platform_presence"
+])
+NUMERIC_COLUMNS = ['view_count', 'like_count', 'comment_count', 'share_count',
+                   'score', 'comments', 'upvote_ratio', 'engagement_score']
+
+
+def _platform_lookup(platforms: pd.Series, table: Dict[str, float], default_key: str = 'youtube') -> np.ndarray:
+    return platforms.map(table).fillna(table[default_key]).to_numpy(dtype=float)
+
+
+def _adjustment(platforms: pd.Series, key: str) -> np.ndarray:
+    return _platform_lookup(platforms, {p: f[key] for p, f in PLATFORM_ADJUSTMENTS.items()})
+
+
+def sigmoid_normalization(z_scores: np.ndarray) -> np.ndarray:
+    return 100.0 / (1.0 + np.exp(-z_scores))
+
+
+def prepare_raw_frame(rows) -> pd.DataFrame:
+    """Turn a page of flat raw_ingestion_data rows (or an archive frame) into typed columns"""
+    frame = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame.from_records(rows)
+    for column in NUMERIC_COLUMNS:
+        if column not in frame:
+            frame[column] = np.nan
+        frame[column] = pd.to_numeric(frame[column], errors='coerce')
+    for column in ['title', 'description', 'duration', 'category', 'platform_source']:
+        if column not in frame:
+            frame[column] = ''
+        frame[column] = frame[column].fillna('')
+    if 'cross_platform_presence' not in frame:
+        frame['cross_platform_presence'] = None
+    frame['published_at'] = pd.to_datetime(frame['published_at'], utc=True, errors='coerce', format='ISO8601')
+    return frame
+
+
+def keyword_sentiment(texts: pd.Series) -> np.ndarray:
+    """Vectorized keyword sentiment (the JS fallback); compound in [-1, 1]"""
+    lowered = texts.str.lower()
+    positive = sum(lowered.str.contains(word, regex=False).astype(int) for word in POSITIVE_WORDS)
+    negative = sum(lowered.str.contains(word, regex=False).astype(int) for word in NEGATIVE_WORDS)
+    total = (positive + negative).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        compound = np.where(total > 0, (positive - negative).to_numpy(dtype=float) / total, 0.0)
+    return compound
+
+
+class WaveScoreEngine:
+    """Computes and stores WaveScores for recent raw_ingestion_data rows"""
+
+    def __init__(self, supabase, chunk_size: int = 1000, write_batch_size: int = 500):
+        self.supabase = supabase
+        self.chunk_size = chunk_size
+        self.write_batch_size = write_batch_size
+        self.analyzer = SentimentIntensityAnalyzer() if SentimentIntensityAnalyzer else None
+        self.sentiment_cache: Dict[str, float] = {}
+        # Static per-video text from video_metadata; it never changes, so it is cached for good
+        self.description_cache: Dict[tuple, str] = {}
+        # Summary batches the database rejected this run; refresh_wavescore_summaries() catches them up
+        self.summary_failures = 0
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def iter_raw_chunks(self, since: datetime, after: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """Page through raw rows newest first, one typed DataFrame per page
+
+        With a watermark (`after`) only rows ingested after it are read.
+        """
+        offset = 0
+        while True:
+            query = self.supabase.table("raw_ingestion_data").select(RAW_SELECT)
+            query = query.gt("timestamp", after) if after else query.gte("timestamp", since.isoformat())
+            response = query\
+                .order("timestamp", desc=True)\
+                .range(offset, offset + self.chunk_size - 1)\
+                .execute()
+            rows = response.data or []
+            if not rows:
+                return
+            yield self.attach_descriptions(prepare_raw_frame(rows))
+            if len(rows) < self.chunk_size:
+                return
+            offset += self.chunk_size
+
+    def iter_archive_chunks(self, archive, since: datetime) -> Iterator[pd.DataFrame]:
+        """Same pages as iter_raw_chunks, memory-mapped from the history archive
+
+        Archived rows already carry their video_metadata descriptions.
+        """
+        from history_archive import archive_columns
+        columns = archive_columns(RAW_SELECT)
+        for frame in archive.frames("raw_ingestion_data", start=since, columns=list(columns),
+                                    chunk_size=self.chunk_size, newest_first=True):
+            yield prepare_raw_frame(frame.rename(columns=columns))
+
+    def attach_descriptions(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Fill descriptions for compact snapshots, which keep them in video_metadata"""
+        missing = frame['description'] == ''
+        if not missing.any():
+            return frame
+        keys = list(zip(frame['platform_source'], frame['content_id']))
+        wanted = {key for key, is_missing in zip(keys, missing) if is_missing and key not in self.description_cache}
+        for platform in {platform for platform, _ in wanted}:
+            ids = sorted(content_id for p, content_id in wanted if p == platform)
+            for start in range(0, len(ids), 200):
+                response = self.supabase.table("video_metadata")\
+                    .select("content_id,description")\
+                    .eq("source", platform)\
+                    .in_("content_id", ids[start:start + 200])\
+                    .execute()
+                for row in response.data or []:
+                    self.description_cache[(platform, row["content_id"])] = row.get("description") or ''
+            # Old-style rows with no metadata entry are not looked up again
+            for content_id in ids:
+                self.description_cache.setdefault((platform, content_id), '')
+        frame.loc[missing, 'description'] = [self.description_cache.get(key, '')
+                                             for key, is_missing in zip(keys, missing) if is_missing]
+        return frame
+
+    def load_engagement_context(self, since: datetime) -> pd.DataFrame:
+        """Per (platform, category) engagement mean/std from normalized_trend_bins"""
+        frames = []
+        offset = 0
+        while True:
+            response = self.supabase.table("normalized_trend_bins")\
+                .select("platform_source,category,avg_engagement,data_point_count")\
+                .gte("bin_timestamp", since.isoformat())\
+                .range(offset, offset + self.chunk_size - 1)\
+                .execute()
+            rows = response.data or []
+            if rows:
+                frames.append(pd.DataFrame.from_records(rows))
+            if len(rows) < self.chunk_size:
+                break
+            offset += self.chunk_size
+
+        if not frames:
+            return pd.DataFrame(columns=['platform_source', 'category', 'engagement_mean', 'engagement_std'])
+        return engagement_context_from_bins(pd.concat(frames, ignore_index=True))
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def sentiment_compound(self, frame: pd.DataFrame) -> np.ndarray:
+        texts = (frame['title'] + ' ' + frame['description']).str.slice(0, 500)
+        if self.analyzer is None:
+            return keyword_sentiment(texts)
+
+        compound = np.empty(len(texts))
+        for i, text in enumerate(texts):
+            cached = self.sentiment_cache.get(text)
+            if cached is None:
+                cached = self.analyzer.polarity_scores(text)['compound']
+                self.sentiment_cache[text] = cached
+            compound[i] = cached
+        return compound
+
+    def score_frame(self, frame: pd.DataFrame, context: Optional[pd.DataFrame], now: datetime) -> pd.DataFrame:
+        return compute_wavescores(frame, self.sentiment_compound(frame), context, now)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def write_wavescores(self, scores: pd.DataFrame, calculated_at: str) -> int:
+        """Bulk upsert scored rows into the wavescores table"""
+        records = wavescore_records(scores, calculated_at)
+        for start in range(0, len(records), self.write_batch_size):
+            batch = records[start:start + self.write_batch_size]
+            self.supabase.table("wavescores").upsert(batch, on_conflict="trend_id,calculated_at").execute()
+        return len(records)
+
+    def apply_summaries(self, entries: List[Dict]) -> int:
+        """Fold freshly written scores into latest_wavescores and trending_summary"""
+        applied = 0
+        for start in range(0, len(entries), self.write_batch_size):
+            batch = entries[start:start + self.write_batch_size]
+            try:
+                response = self.supabase.rpc("apply_wavescore_summaries", {"entries": batch}).execute()
+            except Exception as e:
+                if not self.summary_failures:
+                    logger.warning(f"⚠️ Could not update WaveScore summaries: {e}")
+                self.summary_failures += len(batch)
+                continue
+            applied += int(response.data or 0)
+        return applied
+
+    def run(self, lookback_hours: int = 24, after: Optional[str] = None, archive=None) -> Dict:
+        """Score the latest snapshot of every content item seen in the lookback window
+
+        Pass the previous run's watermark as `after` to score only newly ingested rows,
+        or a history_archive.HistoryReader as `archive` to re-score from local files.
+        """
+        started = time.time()
+        now = datetime.now(timezone.utc)
+        since = now - timedelta(hours=lookback_hours)
+        calculated_at = now.isoformat()
+
+        context = self.load_engagement_context(since)
+        logger.info(f"📊 Loaded engagement context for {len(context)} platform/category groups")
+
+        rows_read = 0
+        chunks = 0
+        written = 0
+        summaries = 0
+        self.summary_failures = 0
+        seen_content = set()
+        watermark = after
+
+        pages = self.iter_archive_chunks(archive, since) if archive is not None else self.iter_raw_chunks(since, after)
+        for frame in pages:
+            if chunks == 0:
+                # Pages are newest first, so the first row is the new high-water mark
+                watermark = frame['timestamp'].iloc[0]
+                if not isinstance(watermark, str):
+                    watermark = watermark.isoformat()
+            chunks += 1
+            rows_read += len(frame)
+            # Pages arrive newest first, so the first row per content_id is its latest snapshot
+            frame = frame.drop_duplicates('content_id', keep='first')
+            frame = frame[~frame['content_id'].isin(seen_content)]
+            if frame.empty:
+                continue
+            seen_content.update(frame['content_id'])
+
+            scores = self.score_frame(frame, context, now)
+            written += self.write_wavescores(scores, calculated_at)
+            summaries += self.apply_summaries(summary_records(scores, frame, calculated_at))
+            logger.info(f"🌊 Chunk {chunks}: scored {len(scores)} items ({rows_read} rows read)")
+
+        duration = time.time() - started
+        return {
+            "wavescores_calculated": written,
+            "summaries_updated": summaries,
+            "summary_failures": self.summary_failures,
+            "rows_read": rows_read,
+            "chunks": chunks,
+            "context_groups": len(context),
+            "calculated_at": calculated_at,
+            "watermark": watermark,
+            "duration_seconds": round(duration, 3),
+            "status": "success"
+        }
+
+
+def engagement_context_from_bins(bins: pd.DataFrame) -> pd.DataFrame:
+    """Weighted mean and spread of bin engagement for each platform/category"""
+    bins = bins.copy()
+    bins['avg_engagement'] = pd.to_numeric(bins['avg_engagement'], errors='coerce').fillna(0.0)
+    bins['weight'] = pd.to_numeric(bins['data_point_count'], errors='coerce').fillna(1.0).clip(lower=1.0)
+    bins['weighted'] = bins['avg_engagement'] * bins['weight']
+    bins['weighted_sq'] = bins['avg_engagement'] ** 2 * bins['weight']
+
+    grouped = bins.groupby(['platform_source', 'category'], as_index=False)[['weighted', 'weighted_sq', 'weight']].sum()
+    mean = grouped['weighted'] / grouped['weight']
+    variance = (grouped['weighted_sq'] / grouped['weight'] - mean ** 2).clip(lower=0.0)
+    std = np.sqrt(variance)
+    grouped['engagement_mean'] = mean
+    grouped['engagement_std'] = std.where(std > 0, 1.0)  # Avoid division by zero
+    return grouped[['platform_source', 'category', 'engagement_mean', 'engagement_std']]
+
+
+def compute_wavescores(frame: pd.DataFrame, compound: np.ndarray,
+                       context: Optional[pd.DataFrame], now: datetime) -> pd.DataFrame:
+    """Compute every WaveScore component for a chunk of raw rows at once"""
+    platforms = frame['platform_source'].str.lower()
+    views = frame['view_count'].fillna(0).to_numpy(dtype=float)
+    likes = frame['like_count'].fillna(0).to_numpy(dtype=float)
+    comment_count = frame['comment_count'].fillna(0).to_numpy(dtype=float)
+    shares = frame['share_count'].fillna(0).to_numpy(dtype=float)
+    reddit_score = frame['score'].fillna(0).to_numpy(dtype=float)
+    reddit_comments = frame['comments'].fillna(0).to_numpy(dtype=float)
+    upvote_ratio = frame['upvote_ratio'].fillna(0.5).to_numpy(dtype=float)
+    is_youtube = (platforms == 'youtube').to_numpy()
+    is_reddit = (platforms == 'reddit').to_numpy()
+    is_tiktok = (platforms == 'tiktok').to_numpy()
+
+    # --- Normalized engagement -------------------------------------------
+    safe_views = np.where(views > 0, views, 1.0)
+    youtube_engagement = np.where(views > 0, (likes / safe_views * 100 + comment_count / safe_views * 500) * 100, 0.0)
+    reddit_engagement = (reddit_score + reddit_comments * 2) * upvote_ratio * 0.1
+    tiktok_engagement = np.where(views > 0, (likes / safe_views * 80 + shares / safe_views * 200) * 100, 0.0)
+    engagement_raw = np.select([is_youtube, is_reddit, is_tiktok],
+                               [youtube_engagement, reddit_engagement, tiktok_engagement], default=0.0)
+    normalized_engagement = np.minimum(100.0, engagement_raw)
+
+    has_context = np.zeros(len(frame), dtype=bool)
+    if context is not None and not context.empty:
+        joined = frame[['platform_source', 'category']].merge(context, how='left', on=['platform_source', 'category'])
+        has_context = joined['engagement_mean'].notna().to_numpy()
+        # Bins average the normalization engine's weighted engagement, so compare like with like
+        weighted_engagement = frame['engagement_score'].fillna(0).to_numpy(dtype=float) * \
+            _platform_lookup(platforms, NORMALIZATION_ENGAGEMENT_WEIGHTS)
+        z_scores = (weighted_engagement - joined['engagement_mean'].fillna(0).to_numpy(dtype=float)) / \
+            joined['engagement_std'].fillna(1).to_numpy(dtype=float)
+        normalized_engagement = np.where(has_context, sigmoid_normalization(z_scores), normalized_engagement)
+
+    # --- Growth rate ---------------------------------------------------------
+    published = frame['published_at']
+    hours_old = ((pd.Timestamp(now) - published).dt.total_seconds() / 3600).to_numpy(dtype=float)
+    hours_old = np.nan_to_num(hours_old, nan=0.0)
+    reach = np.where(views > 0, views, reddit_score)
+    safe_hours = np.where(hours_old > 0, hours_old, 1.0)
+    growth_per_hour = reach / safe_hours
+    viral_threshold = _adjustment(platforms, 'viral_threshold')
+    growth = np.log10(growth_per_hour + 1) / 6 * 100
+    growth = np.where(growth_per_hour > viral_threshold / 24, growth * 1.5, growth)
+    growth_rate = np.where(hours_old > 0, np.minimum(100.0, growth), 50.0)
+
+    # --- Sentiment momentum --------------------------------------------------
+    base_sentiment = (compound + 1) / 2 * 100
+    engagement_score = frame['engagement_score'].fillna(0).to_numpy(dtype=float)
+    engagement_multiplier = np.minimum(2.0, 1 + engagement_score / 100)
+    momentum = np.select([compound > 0.1, compound < -0.1],
+                         [base_sentiment * engagement_multiplier, base_sentiment * 0.7], default=base_sentiment)
+    sentiment_momentum = np.clip(momentum, 0, 100)
+
+    # --- Audience diversity --------------------------------------------------
+    diversity = 50 * frame['category'].map(CATEGORY_DIVERSITY_FACTORS).fillna(1.0).to_numpy(dtype=float)
+    diversity *= platforms.map(PLATFORM_DIVERSITY_FACTORS).fillna(1.0).to_numpy(dtype=float)
+    duration_parts = frame['duration'].str.extract(r'PT(\d+)M?(\d+)?S')
+    minutes = pd.to_numeric(duration_parts[0], errors='coerce')
+    total_minutes = (minutes.fillna(0) + pd.to_numeric(duration_parts[1], errors='coerce').fillna(0) / 60).to_numpy()
+    has_duration = (is_youtube & minutes.notna().to_numpy())
+    diversity = np.where(has_duration & (total_minutes >= 3) & (total_minutes <= 10), diversity * 1.1, diversity)
+    diversity = np.where(has_duration & (total_minutes > 20), diversity * 0.9, diversity)
+    cross_platform = frame['cross_platform_presence'].map(lambda v: v not in (None, '', 'false', 'null', False))
+    diversity = np.where(cross_platform.to_numpy(dtype=bool), diversity * 1.15, diversity)
+    audience_diversity = np.clip(diversity, 20, 100)
+
+    # --- Viral boost and final score -----------------------------------------
+    with np.errstate(divide='ignore'):
+        viral_boost = np.where(reach >= viral_threshold, np.minimum(20.0, np.log10(reach / viral_threshold) * 10), 0.0)
+
+    base_score = (
+        COEFFICIENTS['alpha'] * normalized_engagement * _adjustment(platforms, 'engagement_boost') +
+        COEFFICIENTS['beta'] * growth_rate +
+        COEFFICIENTS['gamma'] * sentiment_momentum * _adjustment(platforms, 'sentiment_weight') +
+        COEFFICIENTS['delta'] * audience_diversity * _adjustment(platforms, 'diversity_factor')
+    )
+    wave_score = np.clip(base_score + viral_boost, 0, 100)
+
+    # --- Confidence ------------------------------------------------------------
+    confidence = np.full(len(frame), 0.8)
+    has_engagement = (likes > 0) | (reddit_comments > 0)
+    confidence = np.where(has_engagement, confidence, confidence * 0.7)
+    confidence = np.where(hours_old < 1, confidence * 0.6, confidence)
+    confidence = np.where(has_context, confidence * 1.1, confidence)
+    confidence *= platforms.map(PLATFORM_CONFIDENCE_FACTORS).fillna(1.0).to_numpy(dtype=float)
+    confidence = np.clip(confidence, 0.3, 1.0)
+
+    return pd.DataFrame({
+        'content_id': frame['content_id'].to_numpy(),
+        'platform_source': platforms.to_numpy(),
+        'wave_score': np.round(wave_score, 2),
+        'confidence': np.round(confidence, 2),
+        'normalized_engagement': np.round(normalized_engagement, 2),
+        'growth_rate': np.round(growth_rate, 2),
+        'sentiment_momentum': np.round(sentiment_momentum, 2),
+        'audience_diversity': np.round(audience_diversity, 2),
+        'viral_boost': np.round(viral_boost, 2),
+    })
+
+
+def wavescore_records(scores: pd.DataFrame, calculated_at: str):
+    """Shape scored rows into wavescores table records"""
+    records = []
+    for row in scores.itertuples(index=False):
+        platform = row.platform_source if row.platform_source in PLATFORM_ADJUSTMENTS else 'youtube'
+        records.append({
+            'content_id': row.content_id,
+            'trend_id': f"{row.platform_source}_{row.content_id}",
+            'wave_score': float(row.wave_score),
+            'confidence': float(row.confidence),
+            'normalized_engagement': float(row.normalized_engagement),
+            'growth_rate': float(row.growth_rate),
+            'sentiment_momentum': float(row.sentiment_momentum),
+            'audience_diversity': float(row.audience_diversity),
+            'viral_boost': float(row.viral_boost),
+            'platform_factor': PLATFORM_ADJUSTMENTS[platform],
+            'metadata': {'engine': 'python_batch', 'platform': row.platform_source},
+            'calculated_at': calculated_at
+        })
+    return records
+
+
+def summary_records(scores: pd.DataFrame, frame: pd.DataFrame, calculated_at: str) -> List[Dict]:
+    """latest_wavescores rows for scored items; scores line up with the frame they came from"""
+    published = frame['published_at'].map(lambda value: value.isoformat() if pd.notna(value) else None)
+    # Database pages carry ISO strings; archive frames carry Timestamps
+    snapshots = frame['timestamp'].map(
+        lambda value: value if isinstance(value, str) else value.isoformat() if pd.notna(value) else None)
+    views = frame['view_count'].fillna(0).to_numpy(dtype=float)
+    records = []
+    for i, row in enumerate(scores.itertuples(index=False)):
+        records.append({
+            'trend_id': f"{row.platform_source}_{row.content_id}",
+            'content_id': row.content_id,
+            'wave_score': float(row.wave_score),
+            'confidence': float(row.confidence),
+            'normalized_engagement': float(row.normalized_engagement),
+            'growth_rate': float(row.growth_rate),
+            'sentiment_momentum': float(row.sentiment_momentum),
+            'audience_diversity': float(row.audience_diversity),
+            'calculated_at': calculated_at,
+            'title': frame['title'].iat[i],
+            'category': frame['category'].iat[i],
+            'platform_source': row.platform_source,
+            'published_at': published.iat[i],
+            'snapshot_at': snapshots.iat[i],
+            'view_count': int(views[i])
+        })
+    return records
+
+
+if __name__ == "__main__":
+    import os
+    from dotenv import load_dotenv
+    from datastore import create_client
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    load_dotenv()
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY"))
+    print(json.dumps(WaveScoreEngine(client).run(), indent=2))
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Write-behind Buffer for Supabase
+Request handlers enqueue rows and return; a background flusher batches them per
+table, writes on size or age, retries each table with its own backoff and
+drains on shutdown.
+"""
+
+import time
+import queue
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+WRITE_BEHIND_CONFIG = {
+    'max_batch': 200,            # Rows per insert/upsert call
+    'flush_interval': 1.0,       # Seconds a row may wait before its batch is written
+    'max_queue': 10000,          # Enqueue waits (backpressure) beyond this
+    'enqueue_timeout': 1.0,      # Seconds to wait on a full queue before handing the row to on_failure
+    'retries': 5,
+    'retry_backoff': 0.5,        # Seconds, doubled per retry
+    'retry_backoff_max': 30.0,
+}
+
+
+class WriteBehindBuffer:
+    """Queue of pending Supabase writes flushed by one daemon thread
+
+    A failing table backs off on its own schedule; the flusher keeps writing
+    every other table in the meantime. on_failure receives rows that ran out
+    of retries and on_success each fully written flush.
+    """
+
+    def __init__(self, client_getter: Callable, config: Optional[Dict] = None,
+                 on_failure: Optional[Callable[[str, str, Optional[str], List[Dict], Exception], None]] = None,
+                 on_success: Optional[Callable[[str, str, Optional[str], List[Dict]], None]] = None):
+        self.client_getter = client_getter
+        self.config = {**WRITE_BEHIND_CONFIG, **(config or {})}
+        self.on_failure = on_failure
+        self.on_success = on_success
+        self.queue = queue.Queue(maxsize=self.config['max_queue'])
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.thread = None
+        # Per-table retry state, only touched by the flusher thread
+        self.backoff: Dict[str, Dict] = {}
+        self.stats_data = {
+            'enqueued': 0, 'written': 0, 'failed': 0, 'batches': 0, 'retries': 0, 'overflowed': 0,
+            'last_flush_at': None, 'last_error': None
+        }
+
+    def enqueue(self, table: str, row: Dict, op: str = 'insert', on_conflict: Optional[str] = None):
+        """Queue one row; returns as soon as it is buffered"""
+        if self.closed.is_set():
+            raise RuntimeError("write-behind buffer is closed")
+        self._ensure_started()
+        # Bulk writes send one column list, so rows batch only with rows of the same shape
+        item = ((table, op, on_conflict, tuple(sorted(row))), row)
+        if self.on_failure is None:
+            self.queue.put(item)
+        else:
+            try:
+                self.queue.put(item, timeout=self.config['enqueue_timeout'])
+            except queue.Full:
+                # The flusher is not keeping up; hand the row over rather than stall the request
+                with self.lock:
+                    self.stats_data['overflowed'] += 1
+                self._give_up(table, op, on_conflict, [row], RuntimeError("write-behind queue full"))
+                return
+        with self.lock:
+            self.stats_data['enqueued'] += 1
+
+    def _ensure_started(self):
+        if self.thread and self.thread.is_alive():
+            return
+        with self.lock:
+            if not (self.thread and self.thread.is_alive()):
+                self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self.thread.start()
+
+    def _due_at(self, key: Tuple, oldest: float) -> float:
+        state = self.backoff.get(key[0])
+        due = oldest + self.config['flush_interval']
+        return max(due, state['retry_at']) if state else due
+
+    def _run(self):
+        pending: Dict[Tuple, List[Dict]] = {}
+        oldest: Dict[Tuple, float] = {}
+        while True:
+            now = time.time()
+            if oldest:
+                deadline = min(self._due_at(key, first) for key, first in oldest.items())
+            else:
+                deadline = now + self.config['flush_interval']
+            try:
+                key, row = self.queue.get(timeout=max(0.0, deadline - now))
+                if key is None:
+                    break  # Close sentinel; everything queued before it is already pending
+                pending.setdefault(key, []).append(row)
+                oldest.setdefault(key, time.time())
+            except queue.Empty:
+                pass
+
+            now = time.time()
+            for key in list(pending):
+                state = self.backoff.get(key[0])
+                if state and now < state['retry_at']:
+                    continue
+                if len(pending[key]) >= self.config['max_batch'] or now - oldest[key] >= self.config['flush_interval']:
+                    remaining = self._flush(key, pending.pop(key))
+                    if remaining:
+                        pending[key] = remaining  # Retried once this table's backoff expires
+                    else:
+                        oldest.pop(key)
+
+        # Shutdown should not hang on a dead database; on_failure gets whatever fails now
+        for key, rows in pending.items():
+            self._flush(key, rows, final=True)
+
+    def _flush(self, key: Tuple, rows: List[Dict], final: bool = False) -> List[Dict]:
+        """Write rows in batches; returns the rows to retry later, if any"""
+        table, op, on_conflict, _ = key
+        if op == 'upsert' and on_conflict:
+            rows = dedupe_on_conflict(rows, on_conflict)
+        for start in range(0, len(rows), self.config['max_batch']):
+            try:
+                self._write(table, op, on_conflict, rows[start:start + self.config['max_batch']])
+            except Exception as e:
+                if not final and self._schedule_retry(table, e):
+                    return rows[start:]
+                self._give_up(table, op, on_conflict, rows[start:], e)
+                return []
+        self.backoff.pop(table, None)
+        if self.on_success:
+            try:
+                self.on_success(table, op, on_conflict, rows)
+            except Exception as e:
+                print(f"❌ Write-behind success handler raised for {len(rows)} {table} rows: {e}")
+        return []
+
+    def _schedule_retry(self, table: str, error: Exception) -> bool:
+        state = self.backoff.setdefault(table, {'attempt': 0, 'delay': self.config['retry_backoff']})
+        if state['attempt'] >= self.config['retries']:
+            self.backoff.pop(table, None)
+            return False
+        state['attempt'] += 1
+        state['retry_at'] = time.time() + state['delay']
+        state['delay'] = min(state['delay'] * 2, self.config['retry_backoff_max'])
+        with self.lock:
+            self.stats_data['retries'] += 1
+            self.stats_data['last_error'] = str(error)[:200]
+        return True
+
+    def _write(self, table: str, op: str, on_conflict: Optional[str], rows: List[Dict]):
+        client = self.client_getter()
+        if client is None:
+            raise RuntimeError("Supabase client unavailable")
+        builder = client.table(table)
+        if op == 'upsert':
+            builder = builder.upsert(rows, on_conflict=on_conflict) if on_conflict else builder.upsert(rows)
+        else:
+            builder = builder.insert(rows)
+        builder.execute()
+        with self.lock:
+            self.stats_data['written'] += len(rows)
+            self.stats_data['batches'] += 1
+            self.stats_data['last_flush_at'] = datetime.now().isoformat()
+
+    def _give_up(self, table: str, op: str, on_conflict: Optional[str], rows: List[Dict], error: Exception):
+        print(f"❌ Write-behind gave up on {len(rows)} {table} rows: {error}")
+        with self.lock:
+            self.stats_data['failed'] += len(rows)
+            self.stats_data['last_error'] = str(error)[:200]
+        if self.on_failure:
+            try:
+                self.on_failure(table, op, on_conflict, rows, error)
+            except Exception as e:
+                # Keep the flusher alive; the other tables' batches still need writing
+                print(f"❌ Write-behind failure handler raised for {len(rows)} {table} rows: {e}")
+
+    def close(self, timeout: float = 30.0):
+        """Drain pending rows and stop the flusher; used at shutdown"""
+        self.closed.set()
+        if self.thread and self.thread.is_alive():
+            self.queue.put((None, None))
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                print(f"⚠️ Write-behind still draining {self.queue.qsize()} rows after {timeout}s")
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {**self.stats_data, 'queued': self.queue.qsize(),
+                    'backing_off': sorted(self.backoff)}
+
+
+def dedupe_on_conflict(rows: List[Dict], on_conflict: str) -> List[Dict]:
+    """Keep the last row per conflict key; one upsert statement cannot touch a row twice"""
+    columns = [column.strip() for column in on_conflict.split(',')]
+    latest = {}
+    for row in rows:
+        latest[tuple(row.get(column) for column in columns)] = row
+    return list(latest.values())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Durable Write Spool for WaveScope
+When a Supabase write fails, the rows are appended to local segment files (one
+CRC-checked JSON record per line) instead of being dropped. A replayer bulk-writes
+sealed segments back once the database answers again.
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import atexit
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: replays are only serialized within one process
+    fcntl = None
+
+from pipeline_state import STATE_DIR
+from write_behind import dedupe_on_conflict
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = os.getenv("WAVESCOPE_SPOOL_DIR", os.path.join(STATE_DIR, "spool"))
+
+SPOOL_CONFIG = {
+    'segment_max_bytes': 8 * 1024 * 1024,
+    'segment_max_age': 60,          # Seconds before the active segment is sealed for replay
+    'replay_batch': 500,            # Rows per bulk write during replay
+    'circuit_cooldown': 30,         # Seconds to spool straight away after a failed write
+    'fsync': True,
+}
+
+
+def encode_record(record: Dict) -> str:
+    body = json.dumps(record, default=str, separators=(',', ':'))
+    return f"{zlib.crc32(body.encode()) & 0xffffffff:08x}\t{body}\n"
+
+
+def decode_line(line: str) -> Optional[Dict]:
+    """Record on a spool line, or None if the line is torn or fails its checksum"""
+    checksum, sep, body = line.rstrip("\n").partition("\t")
+    if not sep or f"{zlib.crc32(body.encode()) & 0xffffffff:08x}" != checksum:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WriteSpool:
+    """Append-only segmented spool shared by every writer in this process"""
+
+    def __init__(self, directory: Optional[str] = None, config: Optional[Dict] = None):
+        self.directory = directory or SPOOL_DIR
+        self.config = {**SPOOL_CONFIG, **(config or {})}
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.active_path = None
+        self.active_file = None
+        self.active_opened_at = None
+        self.circuit_open_until = 0.0
+        self.replay_thread = None
+        self.next_pending_check = 0.0
+        self.stats_data = {'spooled_rows': 0, 'replayed_rows': 0, 'corrupt_records': 0, 'last_replay': None}
+        os.makedirs(self.directory, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, table: str, rows: List[Dict], op: str = 'insert', on_conflict: Optional[str] = None):
+        """Durably record rows that could not be written"""
+        if not rows:
+            return
+        record = {'table': table, 'op': op, 'on_conflict': on_conflict, 'rows': rows,
+                  'spooled_at': datetime.now(timezone.utc).isoformat()}
+        line = encode_record(record)
+        with self.lock:
+            if self.active_file and (time.time() - self.active_opened_at >= self.config['segment_max_age']
+                                     or self.active_file.tell() >= self.config['segment_max_bytes']):
+                self._seal()
+            if not self.active_file:
+                self.active_path = os.path.join(self.directory, f"{time.time_ns():020d}-{self.pid}.open")
+                self.active_file = open(self.active_path, 'a')
+                self.active_opened_at = time.time()
+            self.active_file.write(line)
+            self.active_file.flush()
+            if self.config['fsync']:
+                os.fsync(self.active_file.fileno())
+            self.stats_data['spooled_rows'] += len(rows)
+
+    def _seal(self):
+        """Close the active segment and make it visible to the replayer"""
+        if not self.active_file:
+            return
+        self.active_file.close()
+        os.replace(self.active_path, self.active_path[:-len(".open")] + ".seg")
+        self.active_file = None
+        self.active_path = None
+
+    def seal(self):
+        with self.lock:
+            self._seal()
+
+    def write(self, client, table: str, rows, op: str = 'insert', on_conflict: Optional[str] = None):
+        """Write to Supabase, spooling the rows instead if the write fails
+
+        Returns the response, or None when the rows went to the spool. After a
+        failure the database is skipped for a cooldown so callers keep their pace.
+        """
+        rows = rows if isinstance(rows, list) else [rows]
+        if time.time() < self.circuit_open_until:
+            self.append(table, rows, op, on_conflict)
+            return None
+        try:
+            response = execute_write(client, table, rows, op, on_conflict)
+        except Exception as e:
+            logger.warning(f"⚠️ {table} write failed ({e}); spooling {len(rows)} rows locally")
+            self.circuit_open_until = time.time() + self.config['circuit_cooldown']
+            self.append(table, rows, op, on_conflict)
+            return None
+        # A successful write means the database is back; drain anything spooled earlier
+        self.replay_if_pending(client)
+        return response
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+
+    def sealed_segments(self) -> List[str]:
+        """Sealed segments oldest first, adopting segments left open by dead processes"""
+        segments = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".open"):
+                pid = int(name[:-len(".open")].rsplit("-", 1)[1])
+                if pid != self.pid and not _pid_alive(pid):
+                    sealed = path[:-len(".open")] + ".seg"
+                    os.replace(path, sealed)
+                    segments.append(sealed)
+            elif name.endswith(".seg"):
+                segments.append(path)
+        return sorted(segments)
+
+    def has_pending(self) -> bool:
+        with self.lock:
+            if self.active_file and time.time() - self.active_opened_at >= self.config['segment_max_age']:
+                self._seal()
+        return bool(self.sealed_segments())
+
+    def replay_if_pending(self, client):
+        """Start a background replay if segments are waiting; checked at most every 5s"""
+        if time.time() < self.next_pending_check:
+            return
+        self.next_pending_check = time.time() + 5
+        if self.has_pending():
+            self.replay_in_background(client)
+
+    def replay_in_background(self, client):
+        with self.lock:
+            if self.replay_thread and self.replay_thread.is_alive():
+                return
+            self.replay_thread = threading.Thread(target=self.replay, args=(client,), name="spool-replay", daemon=True)
+            self.replay_thread.start()
+
+    def replay(self, client, seal_active: bool = False) -> Dict:
+        """Bulk-write sealed segments in order; stops at the first failed batch"""
+        if seal_active:
+            self.seal()
+        result = {'segments_replayed': 0, 'rows_replayed': 0, 'corrupt_records': 0, 'status': 'success'}
+        lock_file = open(os.path.join(self.directory, "replay.lock"), 'w')
+        try:
+            if fcntl:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    result['status'] = 'busy'  # Another process is replaying
+                    return result
+            for segment in self.sealed_segments():
+                if not self._replay_segment(client, segment, result):
+                    result['status'] = 'failed'
+                    self.circuit_open_until = time.time() + self.config['circuit_cooldown']
+                    break
+                result['segments_replayed'] += 1
+        finally:
+            lock_file.close()
+        with self.lock:
+            self.stats_data['replayed_rows'] += result['rows_replayed']
+            self.stats_data['corrupt_records'] += result['corrupt_records']
+            self.stats_data['last_replay'] = {**result, 'at': datetime.now(timezone.utc).isoformat()}
+        if result['rows_replayed']:
+            logger.info(f"♻️ Replayed {result['rows_replayed']} spooled rows from {result['segments_replayed']} segments")
+        return result
+
+    def _replay_segment(self, client, segment: str, result: Dict) -> bool:
+        ack_path = segment + ".ack"
+        done = int(open(ack_path).read() or 0) if os.path.exists(ack_path) else 0
+        with open(segment) as f:
+            lines = f.readlines()
+        records = [decode_line(line) for line in lines]
+        corrupt = [line for line, record in zip(lines[done:], records[done:]) if record is None]
+        if corrupt:
+            # Kept aside for inspection rather than replayed or silently lost
+            logger.warning(f"⚠️ Quarantining {len(corrupt)} corrupt records from {os.path.basename(segment)}")
+            with open(os.path.join(self.directory, "corrupt.log"), 'a') as f:
+                f.writelines(corrupt)
+            result['corrupt_records'] += len(corrupt)
+
+        index = done
+        while index < len(records):
+            # Consecutive records for the same target and column set go out as one write
+            batch_start, rows, key = index, [], None
+            while index < len(records) and len(rows) < self.config['replay_batch']:
+                record = records[index]
+                if record is None:
+                    index += 1
+                    continue
+                record_key = (record['table'], record['op'], record['on_conflict'], tuple(sorted(record['rows'][0])))
+                if key is not None and record_key != key:
+                    break
+                key = record_key
+                rows.extend(record['rows'])
+                index += 1
+            if rows:
+                try:
+                    execute_write(client, key[0], rows, key[1], key[2])
+                except Exception as e:
+                    logger.warning(f"⚠️ Spool replay stopped at {os.path.basename(segment)} record {batch_start}: {e}")
+                    return False
+                result['rows_replayed'] += len(rows)
+            with open(ack_path, 'w') as f:
+                f.write(str(index))
+
+        os.remove(segment)
+        if os.path.exists(ack_path):
+            os.remove(ack_path)
+        return True
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {**self.stats_data, 'pending_segments': sum(1 for name in os.listdir(self.directory)
+                                                                if name.endswith((".seg", ".open"))),
+                    'circuit_open': time.time() < self.circuit_open_until}
+
+
+def execute_write(client, table: str, rows: List[Dict], op: str, on_conflict: Optional[str]):
+    if client is None:
+        raise RuntimeError("Supabase client unavailable")
+    builder = client.table(table)
+    if op == 'upsert':
+        if on_conflict:
+            return builder.upsert(dedupe_on_conflict(rows, on_conflict), on_conflict=on_conflict).execute()
+        return builder.upsert(rows).execute()
+    return builder.insert(rows).execute()
+
+
+_spool = None
+_spool_lock = threading.Lock()
+
+
+def get_spool() -> WriteSpool:
+    """Process-wide spool; a forked child gets its own so segment names stay per-process"""
+    global _spool
+    with _spool_lock:
+        if _spool is None or _spool.pid != os.getpid():
+            _spool = WriteSpool()
+        return _spool
+
+
+def write_or_spool(client, table: str, rows, op: str = 'insert', on_conflict: Optional[str] = None):
+    return get_spool().write(client, table, rows, op, on_conflict)
+
+
+@atexit.register
+def _seal_on_exit():
+    if _spool is not None and _spool.pid == os.getpid():
+        _spool.seal()
+
+
+def main():
+    """Replay the spool by hand, e.g. after a long outage"""
+    parser = argparse.ArgumentParser(description="Replay spooled Supabase writes")
+    parser.add_argument("--stats", action="store_true", help="only show what is pending")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    spool = get_spool()
+    if args.stats:
+        print(json.dumps(spool.stats(), indent=2, default=str))
+        return 0
+
+    from dotenv import load_dotenv
+    from datastore import create_client
+    load_dotenv()
+    client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_ANON_KEY"))
+    result = spool.replay(client, seal_active=True)
+    print(f"♻️ Replay {result['status']}: {result['rows_replayed']} rows from {result['segments_replayed']} segments")
+    return 0 if result['status'] == 'success' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Production WSGI Server for WaveSight
+Runs the Flask services under gunicorn with multiple workers instead of app.run()
+"""
+
+import os
+import sys
+import argparse
+import importlib
+import logging
+import multiprocessing
+import tempfile
+
+# Add current and project directories to path for imports
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SERVER_DIR)
+sys.path.append(os.path.dirname(SERVER_DIR))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# module, attribute (callable attributes are app factories), default port,
+# and whether the service may run more than one worker process
+SERVICES = {
+    'main': {'module': 'app', 'attr': 'create_app', 'port': 8080, 'multi_process': True},
+    'sentiment': {'module': 'sentiment_server', 'attr': 'app', 'port': 5001, 'multi_process': True},
+    # BotManager supervises a single pipeline child process, so the bot server
+    # scales with threads inside one worker rather than with extra processes
+    'bot': {'module': 'bot_control_server', 'attr': 'app', 'port': 5002, 'multi_process': False},
+    'reddit-oauth': {'module': 'reddit_oauth', 'attr': 'app', 'port': 5000, 'multi_process': True},
+}
+
+
+def default_workers():
+    """gunicorn's rule of thumb for I/O-bound apps: two workers per core plus one"""
+    return multiprocessing.cpu_count() * 2 + 1
+
+
+def load_service_module(service):
+    return importlib.import_module(SERVICES[service]['module'])
+
+
+def load_wsgi_app(service):
+    spec = SERVICES[service]
+    target = getattr(load_service_module(service), spec['attr'])
+    return target() if spec['attr'] == 'create_app' else target
+
+
+def call_process_hook(service, hook_name):
+    """Run a module-level lifecycle hook such as reset_process_state, if the service defines one"""
+    hook = getattr(load_service_module(service), hook_name, None)
+    if hook:
+        hook()
+
+
+def build_options(service, args):
+    """Translate CLI/env settings into gunicorn configuration"""
+    spec = SERVICES[service]
+    workers = args.workers
+    if not spec['multi_process'] and workers > 1:
+        logger.warning(f"⚠️ {service} keeps single-owner state; running 1 worker with {args.threads} threads")
+        workers = 1
+
+    def post_fork(server, worker):
+        # Clients, locks and thread pools must not be shared with the master
+        call_process_hook(service, 'reset_process_state')
+
+    def worker_exit(server, worker):
+        call_process_hook(service, 'shutdown_process_state')
+
+    return {
+        'bind': f"{args.host}:{args.port or spec['port']}",
+        'workers': workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'keepalive': args.keepalive,
+        'timeout': args.timeout,
+        'graceful_timeout': args.graceful_timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': max(args.max_requests // 10, 1) if args.max_requests else 0,
+        'preload_app': args.preload,
+        'accesslog': '-',
+        'errorlog': '-',
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+    }
+
+
+def serve(service, options):
+    from gunicorn.app.base import BaseApplication
+
+    class WaveSightApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_wsgi_app(service)
+
+    logger.info(f"🚀 Serving {service} on {options['bind']} "
+                f"({options['workers']} workers x {options['threads']} threads)")
+    WaveSightApplication().run()
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a WaveSight service under gunicorn')
+    parser.add_argument('service', choices=sorted(SERVICES))
+    parser.add_argument('--host', default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=env_int('PORT', 0) or None)
+    parser.add_argument('--workers', type=int, default=env_int('WEB_CONCURRENCY', default_workers()))
+    parser.add_argument('--threads', type=int, default=env_int('WEB_THREADS', 4))
+    parser.add_argument('--keepalive', type=int, default=env_int('WEB_KEEPALIVE', 5),
+                        help='seconds to hold idle keep-alive connections')
+    parser.add_argument('--timeout', type=int, default=env_int('WEB_TIMEOUT', 120),
+                        help='seconds before a silent worker is killed and restarted')
+    parser.add_argument('--graceful-timeout', type=int, default=env_int('WEB_GRACEFUL_TIMEOUT', 30),
+                        help='seconds workers get to finish in-flight requests on shutdown')
+    parser.add_argument('--max-requests', type=int, default=env_int('WEB_MAX_REQUESTS', 0),
+                        help='recycle workers after this many requests (0 disables)')
+    parser.add_argument('--preload', action='store_true',
+                        help='import the app once in the master before forking workers')
+    args = parser.parse_args()
+
+    if SERVICES[args.service]['multi_process'] and args.workers > 1 and not os.getenv('COMPASS_JOB_DIR'):
+        # Let any worker answer polls for compass jobs another worker started
+        os.environ['COMPASS_JOB_DIR'] = os.path.join(tempfile.gettempdir(), 'wavesight-compass-jobs')
+
+    serve(args.service, build_options(args.service, args))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,11 +8,13 @@ import os
 import datetime
 import json
 import time
+import hashlib
 from typing import List, Dict, Optional
 from googleapiclient.discovery import build
-from supabase import create_client, Client
+from datastore import create_client
 from dotenv import load_dotenv
 import logging
+from write_spool import write_or_spool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,6 +23,9 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Only recent snapshots are compared against, so priming reads touch recent partitions only
+SNAPSHOT_LOOKBACK_DAYS = 7
+
 class YouTubeSupabaseIntegrator:
     def __init__(self):
         """Initialize the YouTube to Supabase integrator with enhanced features"""
@@ -39,7 +44,7 @@ class YouTubeSupabaseIntegrator:
         if not supabase_url or not supabase_key:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set")
             
-        self.supabase: Client = create_client(supabase_url, supabase_key)
+        self.supabase = create_client(supabase_url, supabase_key)
         
         # Category mapping for WaveScope
         self.category_mapping = {
@@ -73,6 +78,12 @@ class YouTubeSupabaseIntegrator:
             "Sports": "Sports"
         }
         
+        # Last written counters and metadata hash per video, so unchanged snapshots
+        # and unchanged static metadata are not written again
+        self.last_snapshots: Dict[str, Dict] = {}
+        self.metadata_hashes: Dict[str, str] = {}
+        self.snapshots_unchanged = 0
+        
         logger.info("🚀 Enhanced YouTube-Supabase Integrator initialized")
 
     def fetch_trending_videos(self, region="US", max_results=50, category_id=None):
@@ -177,8 +188,71 @@ class YouTubeSupabaseIntegrator:
         youtube_category = self.category_mapping.get(category_id, "General")
         return self.wavescope_categories.get(youtube_category, "General")
 
+    def prime_snapshot_cache(self, video_ids: List[str]):
+        """Load metadata hashes and latest counters for videos this process has not seen yet"""
+        missing = [vid for vid in video_ids if vid not in self.metadata_hashes]
+        if not missing:
+            return
+        try:
+            response = self.supabase.table("video_metadata")\
+                .select("content_id,metadata_hash")\
+                .eq("source", "youtube")\
+                .in_("content_id", missing)\
+                .execute()
+            for row in response.data or []:
+                self.metadata_hashes[row["content_id"]] = row["metadata_hash"]
+            
+            since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=SNAPSHOT_LOOKBACK_DAYS)
+            # Newest first; a video whose last snapshot falls outside the page just gets a fresh one
+            response = self.supabase.table("raw_ingestion_data")\
+                .select("content_id,timestamp,raw_metrics")\
+                .eq("source", "youtube")\
+                .gte("timestamp", since.isoformat())\
+                .in_("content_id", missing)\
+                .order("timestamp", desc=True)\
+                .limit(len(missing) * 4)\
+                .execute()
+            for row in response.data or []:
+                if row["content_id"] not in self.last_snapshots:
+                    self.last_snapshots[row["content_id"]] = {
+                        "counters": tuple(int((row.get("raw_metrics") or {}).get(key) or 0)
+                                          for key in ("view_count", "like_count", "comment_count")),
+                        "timestamp": row["timestamp"]
+                    }
+        except Exception as e:
+            logger.warning(f"⚠️ Could not prime snapshot cache: {e}")
+
+    def upsert_video_metadata(self, video_data: Dict, statistics: Dict, category: str):
+        """Store the static part of a video once, and again only if it changes"""
+        snippet = video_data["snippet"]
+        video_id = video_data["id"]
+        static = {
+            "title": snippet["title"],
+            "category": category,
+            "published_at": snippet["publishedAt"],
+            "channel_id": snippet["channelId"],
+            "channel_title": snippet["channelTitle"],
+            "description": snippet.get("description", "")[:500],  # Truncate
+            "thumbnails": snippet.get("thumbnails", {}),
+            "duration": statistics.get("contentDetails", {}).get("duration"),
+            "youtube_category_id": snippet.get("categoryId")
+        }
+        metadata_hash = hashlib.sha1(json.dumps(static, sort_keys=True).encode()).hexdigest()
+        if self.metadata_hashes.get(video_id) == metadata_hash:
+            return
+        
+        write_or_spool(self.supabase, "video_metadata",
+                       {"content_id": video_id, "source": "youtube", "platform_source": "youtube",
+                        "metadata_hash": metadata_hash, **static},
+                       op="upsert", on_conflict="content_id,source")
+        self.metadata_hashes[video_id] = metadata_hash
+
     def insert_to_raw_ingestion(self, video_data: Dict, statistics: Dict) -> bool:
-        """Insert video data into raw_ingestion_data table"""
+        """Append a compact metrics snapshot to raw_ingestion_data
+
+        Static metadata lives in video_metadata; a snapshot whose counters have
+        not moved since the last one is skipped.
+        """
         
         try:
             snippet = video_data["snippet"]
@@ -190,20 +264,41 @@ class YouTubeSupabaseIntegrator:
             # Normalize category
             category = self.normalize_category(snippet.get("categoryId", "1"))
             
-            # Prepare raw ingestion data
+            self.upsert_video_metadata(video_data, statistics, category)
+            
+            counters = (metrics["view_count"], metrics["like_count"], metrics["comment_count"])
+            previous = self.last_snapshots.get(video_id)
+            if previous and previous["counters"] == counters:
+                self.snapshots_unchanged += 1
+                logger.debug(f"⏭️ Unchanged since last snapshot: {snippet['title'][:50]}...")
+                return False
+            
+            now = datetime.datetime.now(datetime.timezone.utc)
+            deltas = {}
+            if previous:
+                deltas = {
+                    "view_delta": counters[0] - previous["counters"][0],
+                    "like_delta": counters[1] - previous["counters"][1],
+                    "comment_delta": counters[2] - previous["counters"][2],
+                    "seconds_since_last": round((now - datetime.datetime.fromisoformat(
+                        previous["timestamp"].replace('Z', '+00:00'))).total_seconds())
+                }
+            
+            # Prepare the snapshot; title/category stay for readers that filter or join on them
             raw_data = {
                 "source": "youtube",
                 "platform_source": "youtube", 
                 "content_id": video_id,
                 "title": snippet["title"],
                 "category": category,
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "timestamp": now.isoformat(),
                 "published_at": snippet["publishedAt"],
                 "raw_metrics": {
                     "view_count": metrics["view_count"],
                     "like_count": metrics["like_count"], 
                     "comment_count": metrics["comment_count"],
-                    "engagement_rate": metrics["engagement_rate"]
+                    "engagement_rate": metrics["engagement_rate"],
+                    **deltas
                 },
                 "normalized_metrics": {
                     "reach_estimate": metrics["view_count"],
@@ -212,22 +307,19 @@ class YouTubeSupabaseIntegrator:
                     "viral_velocity": metrics["viral_velocity"]
                 },
                 "metadata": {
-                    "channel_id": snippet["channelId"],
-                    "channel_title": snippet["channelTitle"],
-                    "description": snippet.get("description", "")[:500],  # Truncate
-                    "thumbnails": snippet.get("thumbnails", {}),
-                    "duration": statistics.get("contentDetails", {}).get("duration"),
-                    "youtube_category_id": snippet.get("categoryId")
+                    "duration": statistics.get("contentDetails", {}).get("duration")
                 }
             }
             
-            # Insert into raw_ingestion_data table
-            result = self.supabase.table("raw_ingestion_data").upsert(
-                raw_data, 
-                on_conflict="content_id,source,timestamp"
-            ).execute()
+            # Insert into raw_ingestion_data table; rows are spooled locally if Supabase is down
+            result = write_or_spool(self.supabase, "raw_ingestion_data", raw_data,
+                                    op="upsert", on_conflict="content_id,source,timestamp")
+            self.last_snapshots[video_id] = {"counters": counters, "timestamp": raw_data["timestamp"]}
             
-            if result.data:
+            if result is None:
+                logger.info(f"📦 Spooled for replay: {snippet['title'][:50]}...")
+                return True
+            elif result.data:
                 logger.info(f"✅ Inserted to raw_ingestion: {snippet['title'][:50]}...")
                 return True
             else:
@@ -282,9 +374,11 @@ class YouTubeSupabaseIntegrator:
         
         # Fetch detailed statistics
         statistics_lookup = self.fetch_video_statistics(video_ids)
+        self.prime_snapshot_cache(video_ids)
         
         processed = 0
         raw_inserted = 0
+        unchanged_before = self.snapshots_unchanged
         legacy_inserted = 0
         
         for video in videos:
@@ -308,11 +402,14 @@ class YouTubeSupabaseIntegrator:
             except Exception as e:
                 logger.error(f"❌ Error processing video {video_id}: {e}")
         
-        logger.info(f"✅ Batch processed: {processed} videos, {raw_inserted} raw insertions, {legacy_inserted} legacy insertions")
+        raw_unchanged = self.snapshots_unchanged - unchanged_before
+        logger.info(f"✅ Batch processed: {processed} videos, {raw_inserted} raw insertions "
+                    f"({raw_unchanged} unchanged skipped), {legacy_inserted} legacy insertions")
         
         return {
             "processed": processed,
             "raw_inserted": raw_inserted, 
+            "raw_unchanged": raw_unchanged,
             "legacy_inserted": legacy_inserted
         }
 
@@ -326,6 +423,7 @@ class YouTubeSupabaseIntegrator:
         all_results = {
             "total_processed": 0,
             "total_raw_inserted": 0,
+            "total_raw_unchanged": 0,
             "total_legacy_inserted": 0,
             "by_category": {}
         }
@@ -346,6 +444,7 @@ class YouTubeSupabaseIntegrator:
                     all_results["by_category"][category_name] = results
                     all_results["total_processed"] += results["processed"]
                     all_results["total_raw_inserted"] += results["raw_inserted"]
+                    all_results["total_raw_unchanged"] += results["raw_unchanged"]
                     all_results["total_legacy_inserted"] += results["legacy_inserted"]
                     
                 # Rate limiting between categories
@@ -373,6 +472,7 @@ class YouTubeSupabaseIntegrator:
                 results = {
                     "total_processed": results["processed"],
                     "total_raw_inserted": results["raw_inserted"],
+                    "total_raw_unchanged": results["raw_unchanged"],
                     "total_legacy_inserted": results["legacy_inserted"],
                     "by_category": {"general": results}
                 }
@@ -381,7 +481,8 @@ class YouTubeSupabaseIntegrator:
             
             logger.info("🎉 Enhanced YouTube Ingestion Complete!")
             logger.info(f"📊 Total Videos Processed: {results['total_processed']}")
-            logger.info(f"📊 Raw Ingestion Inserts: {results['total_raw_inserted']}")
+            logger.info(f"📊 Raw Ingestion Inserts: {results['total_raw_inserted']} "
+                        f"({results['total_raw_unchanged']} unchanged snapshots skipped)")
             logger.info(f"📊 Legacy Table Inserts: {results['total_legacy_inserted']}")
             logger.info(f"⏱️ Processing Time: {elapsed_time:.2f} seconds")
             
@@ -6,9 +6,10 @@ import logging
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
-from supabase import create_client, Client
+from datastore import create_client
 import requests
 from wave_score import calculate_wave_score
+from write_spool import write_or_spool
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 # Configure logging
@@ -289,8 +290,10 @@ class YouTubeAlertSystem:
                 'created_at': alert.created_at.isoformat()
             }
             
-            result = self.supabase.table('youtube_alerts').insert(alert_data).execute()
-            logger.info(f"✅ Alert stored: {alert.alert_id}")
+            if write_or_spool(self.supabase, 'youtube_alerts', alert_data) is None:
+                logger.info(f"📦 Alert spooled for replay: {alert.alert_id}")
+            else:
+                logger.info(f"✅ Alert stored: {alert.alert_id}")
             return True
             
         except Exception as e:
@@ -8,18 +8,34 @@ import os
 import sys
 from flask import Flask, render_template, send_from_directory, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
 
 # Add SERVER directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'SERVER'))
 
 # Import sentiment server components
 try:
-    from sentiment_server import create_sentiment_app
+    from sentiment_server import (create_sentiment_app, reset_process_state as reset_sentiment_state,
+                                  shutdown_process_state as shutdown_sentiment_state)
     SENTIMENT_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ Sentiment server not available: {e}")
     SENTIMENT_AVAILABLE = False
 
+from static_assets import StaticAssetIndex, serve_asset
+
+STATIC_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def reset_process_state():
+    """Give a forked worker fresh copies of the mounted services' clients"""
+    if SENTIMENT_AVAILABLE:
+        reset_sentiment_state()
+
+def shutdown_process_state():
+    """Let the mounted services drain queued work before the worker exits"""
+    if SENTIMENT_AVAILABLE:
+        shutdown_sentiment_state()
+
 def create_app():
     """Create and configure the Flask application for Render deployment"""
     app = Flask(__name__, 
@@ -33,20 +49,33 @@ def create_app():
     app.config['ENV'] = 'production'
     app.config['DEBUG'] = False
     
+    # Hash every dashboard asset up front so requests can be answered with 304s;
+    # served .html pages reference assets by their fingerprinted ?v= URLs
+    asset_index = StaticAssetIndex(STATIC_ROOT).build()
+    app.config['STATIC_ASSET_INDEX'] = asset_index
+    app.jinja_env.globals['asset_url'] = asset_index.asset_url
+    
+    def send_static_asset(filename):
+        """Serve an indexed asset, falling back to a plain file send"""
+        response = serve_asset(asset_index, filename)
+        if response is None:
+            return send_from_directory('.', filename)
+        return response
+    
     @app.route('/')
     def dashboard():
         """Serve the main dashboard"""
-        return send_from_directory('.', 'index.html')
+        return send_static_asset('index.html')
     
     @app.route('/sentiment-dashboard.html')
     def sentiment_dashboard():
         """Serve the sentiment analysis dashboard"""
-        return send_from_directory('.', 'sentiment-dashboard.html')
+        return send_static_asset('sentiment-dashboard.html')
     
     @app.route('/cultural-compass.html')
     def cultural_compass():
         """Serve the cultural compass page"""
-        return send_from_directory('.', 'cultural-compass.html')
+        return send_static_asset('cultural-compass.html')
     
     @app.route('/health')
     def health_check():
@@ -75,20 +104,17 @@ def create_app():
     @app.route('/<path:filename>')
     def static_files(filename):
         """Serve static files (CSS, JS, images, etc.)"""
-        return send_from_directory('.', filename)
+        return send_static_asset(filename)
     
-    # If sentiment server is available, register its routes
+    # If sentiment server is available, mount it under /api/sentiment
     if SENTIMENT_AVAILABLE:
         try:
             sentiment_app = create_sentiment_app()
-            # Register sentiment routes under /api/sentiment
-            @app.route('/api/sentiment/<path:path>', methods=['GET', 'POST'])
-            def sentiment_proxy(path):
-                """Proxy sentiment API requests"""
-                return sentiment_app.test_client().open(f'/{path}', 
-                                                       method=request.method,
-                                                       data=request.data,
-                                                       headers=request.headers)
+            # Requests are dispatched straight to the sentiment app's WSGI callable,
+            # with SCRIPT_NAME=/api/sentiment and the remainder as PATH_INFO
+            app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {
+                '/api/sentiment': sentiment_app
+            })
         except Exception as e:
             print(f"⚠️ Could not integrate sentiment server: {e}")
     
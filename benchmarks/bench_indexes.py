@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Index Benchmark
+Loads synthetic raw_ingestion_data into a scratch schema on a local Postgres and
+times the trend_queries access paths before and after the search/metric/covering indexes
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+
+try:
+    import psycopg2
+except ImportError:  # Only this benchmark needs a direct Postgres driver
+    psycopg2 = None
+
+SCHEMA = 'wavescope_bench'
+
+# Indexes raw_ingestion_data had before the search index migration
+BASELINE_INDEXES = [
+    "CREATE INDEX idx_raw_ingestion_timestamp ON raw_ingestion_data(timestamp DESC)",
+    "CREATE INDEX idx_raw_ingestion_source ON raw_ingestion_data(source, platform_source)",
+    "CREATE INDEX idx_raw_ingestion_category ON raw_ingestion_data(category)",
+    "CREATE INDEX idx_raw_ingestion_content_id ON raw_ingestion_data(content_id)",
+]
+
+# Same definitions as CONFIG/search_index_migration.sql
+OPTIMIZED_INDEXES = [
+    "DROP INDEX IF EXISTS idx_raw_ingestion_category",
+    "CREATE INDEX idx_raw_ingestion_category_ts ON raw_ingestion_data(category, timestamp DESC) "
+    "INCLUDE (content_id, platform_source, title)",
+    "CREATE INDEX idx_raw_ingestion_title_trgm ON raw_ingestion_data USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX idx_raw_ingestion_engagement ON raw_ingestion_data((normalized_metrics->'engagement_score'))",
+    "CREATE INDEX idx_raw_ingestion_viral_velocity ON raw_ingestion_data((normalized_metrics->'viral_velocity'))",
+    "CREATE INDEX idx_raw_ingestion_view_count ON raw_ingestion_data((raw_metrics->'view_count'))",
+]
+
+# The SQL PostgREST generates for the SERVER/trend_queries.py helpers
+QUERIES = {
+    'title_search': """
+        SELECT content_id, platform_source, title, category, timestamp FROM raw_ingestion_data
+        WHERE title ILIKE '%quantum%' ORDER BY timestamp DESC LIMIT 50""",
+    # A rare term cannot stop early on the timestamp index; this is where the trigram index pays off
+    'title_search_rare': """
+        SELECT content_id, platform_source, title, category, timestamp FROM raw_ingestion_data
+        WHERE title ILIKE '%49999%' ORDER BY timestamp DESC LIMIT 50""",
+    'engagement_filter': """
+        SELECT * FROM raw_ingestion_data
+        WHERE normalized_metrics->'engagement_score' >= '9.5'::jsonb
+        AND timestamp >= NOW() - INTERVAL '24 hours'
+        ORDER BY normalized_metrics->'engagement_score' DESC LIMIT 100""",
+    'viral_velocity_top': """
+        SELECT * FROM raw_ingestion_data
+        WHERE normalized_metrics->'viral_velocity' >= '900'::jsonb
+        ORDER BY normalized_metrics->'viral_velocity' DESC LIMIT 100""",
+    'category_recent': """
+        SELECT category, timestamp, content_id, platform_source, title FROM raw_ingestion_data
+        WHERE category = 'Gaming' AND timestamp >= NOW() - INTERVAL '24 hours'
+        ORDER BY timestamp DESC LIMIT 100""",
+}
+
+SETUP_SQL = f"""
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+SET search_path = {SCHEMA}, public;
+CREATE TABLE raw_ingestion_data (
+    id BIGSERIAL PRIMARY KEY,
+    source VARCHAR(20) NOT NULL,
+    platform_source VARCHAR(20) NOT NULL,
+    content_id VARCHAR(100) NOT NULL,
+    title TEXT NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    published_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    raw_metrics JSONB NOT NULL DEFAULT '{{}}',
+    normalized_metrics JSONB NOT NULL DEFAULT '{{}}',
+    metadata JSONB NOT NULL DEFAULT '{{}}'
+);
+"""
+
+# Titles are drawn from a word list so trigram selectivity resembles real titles
+LOAD_SQL = """
+WITH words AS (
+    SELECT ARRAY['ai', 'tools', 'gaming', 'review', 'tutorial', 'music', 'live', 'crypto', 'news',
+                 'update', 'best', 'how', 'to', 'build', 'setup', 'quantum', 'react', 'python',
+                 'highlights', 'reaction', 'vlog', 'challenge', 'explained', 'trailer'] AS w
+)
+INSERT INTO raw_ingestion_data (source, platform_source, content_id, title, category, timestamp,
+                                published_at, raw_metrics, normalized_metrics)
+SELECT
+    'youtube', 'youtube', 'vid' || g,
+    initcap(w[1 + (g * 7) %% 23] || ' ' || w[1 + (g * 13) %% 24] || ' ' || w[1 + (g * 17) %% 22] || ' ' || g),
+    (ARRAY['AI Tools', 'Gaming', 'Music', 'Technology', 'Entertainment', 'Crypto', 'Education', 'Sports'])[1 + g %% 8],
+    NOW() - (random() * INTERVAL '30 days'),
+    NOW() - (random() * INTERVAL '60 days'),
+    jsonb_build_object('view_count', (random() * 1000000)::INT, 'like_count', (random() * 50000)::INT,
+                       'comment_count', (random() * 5000)::INT),
+    jsonb_build_object('engagement_score', round((random() * 10)::NUMERIC, 2),
+                       'viral_velocity', round((random() * 1000)::NUMERIC, 1),
+                       'reach_estimate', (random() * 1000000)::INT,
+                       'growth_rate', round((random() * 100)::NUMERIC, 2))
+FROM generate_series(1, %s) AS g, words
+"""
+
+
+def plan_nodes(plan):
+    """Node types in an EXPLAIN JSON plan, outermost first"""
+    nodes = [plan['Node Type'] + (f" ({plan['Index Name']})" if 'Index Name' in plan else '')]
+    for child in plan.get('Plans', []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def time_queries(cursor, runs):
+    results = {}
+    for name, sql in QUERIES.items():
+        samples = []
+        plan = None
+        for _ in range(runs):
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)
+            explain = cursor.fetchone()[0][0]
+            samples.append(explain['Execution Time'])
+            plan = explain['Plan']
+        results[name] = {
+            'median_ms': round(statistics.median(samples), 2),
+            'min_ms': round(min(samples), 2),
+            'plan': plan_nodes(plan),
+        }
+    return results
+
+
+def run_benchmark(dsn, rows, runs, keep=False):
+    connection = psycopg2.connect(dsn)
+    connection.autocommit = True
+    cursor = connection.cursor()
+    try:
+        cursor.execute(SETUP_SQL)
+        cursor.execute(LOAD_SQL, (rows,))
+        for statement in BASELINE_INDEXES:
+            cursor.execute(statement)
+        cursor.execute("VACUUM ANALYZE raw_ingestion_data")
+        before = time_queries(cursor, runs)
+
+        for statement in OPTIMIZED_INDEXES:
+            cursor.execute(statement)
+        # Index-only scans need an up-to-date visibility map
+        cursor.execute("VACUUM ANALYZE raw_ingestion_data")
+        after = time_queries(cursor, runs)
+    finally:
+        if not keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        connection.close()
+
+    return {
+        name: {
+            'before': before[name],
+            'after': after[name],
+            'speedup': round(before[name]['median_ms'] / after[name]['median_ms'], 1)
+            if after[name]['median_ms'] else None,
+        }
+        for name in QUERIES
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time trend_queries access paths with and without the new indexes')
+    parser.add_argument('--dsn', default=os.getenv('BENCH_DATABASE_URL', 'postgresql://localhost/postgres'),
+                        help='local Postgres to load synthetic data into (a scratch schema is created)')
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--keep', action='store_true', help=f'keep the {SCHEMA} schema afterwards')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    if psycopg2 is None:
+        print("❌ psycopg2 is required: pip install psycopg2-binary")
+        return 1
+
+    results = run_benchmark(args.dsn, args.rows, args.runs, keep=args.keep)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"⏱️ Query latency over {args.rows:,} synthetic rows (median of {args.runs} runs)")
+    for name, stats in results.items():
+        print(f"   {name:<20} before {stats['before']['median_ms']:>9} ms   "
+              f"after {stats['after']['median_ms']:>9} ms   x{stats['speedup']}")
+        print(f"   {'':<20} {' > '.join(stats['after']['plan'][:3])}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures cold import latency of the WaveSight server modules in fresh interpreters
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT, 'SERVER')
+
+# Credentials that look configured but point nowhere, so any import-time
+# network call shows up as a stall instead of a fast "not configured" path
+OFFLINE_ENV = {
+    'SUPABASE_URL': 'http://10.255.255.1:9',
+    'SUPABASE_ANON_KEY': 'benchmark-key',
+    'REDDIT_CLIENT_ID': 'benchmark-client',
+    'REDDIT_CLIENT_SECRET': 'benchmark-secret',
+}
+
+TIMING_SNIPPET = """
+import sys, time, json
+sys.path[:0] = {paths!r}
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started}}))
+"""
+
+
+def time_import(module, offline=False, timeout=120):
+    """Import `module` in a fresh interpreter and return the import time in seconds"""
+    env = dict(os.environ)
+    if offline:
+        env.update(OFFLINE_ENV)
+    code = TIMING_SNIPPET.format(paths=[SERVER_DIR, ROOT], module=module)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])['seconds']
+
+
+def run_benchmark(modules, runs, offline):
+    results = {}
+    for module in modules:
+        samples = [time_import(module, offline=offline) for _ in range(runs)]
+        results[module] = {
+            'runs': runs,
+            'min_ms': round(min(samples) * 1000, 1),
+            'median_ms': round(statistics.median(samples) * 1000, 1),
+            'max_ms': round(max(samples) * 1000, 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold import latency of server modules')
+    parser.add_argument('modules', nargs='*', default=['sentiment_server', 'app'])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--offline', action='store_true',
+                        help='set unreachable credentials to expose import-time network calls')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.modules, args.runs, args.offline)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"⏱️ Cold import latency ({args.runs} runs{', offline credentials' if args.offline else ''})")
+    for module, stats in results.items():
+        print(f"   {module:<20} min {stats['min_ms']:>8} ms   "
+              f"median {stats['median_ms']:>8} ms   max {stats['max_ms']:>8} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
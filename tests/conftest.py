@@ -0,0 +1,63 @@
+"""
+Shared fixtures: SERVER/ modules on the path and a fresh in-memory datastore per test
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "SERVER"))
+
+# Keep checkpoint and spool files out of the repo's data/ directory
+os.environ.setdefault("WAVESCOPE_STATE_DIR", tempfile.mkdtemp(prefix="wavescope-tests-"))
+
+from local_datastore import LocalDatastore  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Empty datastore with the CONFIG/ schema; not shared through open_datastore's cache"""
+    store = LocalDatastore(":memory:")
+    yield store
+    store.close()
+
+
+class FlakyClient:
+    """Wraps a datastore; writes to the tables in `failing` raise like an unreachable Supabase"""
+
+    def __init__(self, store):
+        self.store = store
+        self.failing = set()
+        self.calls = []
+
+    def table(self, name):
+        return FlakyQuery(self, self.store.table(name), name)
+
+
+class FlakyQuery:
+    def __init__(self, client, query, name):
+        self.client = client
+        self.query = query
+        self.name = name
+
+    def __getattr__(self, attribute):
+        method = getattr(self.query, attribute)
+
+        def chained(*args, **kwargs):
+            method(*args, **kwargs)
+            return self
+        return chained
+
+    def execute(self):
+        self.client.calls.append(self.name)
+        if self.name in self.client.failing or "*" in self.client.failing:
+            raise ConnectionError(f"{self.name}: connection refused")
+        return self.query.execute()
+
+
+@pytest.fixture
+def flaky(db):
+    return FlakyClient(db)
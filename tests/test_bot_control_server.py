@@ -0,0 +1,39 @@
+"""
+BotManager: running state around the in-process worker
+"""
+
+import pytest
+
+bot_control_server = pytest.importorskip("bot_control_server")
+
+
+class InstantWorker:
+    """A worker whose run ends before start() returns, like a one-shot run that fails at once"""
+
+    def __init__(self, manager, error=None):
+        self.manager = manager
+        self.error = error
+
+    def start(self, mode, interval, jitter):
+        if self.error:
+            raise self.error
+        self.manager._on_worker_exit()
+
+
+@pytest.fixture
+def manager():
+    manager = bot_control_server.BotManager()
+    manager.worker_kind = 'inprocess'
+    return manager
+
+
+def test_run_that_exits_during_start_leaves_the_bot_stopped(manager):
+    manager.worker = InstantWorker(manager)
+    assert manager.start_pipeline(mode='single', interval=60)['success']
+    assert not manager.is_running
+
+
+def test_worker_that_fails_to_start_is_not_reported_running(manager):
+    manager.worker = InstantWorker(manager, error=RuntimeError("pipeline worker is already running"))
+    assert 'error' in manager.start_pipeline(mode='continuous', interval=60)
+    assert not manager.is_running
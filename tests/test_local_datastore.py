@@ -0,0 +1,309 @@
+"""
+Embedded SQLite datastore: schema translation, the fluent query subset and the RPC stand-ins
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from datastore import create_client
+from local_datastore import LocalDatastore, LocalDatastoreError, parse_schema, table_ddl
+
+SCHEMA = """
+-- comment with a ( paren
+CREATE TABLE IF NOT EXISTS events (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(50) NOT NULL,
+    tags TEXT[] DEFAULT '{alpha,beta}',
+    payload JSONB NOT NULL DEFAULT '{"a": 1, "b": [2, 3]}',
+    active BOOLEAN DEFAULT true,
+    score DECIMAL(5,2) DEFAULT 0.5,
+    window_size INTERVAL DEFAULT '1 hour',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    day DATE DEFAULT CURRENT_DATE,
+    UNIQUE(name, day),
+    INDEX idx_inline (name)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE pairs (
+    left_id UUID DEFAULT uuid_generate_v4(),
+    right_id VARCHAR(20) NOT NULL,
+    PRIMARY KEY (left_id, right_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_events_created ON events(created_at DESC);
+CREATE INDEX idx_events_expr ON events((payload->'a'));
+"""
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+def raw_row(i, **overrides):
+    row = {
+        'source': 'youtube', 'platform_source': 'youtube', 'content_id': f'v{i}',
+        'title': f'Quantum Tools {i}', 'category': 'Gaming' if i % 2 else 'Music',
+        'timestamp': (now() - timedelta(hours=i)).isoformat(), 'published_at': '2026-10-01T00:00:00Z',
+        'raw_metrics': {'view_count': 1000 * i}, 'normalized_metrics': {'engagement_score': i / 2},
+    }
+    row.update(overrides)
+    return row
+
+
+# ----------------------------------------------------------------------
+# Schema translation
+# ----------------------------------------------------------------------
+
+def test_parse_schema_column_kinds_and_defaults():
+    tables, indexes = parse_schema(SCHEMA)
+    events, pairs = tables
+    columns = events.columns
+
+    assert [name for name in columns] == ['id', 'name', 'tags', 'payload', 'active', 'score',
+                                          'window_size', 'created_at', 'day']
+    assert columns['id'].serial and events.primary_key == ['id']
+    assert {name: column.kind for name, column in columns.items()} == {
+        'id': 'integer', 'name': 'text', 'tags': 'json', 'payload': 'json', 'active': 'bool',
+        'score': 'real', 'window_size': 'text', 'created_at': 'timestamp', 'day': 'date'}
+    assert columns['tags'].default == ('value', ['alpha', 'beta'])
+    assert columns['payload'].default == ('value', {'a': 1, 'b': [2, 3]})
+    assert columns['active'].default == ('value', True)
+    assert columns['score'].default == ('value', 0.5)
+    assert columns['created_at'].default == ('now', None)
+    assert columns['day'].default == ('today', None)
+    assert events.unique == [['name', 'day']]
+
+    assert pairs.primary_key == ['left_id', 'right_id']
+    assert pairs.columns['left_id'].default == ('uuid', None)
+
+    # Expression indexes have no SQLite equivalent and are left out
+    assert indexes == ['CREATE INDEX IF NOT EXISTS "idx_events_created" ON "events" ("created_at" DESC)']
+
+
+def test_table_ddl_keys():
+    tables, _ = parse_schema(SCHEMA)
+    ddl = table_ddl(tables[1])
+    assert 'PRIMARY KEY ("left_id", "right_id")' in ddl
+    assert '"right_id" TEXT NOT NULL' in ddl
+    assert '"id" INTEGER PRIMARY KEY AUTOINCREMENT' in table_ddl(tables[0])
+
+
+def test_repo_schema_loads(db):
+    for table in ('raw_ingestion_data', 'latest_wavescores', 'trending_summary', 'trend_scores',
+                  'trend_insights', 'youtube_trends', 'video_metadata'):
+        assert table in db.tables
+    created = {row[0] for row in db.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert set(db.tables) <= created
+
+
+def test_create_client_selects_local_datastore():
+    client = create_client("sqlite://:memory:", "ignored")
+    assert isinstance(client, LocalDatastore)
+    assert create_client("sqlite://", "ignored") is client
+
+
+# ----------------------------------------------------------------------
+# Writes
+# ----------------------------------------------------------------------
+
+def test_insert_applies_defaults_and_normalizes_timestamps(db):
+    inserted = db.table("raw_ingestion_data").insert(
+        raw_row(1, timestamp='2026-10-18T12:00:00-02:00')).execute().data[0]
+    assert len(inserted['id']) == 36  # uuid_generate_v4() default
+    assert inserted['timestamp'] == '2026-10-18T14:00:00+00:00'
+    assert inserted['raw_metrics'] == {'view_count': 1000}
+    assert inserted['metadata'] == {}
+
+
+def test_insert_rejects_unknown_columns_and_tables(db):
+    with pytest.raises(LocalDatastoreError, match="bogus"):
+        db.table("raw_ingestion_data").insert({'bogus': 1}).execute()
+    with pytest.raises(LocalDatastoreError, match="does not exist"):
+        db.table("no_such_table").select("*").execute()
+
+
+def test_failed_batch_insert_rolls_back(db):
+    rows = [raw_row(1), raw_row(2, title=None)]
+    with pytest.raises(LocalDatastoreError):
+        db.table("raw_ingestion_data").insert(rows).execute()
+    assert db.table("raw_ingestion_data").select("id", count="exact").execute().count == 0
+
+
+def test_upsert_updates_on_conflict(db):
+    row = raw_row(1)
+    db.table("raw_ingestion_data").insert(row).execute()
+    updated = db.table("raw_ingestion_data").upsert(
+        {**row, 'title': 'Renamed'}, on_conflict="content_id,source,timestamp").execute().data
+    assert [r['title'] for r in updated] == ['Renamed']
+    rows = db.table("raw_ingestion_data").select("title", count="exact").execute()
+    assert rows.count == 1 and rows.data[0]['title'] == 'Renamed'
+
+
+def test_upsert_ignore_duplicates_keeps_existing_row(db):
+    row = raw_row(1)
+    db.table("raw_ingestion_data").insert(row).execute()
+    returned = db.table("raw_ingestion_data").upsert(
+        {**row, 'title': 'Ignored'}, on_conflict="content_id,source,timestamp", ignore_duplicates=True).execute()
+    assert returned.data == []
+    assert db.table("raw_ingestion_data").select("title").execute().data == [{'title': 'Quantum Tools 1'}]
+
+
+def test_upsert_defaults_to_primary_key(db):
+    db.table("latest_wavescores").upsert({'trend_id': 't1', 'content_id': 'v1', 'wave_score': 10,
+                                          'confidence': 0.5, 'calculated_at': now()}).execute()
+    db.table("latest_wavescores").upsert({'trend_id': 't1', 'content_id': 'v1', 'wave_score': 20,
+                                          'confidence': 0.5, 'calculated_at': now()}).execute()
+    assert db.table("latest_wavescores").select("trend_id,wave_score").execute().data == \
+        [{'trend_id': 't1', 'wave_score': 20.0}]
+
+
+def test_update_and_delete_with_filters(db):
+    db.table("raw_ingestion_data").insert([raw_row(i) for i in range(5)]).execute()
+    updated = db.table("raw_ingestion_data").update({'processing_status': 'done'}).in_(
+        'content_id', ['v1', 'v2']).execute().data
+    assert sorted(r['content_id'] for r in updated) == ['v1', 'v2']
+    deleted = db.table("raw_ingestion_data").delete().eq('processing_status', 'done').execute().data
+    assert len(deleted) == 2
+    assert db.table("raw_ingestion_data").select("id", count="exact").execute().count == 3
+
+
+# ----------------------------------------------------------------------
+# Filters and ordering
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def seeded(db):
+    db.table("raw_ingestion_data").insert([raw_row(i) for i in range(10)]).execute()
+    return db
+
+
+def content_ids(response):
+    return [row['content_id'] for row in response.data]
+
+
+def test_comparison_filters(seeded):
+    query = lambda: seeded.table("raw_ingestion_data").select("content_id").order("content_id")  # noqa: E731
+    assert content_ids(query().eq("content_id", "v3").execute()) == ['v3']
+    assert len(query().neq("category", "Gaming").execute().data) == 5
+    assert content_ids(query().gte("timestamp", (now() - timedelta(hours=2, minutes=30)).isoformat()).execute()) \
+        == ['v0', 'v1', 'v2']
+    assert content_ids(query().lt("timestamp", (now() - timedelta(hours=8, minutes=30)).isoformat()).execute()) \
+        == ['v9']
+    assert content_ids(query().in_("content_id", ['v1', 'v4', 'missing']).execute()) == ['v1', 'v4']
+    assert query().in_("content_id", []).execute().data == []
+    assert content_ids(query().match({'category': 'Music', 'content_id': 'v2'}).execute()) == ['v2']
+
+
+def test_like_filters_escape_and_case(seeded):
+    query = lambda: seeded.table("raw_ingestion_data").select("content_id")  # noqa: E731
+    assert content_ids(query().like("title", "%Tools 7").execute()) == ['v7']
+    assert query().like("title", "%tools 7").execute().data == []
+    assert content_ids(query().ilike("title", "%tools 7").execute()) == ['v7']
+    seeded.table("raw_ingestion_data").insert(raw_row(20, title='100% Tools')).execute()
+    assert content_ids(query().ilike("title", "%0\\%%").execute()) == ['v20']
+
+
+def test_json_path_filters_and_selects(seeded):
+    rows = seeded.table("raw_ingestion_data")\
+        .select("content_id,views:raw_metrics->>view_count,score:normalized_metrics->engagement_score")\
+        .gte("normalized_metrics->engagement_score", 4)\
+        .order("normalized_metrics->engagement_score", desc=True)\
+        .execute().data
+    assert rows == [{'content_id': 'v9', 'views': '9000', 'score': 4.5},
+                    {'content_id': 'v8', 'views': '8000', 'score': 4.0}]
+    assert content_ids(seeded.table("raw_ingestion_data").select("content_id")
+                       .eq("raw_metrics->>view_count", "3000").execute()) == ['v3']
+
+
+def test_is_null_and_postgres_null_ordering(db):
+    db.table("trend_insights").insert([
+        {'trend_name': 'a', 'category': 'c', 'analysis_date': now(), 'wave_score': 5},
+        {'trend_name': 'b', 'category': 'c', 'analysis_date': now(), 'wave_score': None},
+        {'trend_name': 'c', 'category': 'c', 'analysis_date': now(), 'wave_score': 9},
+    ]).execute()
+    query = lambda: db.table("trend_insights").select("trend_name")  # noqa: E731
+    names = lambda response: [row['trend_name'] for row in response.data]  # noqa: E731
+    assert names(query().is_("wave_score", "null").execute()) == ['b']
+    # NULLs sort last ascending and first descending, as in Postgres
+    assert names(query().order("wave_score").execute()) == ['a', 'c', 'b']
+    assert names(query().order("wave_score", desc=True).execute()) == ['b', 'c', 'a']
+    assert names(query().order("wave_score", desc=True, nullsfirst=False).execute()) == ['c', 'a', 'b']
+
+
+def test_range_limit_offset_and_count(seeded):
+    page = seeded.table("raw_ingestion_data").select("content_id", count="exact")\
+        .order("timestamp", desc=True).range(2, 4).execute()
+    assert content_ids(page) == ['v2', 'v3', 'v4']
+    assert page.count == 10
+    assert content_ids(seeded.table("raw_ingestion_data").select("content_id")
+                       .order("content_id").offset(8).execute()) == ['v8', 'v9']
+    assert len(seeded.table("raw_ingestion_data").select("content_id").limit(3).execute().data) == 3
+
+
+def test_embedded_resources_are_rejected(seeded):
+    with pytest.raises(LocalDatastoreError, match="embedded"):
+        seeded.table("raw_ingestion_data").select("content_id,video_metadata(title)").execute()
+
+
+# ----------------------------------------------------------------------
+# RPC stand-ins
+# ----------------------------------------------------------------------
+
+def test_calculate_trend_stats(db):
+    db.table("trend_scores").insert(
+        [{'trend_id': 'rising', 'platform_source': 'youtube', 'normalized_trend_score': 50 - 2 * h,
+          'timestamp': (now() - timedelta(hours=h)).isoformat()} for h in range(5)]
+        + [{'trend_id': 'flat', 'platform_source': 'youtube', 'normalized_trend_score': 40,
+            'timestamp': (now() - timedelta(hours=h)).isoformat()} for h in range(3)]
+        + [{'trend_id': 'stale', 'platform_source': 'youtube', 'normalized_trend_score': 10,
+            'timestamp': (now() - timedelta(hours=48)).isoformat()}]
+    ).execute()
+    stats = {row['trend_id']: row for row in db.rpc("calculate_trend_stats", {
+        'trend_ids': ['rising', 'flat', 'stale', 'missing'], 'hours_back': 24, 'flat_slope': 0.1}).execute().data}
+
+    assert set(stats) == {'rising', 'flat'}
+    rising = stats['rising']
+    assert rising['point_count'] == 5
+    assert rising['avg_score'] == 46.0 and rising['max_score'] == 50.0 and rising['latest_score'] == 50.0
+    assert rising['slope_per_hour'] == pytest.approx(2.0, rel=1e-3)
+    assert rising['trend_direction'] == 'rising'
+    assert stats['flat']['trend_direction'] == 'stable' and stats['flat']['volatility'] == 0.0
+
+    steep = db.rpc("calculate_trend_stats", {'trend_ids': ['rising'], 'flat_slope': 5}).execute().data
+    assert steep[0]['trend_direction'] == 'stable'
+
+
+def test_apply_wavescore_summaries_newer_scores_win(db):
+    snapshot = now().replace(minute=10, second=0, microsecond=0)
+    first = now()
+
+    def entry(trend_id, score, calculated_at, views):
+        return {'trend_id': trend_id, 'content_id': trend_id, 'wave_score': score, 'confidence': 0.8,
+                'calculated_at': calculated_at.isoformat(), 'category': 'Gaming', 'platform_source': 'youtube',
+                'snapshot_at': snapshot.isoformat(), 'view_count': views, 'not_a_column': 'ignored'}
+
+    applied = db.rpc("apply_wavescore_summaries", {'entries': [
+        entry('t1', 40, first, 100), entry('t2', 60, first, 300)]}).execute().data
+    assert applied == 2
+
+    # An older score for t1 is ignored; a newer one for t2 replaces it
+    db.rpc("apply_wavescore_summaries", {'entries': [
+        entry('t1', 99, first - timedelta(minutes=5), 1),
+        entry('t2', 80, first + timedelta(minutes=5), 500)]}).execute()
+    scores = {row['trend_id']: row['wave_score']
+              for row in db.table("latest_wavescores").select("trend_id,wave_score").execute().data}
+    assert scores == {'t1': 40.0, 't2': 80.0}
+
+    summary = db.table("trending_summary").select("*").execute().data
+    assert len(summary) == 1
+    assert summary[0]['content_count'] == 2
+    assert summary[0]['avg_wave_score'] == 60.0
+    assert summary[0]['max_wave_score'] == 80.0
+    assert summary[0]['total_views'] == 600
+
+
+def test_maintain_time_partitions_and_unknown_rpc(db):
+    assert db.rpc("maintain_time_partitions", {'retention_days': 30}).execute().data == []
+    with pytest.raises(LocalDatastoreError, match="no_such_function"):
+        db.rpc("no_such_function").execute()
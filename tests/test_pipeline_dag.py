@@ -0,0 +1,131 @@
+"""
+PipelineDAG: dependency order, skips, retries and timeouts
+"""
+
+import threading
+import time
+
+import pytest
+
+from pipeline_dag import PipelineDAG, Stage, StageTimeout, call_with_timeout
+
+
+def recorder():
+    calls = []
+
+    def stage(name, result=None, delay=0.0):
+        def run():
+            calls.append(name)
+            time.sleep(delay)
+            return result or {'stage': name}
+        return run
+    return calls, stage
+
+
+def test_stages_run_after_their_dependencies():
+    calls, stage = recorder()
+    report = PipelineDAG([
+        Stage('ingest', stage('ingest', delay=0.05)),
+        Stage('normalize', stage('normalize'), depends_on=('ingest',)),
+        Stage('score', stage('score'), depends_on=('normalize',)),
+        Stage('forecast', stage('forecast'), depends_on=('normalize',)),
+    ]).run()
+
+    assert calls[:2] == ['ingest', 'normalize']
+    assert set(calls[2:]) == {'score', 'forecast'}
+    assert report['results']['score'] == {'stage': 'score'}
+    assert report['failed_stages'] == [] and report['skipped_stages'] == []
+    assert report['critical_path'][0] == 'ingest'
+
+
+def test_dependents_of_a_failed_stage_are_skipped():
+    calls, stage = recorder()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    report = PipelineDAG([
+        Stage('ingest', broken),
+        Stage('normalize', stage('normalize'), depends_on=('ingest',)),
+        Stage('score', stage('score'), depends_on=('normalize',)),
+        Stage('alerts', stage('alerts')),
+    ]).run()
+
+    assert report['failed_stages'] == ['ingest']
+    assert report['skipped_stages'] == ['normalize', 'score']
+    assert calls == ['alerts']
+    assert report['stage_timings']['ingest']['error'] == 'boom'
+
+
+def test_unknown_dependencies_and_cycles_are_rejected():
+    noop = lambda: {}  # noqa: E731
+    with pytest.raises(ValueError, match="unknown"):
+        PipelineDAG([Stage('a', noop, depends_on=('missing',))])
+    with pytest.raises(ValueError, match="cycle"):
+        PipelineDAG([Stage('a', noop, depends_on=('b',)), Stage('b', noop, depends_on=('a',))])
+
+
+def test_failed_attempts_are_retried_with_backoff():
+    attempts = []
+
+    def flaky():
+        attempts.append(time.time())
+        if len(attempts) < 3:
+            raise ConnectionError("try again")
+        return {'ok': True}
+
+    report = PipelineDAG([Stage('flaky', flaky, retries=3, retry_backoff_seconds=0.01)]).run()
+
+    assert report['results']['flaky'] == {'ok': True}
+    assert report['stage_timings']['flaky']['attempts'] == 3
+    # Backoff doubles: 0.01s then 0.02s
+    assert attempts[2] - attempts[0] >= 0.03
+
+
+def test_timed_out_stage_is_not_retried():
+    release = threading.Event()
+    starts = []
+
+    def slow():
+        starts.append(time.time())
+        release.wait(5)
+        return {}
+
+    try:
+        report = PipelineDAG([Stage('slow_no_retry', slow, timeout_seconds=0.1, retries=3,
+                                    retry_backoff_seconds=0.01)]).run()
+        assert report['failed_stages'] == ['slow_no_retry']
+        assert report['stage_timings']['slow_no_retry']['attempts'] == 1
+        assert len(starts) == 1
+    finally:
+        release.set()
+
+
+def test_stage_does_not_restart_while_abandoned_attempt_runs():
+    release = threading.Event()
+    starts = []
+
+    def slow():
+        starts.append(time.time())
+        release.wait(5)
+        return {'done': True}
+
+    with pytest.raises(StageTimeout, match="exceeded"):
+        call_with_timeout(slow, 0.05, 'slow_restart')
+    with pytest.raises(StageTimeout, match="still running"):
+        call_with_timeout(slow, 0.05, 'slow_restart')
+    assert len(starts) == 1
+
+    release.set()
+    time.sleep(0.05)
+    assert call_with_timeout(slow, 1.0, 'slow_restart') == {'done': True}
+    assert len(starts) == 2
+
+
+def test_call_with_timeout_propagates_stage_errors():
+    def broken():
+        raise KeyError("missing")
+
+    with pytest.raises(KeyError):
+        call_with_timeout(broken, 1.0, 'broken_stage')
+    assert call_with_timeout(lambda: {'inline': True}, None, 'inline_stage') == {'inline': True}
@@ -0,0 +1,84 @@
+"""
+CheckpointStore: resuming failed runs, and when to start fresh instead
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from pipeline_state import CheckpointStore, read_json
+
+
+def failed_run(store, completed=('ingestion',)):
+    run = store.begin()
+    for stage in completed:
+        store.record(stage, 'success', output={'rows': 10}, input_marks={'raw': 'mark-1'})
+    store.record('normalization', 'failed', error='boom')
+    store.finish('failed')
+    return run['run_id']
+
+
+def test_failed_run_resumes_with_completed_stages(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    run_id = failed_run(store)
+
+    resumed = CheckpointStore(str(tmp_path)).begin()
+    assert resumed['run_id'] == run_id
+    assert resumed['resume_count'] == 1
+    assert resumed['status'] == 'running'
+
+
+def test_resumed_run_returns_completed_output(tmp_path):
+    failed_run(CheckpointStore(str(tmp_path)))
+    store = CheckpointStore(str(tmp_path))
+    store.begin()
+    assert store.completed_output('ingestion') == {'rows': 10}
+    assert store.completed_output('normalization') is None
+    assert store.last_success('ingestion')['input_marks'] == {'raw': 'mark-1'}
+
+
+def test_successful_run_is_not_resumed(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    first = store.begin()
+    store.finish('success')
+    assert CheckpointStore(str(tmp_path)).begin()['run_id'] != first['run_id']
+
+
+def test_resume_disabled_starts_fresh(tmp_path):
+    run_id = failed_run(CheckpointStore(str(tmp_path)))
+    assert CheckpointStore(str(tmp_path)).begin(resume=False)['run_id'] != run_id
+
+
+def test_resumes_stop_after_max_resumes(tmp_path):
+    run_id = failed_run(CheckpointStore(str(tmp_path), max_resumes=2))
+    for expected in (1, 2):
+        store = CheckpointStore(str(tmp_path), max_resumes=2)
+        run = store.begin()
+        assert (run['run_id'], run['resume_count']) == (run_id, expected)
+        store.finish('failed')
+
+    store = CheckpointStore(str(tmp_path), max_resumes=2)
+    fresh = store.begin()
+    assert fresh['run_id'] != run_id
+    assert 'resume_count' not in fresh
+    assert read_json(store._run_path(run_id))['status'] == 'abandoned'
+
+
+def test_old_failed_run_is_not_resumed(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    run_id = failed_run(store)
+    run = read_json(store._run_path(run_id))
+    run['started_at'] = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+    store.run = run
+    store._save_run()
+
+    fresh = CheckpointStore(str(tmp_path), max_resume_age_seconds=3600).begin()
+    assert fresh['run_id'] != run_id
+    assert CheckpointStore(str(tmp_path), max_resume_age_seconds=None).resume_blocker(run) is None
+
+
+def test_old_runs_are_pruned(tmp_path):
+    store = CheckpointStore(str(tmp_path), keep_runs=3)
+    for _ in range(5):
+        store.begin(resume=False)
+        store.finish('success')
+    runs = [name for name in (tmp_path / "checkpoints").iterdir() if name.name.startswith("run_")]
+    assert len(runs) == 3
@@ -0,0 +1,61 @@
+"""
+sentiment_server endpoints: Cultural Compass job streaming and readiness
+"""
+
+import threading
+import time
+
+import pytest
+
+sentiment_server = pytest.importorskip("sentiment_server")
+
+
+class OneJob:
+    """Stands in for CompassJobManager so the test drives the job's topics itself"""
+
+    def __init__(self, job):
+        self.job = job
+
+    def get(self, job_id):
+        return self.job if job_id == self.job.job_id else None
+
+
+def test_stream_waits_quietly_after_a_topic_fails(monkeypatch):
+    job = sentiment_server.CompassJob(['broken', 'ai'])
+    monkeypatch.setattr(sentiment_server, 'compass_jobs', OneJob(job))
+    job.record_result('broken', error="Reddit timed out")
+
+    def finish_later():
+        time.sleep(0.3)
+        job.record_result('ai', cultural_trend={'topic': 'ai'})
+    threading.Thread(target=finish_later, daemon=True).start()
+
+    response = sentiment_server.app.test_client().get(f'/api/cultural-compass/jobs/{job.job_id}/stream')
+    events = response.get_data(as_text=True).split("\n\n")
+
+    assert events[0] == 'event: trend\ndata: {"topic": "ai"}'
+    assert events[1].startswith('event: done') and '"broken": "Reddit timed out"' in events[1]
+    assert not any(event.startswith(': keep-alive') for event in events)
+
+
+def test_ready_respects_the_connect_backoff(monkeypatch):
+    attempts = []
+
+    def unreachable():
+        attempts.append(time.time())
+        raise ConnectionError("connection refused")
+
+    client = sentiment_server.LazyClient("Supabase", unreachable, retry_seconds=60)
+    monkeypatch.setattr(sentiment_server, 'supabase_client', client)
+    app = sentiment_server.app.test_client()
+
+    first = app.get('/api/ready')
+    second = app.get('/api/ready')
+    assert first.status_code == second.status_code == 503
+    assert len(attempts) == 1
+    assert second.get_json()['clients']['supabase']['retry_in_seconds'] > 50
+
+    # Once the backoff has passed the next probe tries again
+    client._retry_at = time.time() - 1
+    app.get('/api/ready')
+    assert len(attempts) == 2
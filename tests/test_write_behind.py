@@ -0,0 +1,156 @@
+"""
+WriteBehindBuffer: batching, per-table backoff and handing failed rows to on_failure
+"""
+
+import time
+
+from write_behind import WriteBehindBuffer, dedupe_on_conflict
+from write_spool import WriteSpool
+
+FAST = {'flush_interval': 0.02, 'retry_backoff': 0.05, 'retries': 2, 'enqueue_timeout': 0.05}
+
+
+def alert(i, alert_type='spike'):
+    return {'alert_type': alert_type, 'message': f'alert {i}'}
+
+
+def forecast(topic='ai'):
+    return {'topic': topic, 'date': '2026-10-18', 'sentiment_yes': 3}
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_rows_are_batched_per_table(db, flaky):
+    # Nothing is due before close(), so every row of a table lands in one batch
+    buffer = WriteBehindBuffer(lambda: flaky, {**FAST, 'flush_interval': 30})
+    for i in range(10):
+        buffer.enqueue('youtube_alerts', alert(i))
+    buffer.enqueue('sentiment_forecasts', forecast())
+    buffer.close()
+
+    assert db.table("youtube_alerts").select("id", count="exact").execute().count == 10
+    assert db.table("sentiment_forecasts").select("id", count="exact").execute().count == 1
+    assert sorted(flaky.calls) == ['sentiment_forecasts', 'youtube_alerts']
+    assert buffer.stats()['written'] == 11 and buffer.stats()['batches'] == 2
+
+
+def test_rows_of_different_shapes_are_written_separately(db, flaky):
+    buffer = WriteBehindBuffer(lambda: flaky, FAST)
+    buffer.enqueue('youtube_alerts', alert(1))
+    buffer.enqueue('youtube_alerts', {'alert_type': 'drop'})
+    buffer.close()
+    assert flaky.calls == ['youtube_alerts', 'youtube_alerts']
+
+
+def test_failing_table_backs_off_without_blocking_others(db, flaky):
+    failed = []
+    flaky.failing.add('youtube_alerts')
+    # One retry after a 3s backoff: ample time to see the other table written meanwhile
+    buffer = WriteBehindBuffer(lambda: flaky, {**FAST, 'retries': 1, 'retry_backoff': 3.0},
+                               on_failure=lambda *args: failed.append(args))
+
+    buffer.enqueue('youtube_alerts', alert(1))
+    assert wait_for(lambda: buffer.stats()['backing_off'] == ['youtube_alerts'])
+    buffer.enqueue('sentiment_forecasts', forecast())
+    assert wait_for(lambda: buffer.stats()['written'] == 1)
+    assert buffer.stats()['backing_off'] == ['youtube_alerts'] and not failed
+
+    # Retries run out: the rows go to on_failure and the table starts over
+    assert wait_for(lambda: failed)
+    table, op, on_conflict, rows, error = failed[0]
+    assert (table, op, on_conflict, len(rows)) == ('youtube_alerts', 'insert', None, 1)
+    assert isinstance(error, ConnectionError)
+    assert buffer.stats()['retries'] == 1 and buffer.stats()['backing_off'] == []
+    buffer.close()
+
+
+def test_table_recovers_during_backoff(db, flaky):
+    flaky.failing.add('youtube_alerts')
+    # Enough short retries that the table cannot give up before it recovers
+    buffer = WriteBehindBuffer(lambda: flaky, {**FAST, 'retries': 1000, 'retry_backoff_max': 0.05})
+    buffer.enqueue('youtube_alerts', alert(1))
+    assert wait_for(lambda: buffer.stats()['retries'] >= 1)
+    flaky.failing.clear()
+    assert wait_for(lambda: buffer.stats()['written'] == 1)
+    buffer.close()
+    assert buffer.stats()['failed'] == 0
+
+
+def test_failure_handler_errors_do_not_stop_the_flusher(db, flaky):
+    def broken_handler(*args):
+        raise OSError("disk full")
+
+    flaky.failing.add('youtube_alerts')
+    buffer = WriteBehindBuffer(lambda: flaky, {**FAST, 'retries': 0}, on_failure=broken_handler)
+    buffer.enqueue('youtube_alerts', alert(1))
+    assert wait_for(lambda: buffer.stats()['failed'] == 1)
+
+    flaky.failing.clear()
+    buffer.enqueue('youtube_alerts', alert(2))
+    assert wait_for(lambda: buffer.stats()['written'] == 1)
+    assert buffer.thread.is_alive()
+    buffer.close()
+
+
+def test_close_hands_pending_rows_to_on_failure_without_waiting(db, flaky):
+    failed = []
+    flaky.failing.add('*')
+    buffer = WriteBehindBuffer(lambda: flaky, {**FAST, 'flush_interval': 30, 'retry_backoff': 60},
+                               on_failure=lambda *args: failed.append(args))
+    for i in range(3):
+        buffer.enqueue('youtube_alerts', alert(i))
+    started = time.time()
+    buffer.close()
+    assert time.time() - started < 10
+    assert [len(args[3]) for args in failed] == [3]
+
+
+def test_full_queue_hands_rows_to_on_failure(db):
+    failed = []
+    buffer = WriteBehindBuffer(lambda: None, {**FAST, 'max_queue': 1},
+                               on_failure=lambda *args: failed.append(args))
+    buffer._ensure_started = lambda: None  # No flusher, so the queue stays full
+    buffer.enqueue('youtube_alerts', alert(1))
+    buffer.enqueue('youtube_alerts', alert(2))
+    assert buffer.stats()['overflowed'] == 1
+    assert [args[3] for args in failed] == [[alert(2)]]
+
+
+def test_upserts_keep_the_last_row_per_conflict_key(db, flaky):
+    rows = [{'trend_id': 't1', 'score': 1}, {'trend_id': 't2', 'score': 2}, {'trend_id': 't1', 'score': 3}]
+    assert dedupe_on_conflict(rows, 'trend_id') == [{'trend_id': 't1', 'score': 3}, {'trend_id': 't2', 'score': 2}]
+
+    buffer = WriteBehindBuffer(lambda: flaky, FAST)
+    base = {'content_id': 'v1', 'confidence': 0.5, 'calculated_at': '2026-10-18T00:00:00+00:00'}
+    buffer.enqueue('latest_wavescores', {**base, 'trend_id': 't1', 'wave_score': 10}, op='upsert',
+                   on_conflict='trend_id')
+    buffer.enqueue('latest_wavescores', {**base, 'trend_id': 't1', 'wave_score': 30}, op='upsert',
+                   on_conflict='trend_id')
+    buffer.close()
+    assert db.table("latest_wavescores").select("wave_score").execute().data == [{'wave_score': 30.0}]
+
+
+def test_successful_flush_replays_spooled_rows(db, flaky, tmp_path):
+    spool = WriteSpool(str(tmp_path / "spool"), {'fsync': False, 'segment_max_age': 0})
+    flaky.failing.add('youtube_alerts')
+    buffer = WriteBehindBuffer(lambda: flaky, {**FAST, 'retries': 0},
+                               on_failure=lambda table, op, on_conflict, rows, error:
+                               spool.append(table, rows, op, on_conflict),
+                               on_success=lambda *args: spool.replay_if_pending(flaky))
+    buffer.enqueue('youtube_alerts', alert(1))
+    assert wait_for(lambda: buffer.stats()['failed'] == 1)
+    assert spool.has_pending()
+
+    # The next write that goes through drains the spool without any write_or_spool call
+    flaky.failing.clear()
+    buffer.enqueue('youtube_alerts', alert(2))
+    assert wait_for(lambda: db.table("youtube_alerts").select("id", count="exact").execute().count == 2)
+    assert wait_for(lambda: not spool.has_pending())
+    buffer.close()
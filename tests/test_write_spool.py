@@ -0,0 +1,123 @@
+"""
+WriteSpool: CRC-checked records, replay in order, ack files and the write circuit
+"""
+
+import os
+
+import pytest
+
+from write_spool import WriteSpool, decode_line, encode_record
+
+NO_FSYNC = {'fsync': False, 'circuit_cooldown': 30}
+
+
+def alert(i):
+    return {'alert_type': 'spike', 'message': f'alert {i}'}
+
+
+def alert_count(db):
+    return db.table("youtube_alerts").select("id", count="exact").execute().count
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return WriteSpool(str(tmp_path / "spool"), NO_FSYNC)
+
+
+def test_records_round_trip_and_detect_corruption():
+    record = {'table': 'youtube_alerts', 'op': 'insert', 'on_conflict': None, 'rows': [alert(1)]}
+    line = encode_record(record)
+    assert line.endswith("\n")
+    assert decode_line(line) == record
+
+    checksum, body = line.rstrip("\n").split("\t", 1)
+    assert decode_line(f"{checksum}\t{body.replace('alert 1', 'alert 2')}\n") is None
+    assert decode_line(line[:len(line) // 2]) is None
+    assert decode_line("not a record\n") is None
+
+
+def test_segments_are_sealed_for_replay(spool):
+    spool.append('youtube_alerts', [alert(1)])
+    assert spool.sealed_segments() == []
+    assert spool.stats()['pending_segments'] == 1
+
+    spool.seal()
+    segments = spool.sealed_segments()
+    assert len(segments) == 1 and segments[0].endswith(".seg")
+
+
+def test_replay_writes_rows_in_order_and_removes_segments(db, spool):
+    spool.append('youtube_alerts', [alert(1), alert(2)])
+    spool.append('youtube_alerts', [alert(3)])
+    spool.append('sentiment_forecasts', [{'topic': 'ai', 'date': '2026-10-18'}])
+    spool.seal()
+
+    result = spool.replay(db)
+    assert result == {'segments_replayed': 1, 'rows_replayed': 4, 'corrupt_records': 0, 'status': 'success'}
+    messages = [row['message'] for row in db.table("youtube_alerts").select("message").order("id").execute().data]
+    assert messages == ['alert 1', 'alert 2', 'alert 3']
+    assert not [name for name in os.listdir(spool.directory) if name.endswith((".seg", ".ack"))]
+    assert spool.stats()['replayed_rows'] == 4
+
+
+def test_corrupt_records_are_quarantined(db, spool):
+    spool.append('youtube_alerts', [alert(1)])
+    spool.append('youtube_alerts', [alert(2)])
+    spool.seal()
+    segment = spool.sealed_segments()[0]
+    with open(segment) as f:
+        lines = f.readlines()
+    with open(segment, 'w') as f:
+        f.write(lines[0].replace('alert 1', 'alert X'))
+        f.write(lines[1][:20])  # Torn final write
+
+    result = spool.replay(db)
+    assert result['corrupt_records'] == 2 and result['rows_replayed'] == 0
+    with open(os.path.join(spool.directory, "corrupt.log")) as f:
+        assert 'alert X' in f.read()
+
+
+def test_failed_replay_resumes_from_the_ack(db, flaky, spool):
+    spool.append('youtube_alerts', [alert(1)])
+    spool.append('sentiment_forecasts', [{'topic': 'ai', 'date': '2026-10-18'}])
+    spool.append('youtube_alerts', [alert(2)])
+    spool.seal()
+
+    flaky.failing.add('sentiment_forecasts')
+    assert spool.replay(flaky)['status'] == 'failed'
+    segment = spool.sealed_segments()[0]
+    with open(segment + ".ack") as f:
+        assert f.read() == "1"
+    assert alert_count(db) == 1
+
+    flaky.failing.clear()
+    result = spool.replay(flaky)
+    assert result['status'] == 'success' and result['rows_replayed'] == 2
+    # The record acknowledged before the failure is not written twice
+    assert alert_count(db) == 2
+
+
+def test_write_spools_on_failure_and_opens_the_circuit(db, flaky, spool):
+    flaky.failing.add('youtube_alerts')
+    assert spool.write(flaky, 'youtube_alerts', alert(1)) is None
+    assert spool.stats()['circuit_open']
+
+    # While the circuit is open the database is not tried at all
+    flaky.failing.clear()
+    calls = len(flaky.calls)
+    assert spool.write(flaky, 'youtube_alerts', [alert(2)]) is None
+    assert len(flaky.calls) == calls
+    assert spool.stats()['spooled_rows'] == 2
+
+    spool.circuit_open_until = 0
+    assert spool.write(flaky, 'youtube_alerts', [alert(3)]).data[0]['message'] == 'alert 3'
+    assert spool.replay(flaky, seal_active=True)['rows_replayed'] == 2
+    assert alert_count(db) == 3
+
+
+def test_segments_left_open_by_dead_processes_are_adopted(tmp_path):
+    spool = WriteSpool(str(tmp_path), NO_FSYNC)
+    orphan = tmp_path / "00000000000000000001-999999999.open"
+    orphan.write_text(encode_record({'table': 'youtube_alerts', 'op': 'insert', 'on_conflict': None,
+                                     'rows': [alert(1)]}))
+    assert spool.sealed_segments() == [str(tmp_path / "00000000000000000001-999999999.seg")]